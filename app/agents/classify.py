@@ -39,7 +39,9 @@ class ClassifyAgent:
         if input_type == 'image':
             result['metadata'] = {
                 'requires_ocr': True,
-                'file_path': input_ref
+                'file_path': input_ref,
+                'content_hash': submission.get('content_hash'),
+                'phash': submission.get('image_phash')
             }
         elif input_type == 'url':
             result['metadata'] = {
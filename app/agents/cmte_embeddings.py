@@ -3,20 +3,18 @@ CMTE Embedding Generator
 Generates embeddings for text and images
 """
 
-from sentence_transformers import SentenceTransformer
 import numpy as np
+from app.shared_models import get_sentence_model
 import logging
 
 logger = logging.getLogger(__name__)
 
 class EmbeddingGenerator:
     def __init__(self):
-        try:
-            self.text_model = SentenceTransformer('all-MiniLM-L6-v2')
-            logger.info("✓ Loaded sentence-transformers model")
-        except Exception as e:
-            logger.error(f"Failed to load embedding model: {e}")
-            self.text_model = None
+        # Shared with FactCheckAgent; None if the model failed to load
+        self.text_model = get_sentence_model()
+        if self.text_model is None:
+            logger.error("Failed to load embedding model, using hash embeddings")
     
     def generate_text_embedding(self, text: str) -> np.ndarray:
         """Generate 384-dim vector for text"""
@@ -8,6 +8,8 @@ import aiohttp
 from typing import Dict, List
 from datetime import datetime
 from app.config import settings
+from app.http_session import get_http_session
+from app.shared_models import get_sentence_model
 
 class FactCheckAgent:
     """Agent 4: Query fact-checking APIs"""
@@ -18,15 +20,10 @@ class FactCheckAgent:
         self.similarity_model = None
     
     def _load_similarity_model(self):
-        """Load sentence transformer model"""
+        """Load sentence transformer model (shared with CMTE, preloaded by the worker pool)"""
         if self.similarity_model is None:
-            try:
-                from sentence_transformers import SentenceTransformer
-                self.similarity_model = SentenceTransformer('all-MiniLM-L6-v2')
-                print("✓ Loaded semantic similarity model")
-            except Exception as e:
-                print(f"⚠️  Could not load similarity model: {e}")
-                self.similarity_model = False  # Mark as failed
+            model = get_sentence_model()
+            self.similarity_model = model if model is not None else False  # False marks failed
     
     async def check_all_sources(self, claim_text: str) -> List[Dict]:
         """
@@ -64,52 +61,55 @@ class FactCheckAgent:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params, timeout=30) as resp:
-                    if resp.status != 200:
-                        print(f"⚠️  Google Fact Check API error: {resp.status}")
-                        return []
-                    
-                    data = await resp.json()
-                    
-                    if 'claims' not in data:
-                        return []
-                    
-                    # Load similarity model if needed
-                    self._load_similarity_model()
-                    
-                    # Process results
-                    results = []
-                    for claim in data['claims']:
-                        # Calculate semantic similarity
-                        similarity = self._calculate_similarity(
-                            claim_text,
-                            claim['text']
-                        )
+            session = get_http_session()
+            async with session.get(url, params=params, timeout=30) as resp:
+                if resp.status != 200:
+                    print(f"⚠️  Google Fact Check API error: {resp.status}")
+                    return []
+                
+                data = await resp.json()
+                
+                if 'claims' not in data:
+                    return []
+                
+                # Model loading and encoding are CPU-bound: keep them off the event loop
+                similarities = await asyncio.to_thread(
+                    self._score_claims, claim_text, data['claims']
+                )
+                
+                # Process results
+                results = []
+                for claim, similarity in zip(data['claims'], similarities):
+                    # Only include if similarity > 0.7
+                    if similarity >= 0.7:
+                        # Get first review
+                        review = claim['claimReview'][0] if claim.get('claimReview') else {}
                         
-                        # Only include if similarity > 0.7
-                        if similarity >= 0.7:
-                            # Get first review
-                            review = claim['claimReview'][0] if claim.get('claimReview') else {}
-                            
-                            results.append({
-                                "api_name": "GoogleFactCheck",
-                                "found": True,
-                                "claim_text": claim['text'],
-                                "verdict": review.get('textualRating', 'Unknown'),
-                                "summary": claim.get('text', ''),
-                                "url": review.get('url', ''),
-                                "publisher": review.get('publisher', {}).get('name', 'Unknown'),
-                                "similarity_score": similarity,
-                                "retrieved_at": datetime.utcnow()
-                            })
-                    
-                    return results
+                        results.append({
+                            "api_name": "GoogleFactCheck",
+                            "found": True,
+                            "claim_text": claim['text'],
+                            "verdict": review.get('textualRating', 'Unknown'),
+                            "summary": claim.get('text', ''),
+                            "url": review.get('url', ''),
+                            "publisher": review.get('publisher', {}).get('name', 'Unknown'),
+                            "similarity_score": similarity,
+                            "retrieved_at": datetime.utcnow()
+                        })
+                
+                return results
         
         except Exception as e:
             print(f"⚠️  Error querying Google Fact Check: {e}")
             return []
     
+    def _score_claims(self, claim_text: str, claims: List[Dict]) -> List[float]:
+        """Similarity of each fact-checked claim to ours (runs in a worker thread)"""
+        
+        # Load similarity model if needed
+        self._load_similarity_model()
+        return [self._calculate_similarity(claim_text, claim['text']) for claim in claims]
+    
     def _calculate_similarity(self, text1: str, text2: str) -> float:
         """Calculate semantic similarity between two texts"""
         
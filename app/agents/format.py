@@ -6,6 +6,7 @@ Purpose: Normalize and canonicalize claims using NLP
 import re
 from typing import Dict, Any
 from datetime import datetime
+from app.shared_models import get_spacy_nlp
 
 class FormatAgent:
     """
@@ -17,14 +18,10 @@ class FormatAgent:
     - Remove hedging words
     """
     
-    def __init__(self):
-        # Try to load spaCy model (optional)
-        self.nlp = None
-        try:
-            import spacy
-            self.nlp = spacy.load("en_core_web_sm")
-        except:
-            print("⚠️  spaCy not available - using basic NLP")
+    @property
+    def nlp(self):
+        """Shared spaCy model (optional), loaded on first use or preloaded by the worker pool"""
+        return get_spacy_nlp()
     
     def run(self, claim_text: str, reference_date: datetime = None) -> Dict[str, Any]:
         """
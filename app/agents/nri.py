@@ -6,6 +6,8 @@ Analyzes narrative structure and generates corrective messaging
 from app.agents.nri_classifier import NarrativeClassifier
 from app.agents.nri_messaging import CorrectiveMessagingGenerator
 from app.agents.nri_risk import NarrativeRiskAssessor
+from app.agents.nri_fused import FusedNarrativeAnalyzer
+from app.config import settings
 from typing import Dict
 import logging
 
@@ -16,6 +18,7 @@ class NRIAgent:
         self.classifier = NarrativeClassifier()
         self.messaging_gen = CorrectiveMessagingGenerator()
         self.risk_assessor = NarrativeRiskAssessor()
+        self.fused = FusedNarrativeAnalyzer()
     
     def process(self, claim_text: str, fact_check_result: Dict) -> Dict:
         """
@@ -31,6 +34,13 @@ class NRIAgent:
         try:
             logger.info(f"🧠 NRI: Analyzing narrative structure")
             
+            # Fused mode: classification and messaging in one LLM call
+            if settings.nri_fused_mode:
+                fused = self.fused.analyze(claim_text, fact_check_result)
+                if fused:
+                    logger.info(f"✓ Narrative type: {fused[0]['narrative_type']} (fused)")
+                    return self._assemble(claim_text, *fused)
+            
             # Step 1: Classify narrative
             narrative_analysis = self.classifier.classify_with_llm(claim_text)
             logger.info(f"✓ Narrative type: {narrative_analysis.get('narrative_type')}")
@@ -43,33 +53,40 @@ class NRIAgent:
             )
             logger.info(f"✓ Corrective messages generated")
             
-            # Step 3: Assess risk
-            risk_assessment = self.risk_assessor.assess_risk(
-                narrative_analysis,
-                {'claim_text': claim_text}
-            )
-            logger.info(f"✓ Risk level: {risk_assessment.get('risk_level')}")
-            
-            result = {
-                'narrative_analysis': narrative_analysis,
-                'corrective_messaging': corrective_messages,
-                'risk_assessment': risk_assessment
-            }
-            
-            logger.info(f"✅ NRI: Complete")
-            return result
+            return self._assemble(claim_text, narrative_analysis, corrective_messages)
             
         except Exception as e:
-            logger.error(f"❌ NRI Error: {e}")
-            import traceback
-            traceback.print_exc()
-            
-            return {
-                'error': str(e),
-                'narrative_analysis': {'narrative_type': 'unknown', 'confidence': 0},
-                'corrective_messaging': {},
-                'risk_assessment': {'risk_level': 'UNKNOWN', 'risk_score': 0}
-            }
+            return self._error_result(e)
+    
+    def _assemble(self, claim_text: str, narrative_analysis: Dict, corrective_messages: Dict) -> Dict:
+        """Step 3: assess risk and build the NRI result"""
+        
+        risk_assessment = self.risk_assessor.assess_risk(
+            narrative_analysis,
+            {'claim_text': claim_text}
+        )
+        logger.info(f"✓ Risk level: {risk_assessment.get('risk_level')}")
+        
+        result = {
+            'narrative_analysis': narrative_analysis,
+            'corrective_messaging': corrective_messages,
+            'risk_assessment': risk_assessment
+        }
+        
+        logger.info(f"✅ NRI: Complete")
+        return result
+    
+    def _error_result(self, e: Exception) -> Dict:
+        logger.error(f"❌ NRI Error: {e}")
+        import traceback
+        traceback.print_exc()
+        
+        return {
+            'error': str(e),
+            'narrative_analysis': {'narrative_type': 'unknown', 'confidence': 0},
+            'corrective_messaging': {},
+            'risk_assessment': {'risk_level': 'UNKNOWN', 'risk_score': 0}
+        }
 
 def run_nri_agent(claim_text: str, fact_check_result: Dict) -> Dict:
     """Standalone function to run NRI agent"""
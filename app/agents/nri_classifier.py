@@ -6,7 +6,7 @@ Classifies claims into narrative templates
 import json
 import os
 from typing import Dict, List
-from app.llm_client import get_llm_response
+from app.llm_client import get_llm_response, json_validator
 from app.config import settings
 import logging
 
@@ -27,7 +27,20 @@ class NarrativeClassifier:
     def classify_with_llm(self, claim_text: str) -> Dict:
         """Use LLM to classify narrative"""
         
-        prompt = f"""Analyze this claim and identify its narrative structure:
+        try:
+            response = get_llm_response(
+                prompt=self._classification_prompt(claim_text),
+                temperature=0.3,
+                validate=json_validator("narrative_type")
+            )
+            return self._parse_classification(response, claim_text)
+            
+        except Exception as e:
+            logger.error(f"LLM classification failed: {e}")
+            return self.classify_with_rules(claim_text)
+    
+    def _classification_prompt(self, claim_text: str) -> str:
+        return f"""Analyze this claim and identify its narrative structure:
 
 Claim: "{claim_text}"
 
@@ -47,24 +60,17 @@ Respond in JSON format:
     "target_audience": "Who is most likely to believe this",
     "persuasion_tactics": ["emotional_appeal", "authority_questioning"]
 }}"""
+    
+    def _parse_classification(self, response: str, claim_text: str) -> Dict:
+        """Extract the JSON classification, falling back to rules"""
         
-        try:
-            response = get_llm_response(
-                prompt=prompt,
-                temperature=0.3
-            )
-            
-            # Try to parse JSON from response
-            import re
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
-            else:
-                logger.warning("LLM response not in JSON format, using fallback")
-                return self.classify_with_rules(claim_text)
-            
-        except Exception as e:
-            logger.error(f"LLM classification failed: {e}")
+        # Try to parse JSON from response
+        import re
+        json_match = re.search(r'\{.*\}', response, re.DOTALL)
+        if json_match:
+            return json.loads(json_match.group())
+        else:
+            logger.warning("LLM response not in JSON format, using fallback")
             return self.classify_with_rules(claim_text)
     
     def classify_with_rules(self, claim_text: str) -> Dict:
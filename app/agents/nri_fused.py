@@ -0,0 +1,125 @@
+"""
+NRI Fused Analyzer
+Narrative classification and corrective messaging in a single LLM call
+"""
+
+import json
+import re
+from typing import Dict, Optional, Tuple
+from app.llm_client import get_llm_response
+import logging
+
+logger = logging.getLogger(__name__)
+
+NARRATIVE_TYPES = [
+    'fear_health', 'conspiracy_control', 'blame_scapegoat',
+    'hope_miracle', 'political_partisan'
+]
+
+# Fields returned by NarrativeClassifier.classify_with_llm -> expected type
+NARRATIVE_SCHEMA = {
+    'narrative_type': str,
+    'confidence': (int, float),
+    'emotional_triggers': list,
+    'psychological_appeal': str,
+    'target_audience': str,
+    'persuasion_tactics': list
+}
+
+# Fields returned by CorrectiveMessagingGenerator.generate_counter_message
+MESSAGING_SCHEMA = {
+    'short_message': str,
+    'medium_message': str,
+    'detailed_message': str,
+    'communication_style': str,
+    'recommended_channels': list,
+    'key_points': list
+}
+
+class FusedNarrativeAnalyzer:
+    """One structured prompt instead of separate classify and messaging calls"""
+
+    def analyze(self, claim_text: str, fact_check_result: Dict) -> Optional[Tuple[Dict, Dict]]:
+        """
+        Classify the narrative and write corrective messages in one call
+
+        Returns:
+            (narrative_analysis, corrective_messages), or None if the call or
+            validation failed and the caller should use the split path
+        """
+        try:
+            response = get_llm_response(
+                prompt=self._fused_prompt(claim_text, fact_check_result),
+                temperature=0.3,
+                validate=self._parse
+            )
+            return self._parse(response)
+        except Exception as e:
+            logger.warning(f"Fused NRI analysis failed, using split path: {e}")
+            return None
+
+    def _fused_prompt(self, claim_text: str, fact_check_result: Dict) -> str:
+        return f"""Analyze the narrative structure of this claim and create corrective messages to counter it:
+
+Claim: "{claim_text}"
+Fact-Check: {fact_check_result.get('explanation', 'False')}
+
+Classify it into ONE of these narrative templates:
+1. fear_health: Creates fear about health risks
+2. conspiracy_control: Hidden control or surveillance
+3. blame_scapegoat: Blames specific groups
+4. hope_miracle: Too-good-to-be-true solutions
+5. political_partisan: Attacks political opponents
+
+Then write THREE corrective messages that address the narrative's emotional triggers:
+1. SHORT (280 chars): Direct, clear, factual
+2. MEDIUM (2-3 sentences): Professional, cites authorities
+3. DETAILED (1 paragraph): Comprehensive explanation
+
+Respond in JSON format:
+{{
+    "narrative": {{
+        "narrative_type": "fear_health|conspiracy_control|blame_scapegoat|hope_miracle|political_partisan",
+        "confidence": 0.85,
+        "emotional_triggers": ["fear", "anxiety"],
+        "psychological_appeal": "Brief explanation of why this narrative persuades people",
+        "target_audience": "Who is most likely to believe this",
+        "persuasion_tactics": ["emotional_appeal", "authority_questioning"]
+    }},
+    "messaging": {{
+        "short_message": "...",
+        "medium_message": "...",
+        "detailed_message": "...",
+        "communication_style": "calm|urgent|empathetic",
+        "recommended_channels": ["social_media", "press_release"],
+        "key_points": ["point1", "point2"]
+    }}
+}}"""
+
+    def _parse(self, response: str) -> Tuple[Dict, Dict]:
+        """Extract and validate both halves; raises ValueError if invalid"""
+
+        json_match = re.search(r'\{.*\}', response, re.DOTALL)
+        if not json_match:
+            raise ValueError("Response not in JSON format")
+
+        data = json.loads(json_match.group())
+        narrative = _validate(data.get('narrative'), NARRATIVE_SCHEMA)
+        messaging = _validate(data.get('messaging'), MESSAGING_SCHEMA)
+
+        if narrative['narrative_type'] not in NARRATIVE_TYPES:
+            raise ValueError(f"Unknown narrative type: {narrative['narrative_type']}")
+
+        narrative['confidence'] = max(0.0, min(1.0, float(narrative['confidence'])))
+        return narrative, messaging
+
+def _validate(section, schema: Dict) -> Dict:
+    """Check a response section has every schema field with the right type"""
+    if not isinstance(section, dict):
+        raise ValueError("Missing section")
+
+    for field, expected in schema.items():
+        if not isinstance(section.get(field), expected):
+            raise ValueError(f"Invalid or missing field: {field}")
+
+    return {field: section[field] for field in schema}
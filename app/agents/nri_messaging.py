@@ -4,7 +4,7 @@ Creates counter-narratives and advisory templates
 """
 
 from typing import Dict
-from app.llm_client import get_llm_response
+from app.llm_client import get_llm_response, json_validator
 import logging
 import json
 import re
@@ -17,7 +17,23 @@ class CorrectiveMessagingGenerator:
                                  fact_check_result: Dict) -> Dict:
         """Generate corrective messaging"""
         
-        prompt = f"""Create corrective messages to counter this misinformation:
+        prompt = self._counter_message_prompt(claim_text, narrative_analysis, fact_check_result)
+        
+        try:
+            response = get_llm_response(
+                prompt=prompt,
+                temperature=0.5,
+                validate=json_validator("short_message")
+            )
+            return self._parse_counter_message(response, claim_text, narrative_analysis)
+            
+        except Exception as e:
+            logger.error(f"Corrective messaging generation failed: {e}")
+            return self._generate_fallback_message(claim_text, narrative_analysis)
+    
+    def _counter_message_prompt(self, claim_text: str, narrative_analysis: Dict,
+                                fact_check_result: Dict) -> str:
+        return f"""Create corrective messages to counter this misinformation:
 
 Claim: "{claim_text}"
 Narrative Type: {narrative_analysis.get('narrative_type', 'unknown')}
@@ -38,19 +54,13 @@ Respond in JSON:
     "recommended_channels": ["social_media", "press_release"],
     "key_points": ["point1", "point2"]
 }}"""
-        
-        try:
-            response = get_llm_response(prompt=prompt, temperature=0.5)
-            
-            # Extract JSON
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
-            else:
-                return self._generate_fallback_message(claim_text, narrative_analysis)
-            
-        except Exception as e:
-            logger.error(f"Corrective messaging generation failed: {e}")
+    
+    def _parse_counter_message(self, response: str, claim_text: str, narrative_analysis: Dict) -> Dict:
+        # Extract JSON
+        json_match = re.search(r'\{.*\}', response, re.DOTALL)
+        if json_match:
+            return json.loads(json_match.group())
+        else:
             return self._generate_fallback_message(claim_text, narrative_analysis)
     
     def _generate_fallback_message(self, claim_text: str, narrative_analysis: Dict) -> Dict:
@@ -8,8 +8,10 @@ import aiohttp
 from typing import Dict, List, Optional
 from datetime import datetime
 from urllib.parse import urlparse
-from newspaper import Article
 from app.config import settings
+from app.browser_pool import USER_AGENT
+from app.http_session import get_http_session
+from app.page_cache import page_cache, newspaper_fields
 
 class WebSearchAgent:
     """Agent 6: Web search and evidence collection"""
@@ -51,25 +53,26 @@ class WebSearchAgent:
         # Build search queries
         queries = self._build_queries(claim_text, entities)
         
-        # Search for each query
-        all_urls = []
-        for query in queries[:2]:  # Limit to 2 queries
-            urls = await self._search_web(query, limit=5)
-            all_urls.extend(urls)
+        # Search for each query concurrently
+        search_results = await asyncio.gather(*[
+            self._search_web(query, limit=5)
+            for query in queries[:2]  # Limit to 2 queries
+        ])
+        all_urls = [url for urls in search_results for url in urls]
         
-        # Remove duplicates
-        unique_urls = list(set(all_urls))[:max_results]
+        # Remove duplicates (keeping search rank order)
+        unique_urls = list(dict.fromkeys(all_urls))[:max_results]
         
         if not unique_urls:
             print("⚠️  No URLs found from search")
             return []
         
-        # Fetch and analyze each URL
-        evidence_list = []
-        for url in unique_urls:
-            evidence = await self._fetch_and_analyze(url, claim_text)
-            if evidence:
-                evidence_list.append(evidence)
+        # Fetch and analyze all URLs concurrently
+        fetched = await asyncio.gather(*[
+            self._fetch_and_analyze(url, claim_text)
+            for url in unique_urls
+        ])
+        evidence_list = [evidence for evidence in fetched if evidence]
         
         return evidence_list
     
@@ -107,20 +110,20 @@ class WebSearchAgent:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params, timeout=30) as resp:
-                    if resp.status != 200:
-                        print(f"⚠️  SerpAPI error: {resp.status}")
-                        return []
-                    
-                    data = await resp.json()
-                    
-                    # Extract URLs from organic results
-                    urls = []
-                    for result in data.get('organic_results', []):
-                        urls.append(result['link'])
-                    
-                    return urls
+            session = get_http_session()
+            async with session.get(url, params=params, timeout=30) as resp:
+                if resp.status != 200:
+                    print(f"⚠️  SerpAPI error: {resp.status}")
+                    return []
+                
+                data = await resp.json()
+                
+                # Extract URLs from organic results
+                urls = []
+                for result in data.get('organic_results', []):
+                    urls.append(result['link'])
+                
+                return urls
         
         except Exception as e:
             print(f"⚠️  Error searching web: {e}")
@@ -134,15 +137,16 @@ class WebSearchAgent:
         """Fetch article and analyze"""
         
         try:
-            # Try newspaper3k (faster)
-            article = Article(url)
-            article.download()
-            article.parse()
+            # Popular pages are usually in the shared page cache already; newspaper3k
+            # parsing is blocking, so keep it off the event loop. Same headers as
+            # extraction, so both share one request and news sites serve full text
+            page = await page_cache.fetch(url, headers={'User-Agent': USER_AGENT})
+            article = await asyncio.to_thread(page_cache.parse, page, "newspaper3k", newspaper_fields)
             
             # Extract data
-            title = article.title or "Untitled"
-            text = article.text or ""
-            publish_date = article.publish_date
+            title = article['title'] or "Untitled"
+            text = article['text'] or ""
+            publish_date = datetime.fromisoformat(article['publish_date']) if article['publish_date'] else None
             
             if not text or len(text) < 100:
                 print(f"⚠️  Article too short or empty: {url}")
@@ -4,7 +4,8 @@ Purpose: LLM-powered analysis with confidence scoring
 """
 
 import json
-from typing import Dict, Any, List
+import asyncio
+from typing import Dict, Any, List, Tuple
 from bson import ObjectId
 from app.config import settings
 from app.database import (
@@ -13,6 +14,13 @@ from app.database import (
     evidence_collection
 )
 from app.llm_client import llm_client
+from app.semantic_cache import semantic_cache
+from app.json_stream import IncrementalJSONParser
+from app.prompt_builder import (
+    count_tokens, token_budget, truncate, relevance, near_duplicate, pack
+)
+
+SYSTEM_PROMPT = "You are a fact-checking expert. Return only valid JSON."
 
 class SummarizeAgent:
     """Agent 7: LLM-powered summarization with confidence scoring"""
@@ -31,32 +39,184 @@ class SummarizeAgent:
             }
         """
         
-        # Get claim
-        claim = claims_collection.find_one({"_id": claim_id})
-        if not claim:
-            raise ValueError("Claim not found")
+        claim, fact_checks, evidence = self._load_inputs(claim_id)
         
-        # Get fact-checks
-        fact_checks = list(fact_checks_collection.find({"claim_id": claim_id}))
-        
-        # Get evidence
-        evidence = list(evidence_collection.find({"claim_id": claim_id}))
+        # Reuse the summary of a recent near-duplicate claim if there is one
+        embedding, source_urls, reused = self._semantic_lookup(claim, fact_checks, evidence)
+        if reused:
+            return reused
         
         # Build LLM prompt
-        prompt = self._build_prompt(claim, fact_checks, evidence)
+        prompt, prompt_stats = self._build_prompt(claim, fact_checks, evidence)
         
         # Call LLM
         try:
             response = llm_client.generate(
                 prompt=prompt,
-                system_prompt="You are a fact-checking expert. Return only valid JSON.",
-                response_format="json"
+                system_prompt=SYSTEM_PROMPT,
+                response_format="json",
+                validate=self._parse_llm_response
             )
             llm_result = self._parse_llm_response(response)
         except Exception as e:
             print(f"⚠️  LLM call failed: {e}")
             # Fallback to rule-based summary
             llm_result = self._generate_fallback_summary(claim, fact_checks, evidence)
+            embedding = None
+        
+        summary = self._build_summary(llm_result, fact_checks, evidence, embedding, source_urls,
+                                      claim['normalized_claim'])
+        summary['metadata']['prompt'] = prompt_stats
+        return summary
+    
+    async def asummarize(self, claim_id: ObjectId, on_partial=None) -> Dict[str, Any]:
+        """
+        Async version of summarize(); the event loop stays free during the LLM call
+        
+        Args:
+            claim_id: Claim to summarize
+            on_partial: Optional coroutine function called once with a provisional
+                {"short_explanation", "confidence"} while the response streams
+        """
+        
+        claim, fact_checks, evidence = await asyncio.to_thread(self._load_inputs, claim_id)
+        
+        embedding, source_urls, reused = await asyncio.to_thread(
+            self._semantic_lookup, claim, fact_checks, evidence
+        )
+        if reused:
+            return reused
+        
+        prompt, prompt_stats = self._build_prompt(claim, fact_checks, evidence)
+        
+        try:
+            if on_partial and settings.llm_streaming_enabled:
+                response = await self._stream_response(prompt, fact_checks, evidence, on_partial)
+            else:
+                response = await llm_client.agenerate(
+                    prompt=prompt,
+                    system_prompt=SYSTEM_PROMPT,
+                    response_format="json",
+                    validate=self._parse_llm_response
+                )
+            llm_result = self._parse_llm_response(response)
+        except Exception as e:
+            print(f"⚠️  LLM call failed: {e}")
+            llm_result = self._generate_fallback_summary(claim, fact_checks, evidence)
+            embedding = None
+        
+        summary = self._build_summary(llm_result, fact_checks, evidence, embedding, source_urls,
+                                      claim['normalized_claim'])
+        summary['metadata']['prompt'] = prompt_stats
+        return summary
+    
+    async def _stream_response(self, prompt: str, fact_checks: List[Dict], evidence: List[Dict],
+                               on_partial) -> str:
+        """
+        Stream the LLM response, calling on_partial as soon as the explanation
+        and confidence have arrived (top_sources is usually still generating)
+        """
+        
+        parser = IncrementalJSONParser()
+        published = False
+        
+        async for chunk in llm_client.astream(
+            prompt=prompt,
+            system_prompt=SYSTEM_PROMPT,
+            response_format="json",
+            validate=self._parse_llm_response
+        ):
+            parser.feed(chunk)
+            fields = parser.fields
+            
+            if not published and 'short_explanation' in fields and 'confidence' in fields:
+                published = True
+                try:
+                    llm_confidence = max(0.0, min(1.0, float(fields['confidence'])))
+                except (TypeError, ValueError):
+                    llm_confidence = 0.5
+                
+                await on_partial({
+                    "short_explanation": fields['short_explanation'],
+                    "confidence": min(llm_confidence, self._calculate_confidence(fact_checks, evidence))
+                })
+        
+        return parser.buffer
+    
+    def _semantic_lookup(self, claim: Dict, fact_checks: List[Dict], evidence: List[Dict]):
+        """
+        Look for a recent summary of a paraphrased claim with overlapping evidence
+        
+        Returns:
+            (claim embedding, source URLs, reused summary or None)
+        """
+        
+        source_urls = sorted(
+            {fc['url'] for fc in fact_checks} | {ev['source_url'] for ev in evidence}
+        )
+        
+        try:
+            embedding = semantic_cache.embed(claim['normalized_claim'])
+            match = semantic_cache.lookup(embedding, source_urls, claim['normalized_claim'])
+        except Exception as e:
+            print(f"⚠️  Semantic cache lookup failed: {e}")
+            return None, source_urls, None
+        
+        if not match:
+            return embedding, source_urls, None
+        
+        prior, similarity = match
+        print(f"♻️  Reusing summary of claim {prior['claim_id']} (similarity {similarity:.3f})")
+        
+        # Re-score the prior verdict against this claim's own evidence; sources
+        # that are not in it are dropped rather than flagged as hallucinations
+        valid_urls = set(source_urls)
+        llm_result = {
+            "short_explanation": prior.get('short_explanation', ''),
+            "confidence": prior.get('llm_confidence', 0.5),
+            "top_sources": [s for s in prior.get('top_sources', []) if s.get('url') in valid_urls]
+        }
+        
+        summary = self._build_summary(llm_result, fact_checks, evidence)
+        summary['metadata'].update({
+            "model_used": "semantic_cache",
+            "reused_from_claim": prior['claim_id'],
+            "semantic_similarity": similarity
+        })
+        return embedding, source_urls, summary
+    
+    def _load_inputs(self, claim_id: ObjectId):
+        """Read the claim, its fact-checks and its evidence"""
+        
+        # Get claim
+        claim = claims_collection.find_one({"_id": claim_id})
+        if not claim:
+            raise ValueError("Claim not found")
+        
+        # Get fact-checks
+        fact_checks = list(fact_checks_collection.find({"claim_id": claim_id}))
+        
+        # Get evidence
+        evidence = list(evidence_collection.find({"claim_id": claim_id}))
+        
+        return claim, fact_checks, evidence
+    
+    def _build_summary(
+        self,
+        llm_result: Dict[str, Any],
+        fact_checks: List[Dict],
+        evidence: List[Dict],
+        embedding=None,
+        source_urls: List[str] = None,
+        normalized_claim: str = None
+    ) -> Dict[str, Any]:
+        """
+        Combine the LLM verdict with the calculated confidence
+        
+        Passing the claim embedding (and normalized claim text) makes the saved
+        summary reusable by the semantic cache; leave it out for fallback or
+        reused summaries.
+        """
         
         # Calculate confidence using formula
         calculated_confidence = self._calculate_confidence(fact_checks, evidence)
@@ -81,7 +241,7 @@ class SummarizeAgent:
             final_confidence *= 0.8
             print(f"⚠️  Hallucination detected, confidence reduced to {final_confidence:.2f}")
         
-        return {
+        summary = {
             "short_explanation": llm_result.get('short_explanation', ''),
             "confidence": final_confidence,
             "calculated_confidence": calculated_confidence,
@@ -94,16 +254,33 @@ class SummarizeAgent:
                 "model_used": llm_client.provider or "fallback"
             }
         }
+        
+        if embedding is not None:
+            summary["claim_embedding"] = embedding.tolist()
+            summary["source_urls"] = source_urls or []
+            summary["normalized_claim"] = normalized_claim or ""
+        
+        return summary
     
     def _build_prompt(
         self,
         claim: Dict,
         fact_checks: List[Dict],
         evidence: List[Dict]
-    ) -> str:
-        """Build structured prompt for LLM"""
+    ) -> Tuple[str, Dict[str, int]]:
+        """
+        Build structured prompt for LLM within the model's token budget
+        
+        Fact-checks and instructions are always included. Evidence is ranked
+        by relevance to the claim and source reliability, near-identical
+        snippets are dropped, and the best items are packed into the tokens
+        left over.
         
-        prompt = f"""You are a fact-checking summarization expert. Analyze the claim and all evidence to provide a concise summary.
+        Returns:
+            (prompt, token stats)
+        """
+        
+        header = f"""You are a fact-checking summarization expert. Analyze the claim and all evidence to provide a concise summary.
 
 OUTPUT REQUIREMENTS:
 - Return ONLY valid JSON
@@ -128,26 +305,15 @@ CLAIM:
         
         # Add fact-check results
         if fact_checks:
-            prompt += "\nAUTHORITATIVE FACT-CHECKS:\n"
+            header += "\nAUTHORITATIVE FACT-CHECKS:\n"
             for fc in fact_checks:
-                prompt += f"\n- {fc['api_name']}: {fc['verdict']}"
-                prompt += f"\n  Summary: {fc['summary'][:200]}"
-                prompt += f"\n  Source: {fc['url']}\n"
+                header += f"\n- {fc['api_name']}: {fc['verdict']}"
+                header += f"\n  Summary: {truncate(fc['summary'], 200)}"
+                header += f"\n  Source: {fc['url']}\n"
         else:
-            prompt += "\nNo authoritative fact-checks found.\n"
+            header += "\nNo authoritative fact-checks found.\n"
         
-        # Add web evidence
-        if evidence:
-            prompt += "\nWEB EVIDENCE:\n"
-            for i, ev in enumerate(evidence[:15], 1):  # Limit to top 15
-                prompt += f"\n{i}. [{ev['supports_claim'].upper()}] {ev['title']}"
-                prompt += f"\n   Reliability: {ev['reliability_score']:.2f}"
-                prompt += f"\n   URL: {ev['source_url']}"
-                prompt += f"\n   Snippet: {ev['snippet'][:150]}...\n"
-        else:
-            prompt += "\nNo web evidence collected.\n"
-        
-        prompt += """
+        footer = """
 INSTRUCTIONS:
 1. Analyze all evidence carefully
 2. Determine if claim is TRUE, FALSE, MISLEADING, or UNVERIFIED
@@ -164,7 +330,46 @@ INSTRUCTIONS:
 Return ONLY the JSON object, nothing else.
 """
         
-        return prompt
+        budget = token_budget(llm_client.model)
+        fixed_tokens = count_tokens(header) + count_tokens(footer) + count_tokens("\nWEB EVIDENCE:\n")
+        blocks = [
+            f"[{ev['supports_claim'].upper()}] {ev['title']}"
+            f"\n   Reliability: {ev['reliability_score']:.2f}"
+            f"\n   URL: {ev['source_url']}"
+            f"\n   Snippet: {truncate(ev['snippet'], 300)}\n\n"
+            for ev in self._rank_evidence(claim['normalized_claim'], evidence)
+        ]
+        kept, evidence_tokens = pack(blocks, max(0, budget - fixed_tokens), numbered=True)
+        
+        # Add web evidence
+        if kept:
+            body = "\nWEB EVIDENCE:\n\n" + "".join(kept)
+        else:
+            body = "\nNo web evidence collected.\n"
+        
+        prompt = header + body + footer
+        stats = {
+            "budget": budget,
+            "tokens": count_tokens(prompt),
+            "evidence_tokens": evidence_tokens,
+            "evidence_included": len(kept),
+            "evidence_candidates": len(evidence)
+        }
+        print(f"✓ Prompt: {stats['tokens']}/{budget} tokens, {len(kept)}/{len(evidence)} evidence items")
+        
+        return prompt, stats
+    
+    def _rank_evidence(self, claim_text: str, evidence: List[Dict]) -> List[Dict]:
+        """Most relevant and reliable evidence first, near-duplicate snippets removed"""
+        
+        def score(ev):
+            return 0.6 * relevance(claim_text, f"{ev['title']} {ev['snippet']}") + 0.4 * ev['reliability_score']
+        
+        ranked = []
+        for ev in sorted(evidence, key=score, reverse=True):
+            if not any(near_duplicate(ev['snippet'], kept['snippet']) for kept in ranked):
+                ranked.append(ev)
+        return ranked
     
     def _parse_llm_response(self, response: str) -> Dict[str, Any]:
         """Parse and validate LLM JSON response"""
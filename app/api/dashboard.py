@@ -6,9 +6,18 @@ from fastapi import APIRouter
 from app.agents.rtr_aggregator import DashboardAggregator
 from app.agents.rtr_stream import EventStreamManager
 from app.config import settings
+from app.metrics import metrics
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
+# Cache name -> counter labelled result="hit..."/"miss"
+CACHE_METRICS = {
+    "llm": "satya_llm_cache_requests_total",
+    "semantic": "satya_semantic_cache_requests_total",
+    "page": "satya_page_cache_requests_total",
+    "ocr": "satya_ocr_cache_requests_total"
+}
+
 aggregator = DashboardAggregator()
 stream_manager = EventStreamManager(settings.redis_url)
 
@@ -41,3 +50,22 @@ async def get_emerging_threats(threshold: float = 0.7):
 async def get_recent_events(count: int = 50):
     """Get recent events from stream"""
     return stream_manager.get_recent_events(count)
+
+@router.get("/cache-stats")
+async def get_cache_stats():
+    """Get lookups, hits and hit rate of each cache"""
+    stats = {}
+    for name, metric in CACHE_METRICS.items():
+        results = {
+            label.split('"')[1]: value
+            for label, value in metrics.counter_values(metric).items()
+        }
+        total = sum(results.values())
+        misses = results.get("miss", 0)
+        stats[name] = {
+            "lookups": int(total),
+            "hits": int(total - misses),
+            "hit_rate": round((total - misses) / total, 3) if total else None,
+            "by_result": {result: int(value) for result, value in results.items()}
+        }
+    return stats
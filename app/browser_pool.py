@@ -0,0 +1,175 @@
+"""
+Browser Pool
+Long-lived headless Chromium with a bounded set of reusable contexts
+
+Launching Chromium per URL costs seconds and hundreds of MB. The pool keeps
+one browser per event loop (so the async worker shares it across every
+submission), hands out pages from at most browser_pool_size contexts, and
+closes a context after browser_context_max_pages pages to cap memory.
+Images, media, fonts and ad/tracker requests are aborted at the network layer.
+"""
+
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+from app.config import settings
+from app.metrics import metrics
+
+# Try to import Playwright, but make it optional (it is not in the slim image)
+try:
+    from playwright.async_api import async_playwright
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    PLAYWRIGHT_AVAILABLE = False
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+
+AD_HOSTS = (
+    "doubleclick.net", "googlesyndication.com", "googleadservices.com",
+    "google-analytics.com", "googletagmanager.com", "amazon-adsystem.com",
+    "adnxs.com", "taboola.com", "outbrain.com", "scorecardresearch.com",
+    "criteo.com", "facebook.net", "chartbeat.com", "quantserve.com"
+)
+
+# True once the article body has rendered (or the page clearly has content)
+READY_SCRIPT = '''() => {
+    const article = document.querySelector('article, [role="article"], main, .article-content, .story-content');
+    if (article && article.innerText.length > 200) {
+        return true;
+    }
+    return document.body !== null && document.body.innerText.length > 1000;
+}'''
+
+def is_ad_host(url: str) -> bool:
+    host = (urlsplit(url).hostname or "").lower()
+    return any(host == ad or host.endswith("." + ad) for ad in AD_HOSTS)
+
+async def _block_heavy_requests(route):
+    """Abort images, fonts, media and ads; let everything else through"""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or is_ad_host(request.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+class _LoopBrowser:
+    """Browser, idle contexts and the context limit for one event loop"""
+
+    def __init__(self, size: int):
+        self.playwright = None
+        self.browser = None
+        self.idle = []  # [(context, pages served)]
+        self.semaphore = asyncio.Semaphore(size)
+        self.lock = asyncio.Lock()
+
+class BrowserPool:
+    """Reusable Chromium contexts, bounded and recycled"""
+
+    def __init__(self, size: int, max_pages: int):
+        self.size = size
+        self.max_pages = max_pages
+        self._loops = weakref.WeakKeyDictionary()  # loop -> _LoopBrowser
+
+    @asynccontextmanager
+    async def page(self):
+        """
+        A fresh page in a pooled context; waits while all contexts are busy
+
+        Raises:
+            RuntimeError: if Playwright is not installed
+        """
+        if not PLAYWRIGHT_AVAILABLE:
+            raise RuntimeError("Playwright not installed")
+
+        state = self._state()
+        async with state.semaphore:
+            context, served = await self._acquire(state)
+            healthy = False
+            try:
+                page = await context.new_page()
+                try:
+                    yield page
+                    healthy = True
+                finally:
+                    await page.close()
+            finally:
+                await self._release(state, context, served + 1, healthy)
+
+    async def wait_until_ready(self, page):
+        """Wait for the article to render instead of sleeping a fixed time"""
+        try:
+            await page.wait_for_function(
+                READY_SCRIPT,
+                polling=100,
+                timeout=settings.browser_ready_timeout_ms
+            )
+        except Exception:
+            pass  # Use whatever has rendered by now
+
+    async def close(self):
+        """Close the running loop's browser (call before the loop shuts down)"""
+        state = self._loops.pop(asyncio.get_running_loop(), None)
+        if state is None or state.playwright is None:
+            return
+
+        try:
+            for context, _ in state.idle:
+                await context.close()
+            await state.browser.close()
+        finally:
+            await state.playwright.stop()
+
+    def _state(self) -> _LoopBrowser:
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            state = _LoopBrowser(self.size)
+            self._loops[loop] = state
+        return state
+
+    async def _acquire(self, state: _LoopBrowser):
+        """An idle context, or a new one (launching the browser if needed)"""
+        async with state.lock:
+            if state.browser is None or not state.browser.is_connected():
+                await self._launch(state)
+
+            if state.idle:
+                return state.idle.pop()
+
+            context = await state.browser.new_context(
+                user_agent=USER_AGENT,
+                java_script_enabled=True,
+                service_workers="block"
+            )
+            await context.route("**/*", _block_heavy_requests)
+            metrics.incr_nowait("satya_browser_contexts_total", event="created")
+            return context, 0
+
+    async def _release(self, state: _LoopBrowser, context, served: int, healthy: bool):
+        """Return a context to the pool, or close it once it has served enough pages"""
+        if healthy and served < self.max_pages and state.browser.is_connected():
+            state.idle.append((context, served))
+            return
+
+        metrics.incr_nowait("satya_browser_contexts_total", event="recycled" if healthy else "discarded")
+        try:
+            await context.close()
+        except Exception as e:
+            print(f"⚠️  Browser context close failed: {e}")
+
+    async def _launch(self, state: _LoopBrowser):
+        if state.playwright is None:
+            state.playwright = await async_playwright().start()
+
+        print("🌐 Launching pooled Chromium")
+        state.idle = []
+        state.browser = await state.playwright.chromium.launch(
+            headless=True,
+            args=["--disable-dev-shm-usage", "--disable-gpu"]
+        )
+
+# Create singleton
+browser_pool = BrowserPool(settings.browser_pool_size, settings.browser_context_max_pages)
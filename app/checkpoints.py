@@ -0,0 +1,42 @@
+"""
+Stage Checkpoints
+Persist each pipeline stage's outputs so a retried submission resumes
+from the first incomplete stage instead of repeating paid external calls
+"""
+
+from datetime import datetime
+from typing import Any, Dict
+from bson import ObjectId
+from app.database import checkpoints_collection
+
+class StageCheckpointStore:
+    """
+    Checkpoints for one submission, stored as a single document:
+
+        {"submission_id": ObjectId, "stages": {"extract": {...}, ...}, "updated_at": ...}
+    """
+
+    def __init__(self, submission_id: str):
+        self.submission_id = ObjectId(submission_id)
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Return {stage_name: outputs} for every completed stage"""
+        doc = checkpoints_collection.find_one({"submission_id": self.submission_id})
+        return doc.get("stages", {}) if doc else {}
+
+    def save(self, stage: str, outputs: Dict[str, Any]):
+        """Record a completed stage"""
+        checkpoints_collection.update_one(
+            {"submission_id": self.submission_id},
+            {
+                "$set": {
+                    f"stages.{stage}": outputs,
+                    "updated_at": datetime.utcnow()
+                }
+            },
+            upsert=True
+        )
+
+    def clear(self):
+        """Drop checkpoints once the submission has completed"""
+        checkpoints_collection.delete_one({"submission_id": self.submission_id})
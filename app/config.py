@@ -25,6 +25,77 @@ class Settings(BaseSettings):
     api_port: int = int(os.getenv("PORT", "8000"))
     debug: bool = os.getenv("DEBUG", "False").lower() == "true"
     
+    # Worker pool
+    worker_processes: int = 1  # Worker processes supervised by worker_simple
+    worker_concurrency: int = 2  # Concurrent submissions per worker process
+    worker_shutdown_timeout: int = 120  # Seconds to drain in-flight jobs on SIGTERM
+    worker_mode: str = "async"  # "async" (one long-lived event loop) or "thread" (asyncio.run per job)
+    worker_preload_models: bool = True  # Load models in the pool parent and fork warm children (copy-on-write)
+    
+    # Job queue
+    job_ttl_seconds: int = 86400  # Queued job records expire after this long
+    job_failed_ttl_seconds: int = 86400  # Failed job records are kept this long for inspection
+    
+    queue_lane_weights: str = "text:3,media:1"  # Weighted-fair share between lanes
+    queue_lane_concurrency: str = "text:2,media:1"  # Max concurrent jobs per lane, per worker process
+    
+    # Pipeline checkpoints
+    checkpoint_ttl_hours: int = 72  # Keep checkpoints of unfinished submissions this long
+    retry_stale_after_seconds: int = 900  # A "processing" submission older than this may be retried
+    
+    # Duplicate submissions
+    dedupe_ttl_hours: int = 24  # Reuse a completed result for identical input this recent (0 disables)
+    
+    # Shared HTTP session
+    http_pool_size: int = 100  # Max open connections per worker process
+    
+    # URL extraction
+    extraction_race_enabled: bool = True  # Race newspaper3k and BeautifulSoup concurrently (Playwright as fallback)
+    extraction_timeout_seconds: int = 15  # Per-method timeout
+    browser_pool_size: int = 2  # Playwright contexts per event loop (one shared Chromium)
+    browser_context_max_pages: int = 20  # Pages served before a context is closed and replaced
+    browser_ready_timeout_ms: int = 3000  # Max wait for the article to render after DOM ready
+    
+    # Page cache (raw HTML + parsed text of fetched articles, shared through Redis)
+    page_cache_enabled: bool = True
+    page_cache_ttl_seconds: int = 3600  # Serve without any request for this long
+    page_cache_max_age_seconds: int = 604800  # Keep stale pages this long for ETag/Last-Modified revalidation
+    page_cache_max_entries: int = 2000  # Least recently used pages beyond this are evicted
+    page_cache_max_page_bytes: int = 2000000  # Larger pages are never cached
+    
+    # OCR cache (by image content hash, plus perceptual hash for near-duplicates)
+    ocr_cache_enabled: bool = True
+    ocr_cache_ttl_days: int = 30  # Keep OCR text this long
+    ocr_cache_max_distance: int = 0  # Max differing bits of the 64-bit dHash (at most 3; -1 = exact bytes only)
+    ocr_cache_detail_max_bits: int = 4  # Perceptual matches: max differing bits per 4x4 tile of the 32x32 dHash
+    
+    # OCR backends
+    ocr_backend: str = "auto"  # "auto", "ocr_space" or "tesseract" (the other is still the fallback)
+    ocr_timeout_seconds: int = 60  # Per-image timeout, either backend
+    ocr_local_workers: int = 2  # Tesseract processes per worker process
+    ocr_tesseract_lang: str = "eng"
+    ocr_tesseract_config: str = "--oem 1 --psm 3"
+    ocr_remote_max_bytes: int = 1000000  # Larger images go to Tesseract (OCR.space free tier limit is 1 MB)
+    ocr_remote_slow_seconds: float = 10.0  # Use Tesseract while OCR.space's recent p50 is above this
+    ocr_remote_max_error_rate: float = 0.5  # ...or while its recent error rate is at or above this
+    ocr_remote_probe_interval: int = 10  # While skipped as slow, still send it every Nth image
+    ocr_routing_window: int = 20  # Recent calls per backend used for p50 / error rate
+    
+    # OCR image preprocessing (grayscale, downscale, re-encode before upload)
+    ocr_preprocess_enabled: bool = True
+    ocr_max_dimension: int = 2000  # Longest side in pixels after downscaling
+    ocr_image_format: str = "JPEG"  # JPEG, PNG or WEBP
+    ocr_image_quality: int = 85  # JPEG/WEBP quality
+    
+    # Stub LLM server (python -m app.stub_llm, load testing only)
+    stub_llm_port: int = 8100
+    stub_llm_seed: int = 42  # Same seed, same latencies and failures
+    stub_llm_latency_median: float = 2.0  # Seconds; log-normal around this median (0 = instant)
+    stub_llm_latency_sigma: float = 0.5  # Log-normal spread (larger = heavier tail)
+    stub_llm_latency_max: float = 60.0  # Cap on a single response's latency
+    stub_llm_error_rate: float = 0.0  # Share of requests answered with HTTP 500
+    stub_llm_rate_limit_rate: float = 0.0  # Share of requests answered with HTTP 429
+    
     # Security
     secret_key: str = "change-this-in-production"
     
@@ -41,10 +112,54 @@ class Settings(BaseSettings):
     openrouter_model: str = "openai/gpt-4o-mini:free"
     openrouter_site_url: str = "https://satyamatrix.onrender.com"
     openrouter_site_name: str = "SatyaMatrix-FactChecker"
+    openrouter_base_url: str = "https://openrouter.ai/api/v1"  # Point at app/stub_llm.py for load tests
     
     # Alternative LLM providers
     openai_api_key: str = ""
     gemini_api_key: str = ""
+    openai_base_url: str = ""  # Empty = OpenAI default; any OpenAI-compatible server works
+    
+    # LLM connection pools (one keep-alive pool per provider, per process)
+    openrouter_pool_size: int = 20  # Max connections to OpenRouter
+    openai_pool_size: int = 20  # Max connections to OpenAI
+    llm_http2: bool = True  # Use HTTP/2 when the h2 package is installed
+    llm_keepalive_seconds: int = 120  # Idle pooled connections are closed after this long
+    llm_max_concurrency: int = 8  # In-flight async LLM calls per provider, per event loop
+    llm_streaming_enabled: bool = True  # Stream Agent 7 responses and publish a provisional verdict
+    
+    # LLM rate limits (shared by all workers through Redis; providers not listed are unlimited)
+    llm_requests_per_minute: str = "openrouter:20,openai:500,gemini:60"
+    llm_tokens_per_minute: str = "openrouter:40000,openai:90000,gemini:32000"  # 0 = no token budget
+    llm_completion_token_estimate: int = 500  # Completion tokens charged per call up front
+    llm_rate_limit_max_wait_seconds: int = 60  # Longer estimated waits fail over to another provider
+    llm_rate_limit_retries: int = 2  # Retries after a 429 (each waits out the shared cooldown)
+    llm_rate_limit_cooldown_seconds: int = 10  # Cooldown after a 429 without Retry-After
+    
+    # LLM provider routing (every provider with an API key takes part)
+    llm_routing_window: int = 50  # Recent calls per provider used for p50/p95/error rate
+    llm_max_error_rate: float = 0.5  # Providers at or above this error rate are used last
+    llm_health_min_samples: int = 5  # Calls needed before a provider can be judged unhealthy
+    llm_probe_interval: int = 20  # While a provider is unhealthy, still try it first every Nth request
+    llm_hedging_enabled: bool = True  # Race a second provider once the first exceeds its p95
+    llm_hedge_min_samples: int = 10  # Calls needed before a provider's p95 is trusted for hedging
+    
+    # Prompt token budgets
+    prompt_token_budget: int = 3000  # Default prompt budget for SummarizeAgent
+    prompt_token_budgets: str = "gpt-4:6000,gemini-pro:8000"  # Per-model overrides ("model:tokens,...")
+    
+    # LLM response cache
+    llm_cache_enabled: bool = True  # Reuse responses for identical prompts
+    llm_cache_ttl_seconds: int = 86400  # Shared (Redis) tier TTL
+    llm_cache_local_ttl_seconds: int = 3600  # In-process LRU tier TTL
+    llm_cache_max_entries: int = 512  # In-process LRU size, per process
+    
+    # Semantic summary cache (near-duplicate claims)
+    semantic_cache_enabled: bool = True  # Reuse summaries of paraphrased claims
+    semantic_cache_max_distance: float = 0.08  # Max cosine distance between normalized claims
+    semantic_cache_min_evidence_overlap: float = 0.5  # Min Jaccard overlap of source URLs
+    semantic_cache_ttl_hours: int = 24  # Only reuse summaries this recent
+    semantic_cache_max_entries: int = 5000  # Embeddings kept in memory, per process
+    semantic_cache_refresh_overlap_seconds: int = 60  # Re-read this far behind the newest summary seen (late commits, clock skew)
     
     # Neo4j Configuration (Phase 1 & 3)
     neo4j_uri: str = ""
@@ -60,6 +175,7 @@ class Settings(BaseSettings):
     nri_enable_narrative_classification: bool = True
     nri_enable_corrective_messaging: bool = True
     nri_narrative_confidence_threshold: float = 0.7
+    nri_fused_mode: bool = False  # One LLM call for classification + messaging (split path on parse failure)
     
     # CRG Settings (Phase 3)
     crg_enable_trust_scoring: bool = True
@@ -26,6 +26,7 @@ fact_checks_collection = db.fact_checks
 evidence_collection = db.evidence
 summaries_collection = db.summaries
 reports_collection = db.reports
+checkpoints_collection = db.checkpoints
 
 # Async collections
 async_submissions = async_db.submissions
@@ -42,6 +43,7 @@ def init_db():
     # Submissions indexes
     submissions_collection.create_index("status")
     submissions_collection.create_index("created_at")
+    submissions_collection.create_index([("content_hash", 1), ("completed_at", -1)])
     
     # Claims indexes
     claims_collection.create_index("submission_id")
@@ -58,10 +60,18 @@ def init_db():
     
     # Summaries indexes
     summaries_collection.create_index("claim_id", unique=True)
+    summaries_collection.create_index("created_at")
     
     # Reports indexes
     reports_collection.create_index("claim_id", unique=True)
     
+    # Stage checkpoints (abandoned ones expire)
+    checkpoints_collection.create_index("submission_id", unique=True)
+    checkpoints_collection.create_index(
+        "updated_at",
+        expireAfterSeconds=settings.checkpoint_ttl_hours * 3600
+    )
+    
     print("✅ Database indexes created successfully")
 
 def test_connection():
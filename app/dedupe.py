@@ -0,0 +1,90 @@
+"""
+Duplicate Submissions
+Canonical content hashes so verbatim repeats of a claim reuse a recent result
+
+Viral claims arrive many times unchanged. /check hashes the input and, if a
+submission with the same hash completed within dedupe_ttl_hours, links the
+new submission to it instead of running the pipeline again.
+"""
+
+import hashlib
+import re
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from app.config import settings
+
+# Query parameters that only track where a link was shared from
+TRACKING_PARAMS = {"fbclid", "gclid", "igshid", "mc_cid", "mc_eid", "ref", "ref_src", "si"}
+
+def normalize_text(text: str) -> str:
+    """Unicode-normalize, casefold and collapse whitespace"""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return re.sub(r"\s+", " ", text).strip()
+
+def canonical_url(url: str) -> str:
+    """
+    Canonical form of a URL: lowercase scheme and host, no default port,
+    fragment or tracking parameters, sorted query, no trailing slash
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and (scheme, parts.port) not in [("http", 80), ("https", 443)]:
+        host = f"{host}:{parts.port}"
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+def content_hash(input_type: str, value) -> str:
+    """
+    Hash a submission's input
+
+    Args:
+        input_type: "text", "url" or "image"
+        value: Claim text, URL, or raw image bytes
+
+    Returns:
+        "<input_type>:<sha256 hex>"
+    """
+    if input_type == "image":
+        data = value
+    elif input_type == "url":
+        data = canonical_url(value).encode("utf-8")
+    else:
+        data = normalize_text(value).encode("utf-8")
+
+    return f"{input_type}:{hashlib.sha256(data).hexdigest()}"
+
+async def find_recent_result(submissions, hash_value: str) -> Optional[Dict]:
+    """
+    Latest original submission with this hash that completed recently
+
+    Only originals are matched (not earlier duplicates), so the freshness
+    window always counts from when the pipeline actually ran.
+
+    Args:
+        submissions: Async submissions collection
+        hash_value: Result of content_hash()
+    """
+    if settings.dedupe_ttl_hours <= 0:
+        return None
+
+    fresh_after = datetime.utcnow() - timedelta(hours=settings.dedupe_ttl_hours)
+    return await submissions.find_one(
+        {
+            "content_hash": hash_value,
+            "status": "completed",
+            "duplicate_of": {"$exists": False},
+            "completed_at": {"$gte": fresh_after}
+        },
+        sort=[("completed_at", -1)]
+    )
@@ -0,0 +1,58 @@
+"""
+Shared HTTP Session
+One pooled aiohttp ClientSession per event loop, reused by every agent
+"""
+
+import asyncio
+import weakref
+import aiohttp
+from app.config import settings
+from app.metrics import record_external_call, record_external_bytes
+
+# Sessions are bound to the loop that created them
+_sessions = weakref.WeakKeyDictionary()
+
+def get_http_session() -> aiohttp.ClientSession:
+    """
+    Get the keep-alive session for the running event loop
+
+    In the async worker the loop lives for the whole process, so connections
+    (and DNS lookups) are shared across every submission it processes.
+    """
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=settings.http_pool_size,
+            ttl_dns_cache=300
+        )
+        session = aiohttp.ClientSession(
+            connector=connector,
+            trace_configs=[_span_trace_config()]
+        )
+        _sessions[loop] = session
+
+    return session
+
+def _span_trace_config() -> aiohttp.TraceConfig:
+    """Count requests and response bytes against the current stage span"""
+    trace_config = aiohttp.TraceConfig()
+
+    async def on_request_end(session, ctx, params):
+        record_external_call()
+
+    async def on_response_chunk_received(session, ctx, params):
+        record_external_bytes(len(params.chunk))
+
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_response_chunk_received.append(on_response_chunk_received)
+    return trace_config
+
+async def close_http_session():
+    """Close the running loop's session (call before the loop shuts down)"""
+    loop = asyncio.get_running_loop()
+    session = _sessions.pop(loop, None)
+
+    if session is not None and not session.closed:
+        await session.close()
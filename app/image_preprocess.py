@@ -0,0 +1,67 @@
+"""
+Image Preprocessing
+Shrinks uploaded images before OCR
+
+Phone screenshots are often several MB, and uploading them dominates OCR
+latency. Images are decoded, rotated upright, stripped of metadata,
+converted to grayscale, downscaled to ocr_max_dimension and re-encoded.
+This is CPU work, so call it from a worker thread, never on the event loop.
+"""
+
+import io
+import time
+from typing import Dict, Tuple
+from PIL import Image, ImageOps
+from app.config import settings
+from app.metrics import metrics
+
+FORMAT_EXTENSIONS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp"}
+
+def preprocess_for_ocr(data: bytes) -> Tuple[bytes, Dict]:
+    """
+    Shrink an image for OCR
+
+    Args:
+        data: Uploaded image bytes
+
+    Returns:
+        (bytes to send, stats). The original bytes are returned unchanged
+        if the image can't be decoded or re-encoding would not make it smaller.
+    """
+    started = time.perf_counter()
+    fmt = settings.ocr_image_format.upper()
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            # Apply the EXIF orientation before the metadata is dropped
+            image = ImageOps.exif_transpose(image).convert("L")
+            original_size = image.size
+            image.thumbnail((settings.ocr_max_dimension, settings.ocr_max_dimension), Image.LANCZOS)
+
+            buffer = io.BytesIO()
+            if fmt == "PNG":
+                image.save(buffer, fmt, optimize=True)
+            else:
+                image.save(buffer, fmt, quality=settings.ocr_image_quality, optimize=True)
+            processed = buffer.getvalue()
+    except Exception as e:
+        print(f"⚠️  Image preprocessing failed, sending original: {e}")
+        return data, {"preprocessed": False, "original_bytes": len(data), "processed_bytes": len(data)}
+
+    elapsed = time.perf_counter() - started
+    used = len(processed) < len(data)
+    stats = {
+        "preprocessed": used,
+        "original_bytes": len(data),
+        "processed_bytes": len(processed) if used else len(data),
+        "original_size": list(original_size),
+        "processed_size": list(image.size),
+        "format": FORMAT_EXTENSIONS.get(fmt, fmt.lower()) if used else None,
+        "preprocess_seconds": round(elapsed, 3)
+    }
+
+    metrics.observe("satya_ocr_preprocess_seconds", elapsed)
+    if used:
+        metrics.incr("satya_ocr_preprocess_bytes_saved_total", len(data) - len(processed))
+
+    return (processed if used else data), stats
@@ -0,0 +1,208 @@
+"""
+Job Queue
+Compact Redis queue protocol for submission jobs, split into priority lanes
+
+    satya:queue:<lane>   list of job ids (RPUSH / LPOP)
+    satya:job:<id>       JSON job record, expires after job_ttl_seconds
+
+Text claims go to the "text" lane; image and URL claims (OCR round trips,
+scraping fallbacks) go to the slower "media" lane so a burst of them cannot
+starve quick text checks. Workers dequeue with weighted-fair lane selection
+and per-lane concurrency limits (see LaneScheduler).
+
+A job record is deleted once the job finishes, and failed jobs keep a short
+lived record for inspection, so Redis memory no longer grows per submission.
+Enqueue and dequeue move many jobs per round trip.
+"""
+
+import json
+import time
+import uuid
+from typing import Dict, List, Optional
+from app.config import settings
+
+QUEUE_PREFIX = "satya:queue:"
+JOB_PREFIX = "satya:job:"
+
+# Pop up to ARGV[1] ids and return them interleaved with their job records
+DEQUEUE_SCRIPT = """
+local ids = redis.call('LPOP', KEYS[1], ARGV[1])
+if not ids then return {} end
+local out = {}
+for _, id in ipairs(ids) do
+    out[#out + 1] = id
+    out[#out + 1] = redis.call('GET', ARGV[2] .. id) or false
+end
+return out
+"""
+
+def parse_lane_setting(value: str) -> Dict[str, int]:
+    """Parse "text:3,media:1" into {"text": 3, "media": 1}"""
+    lanes = {}
+    for item in value.split(","):
+        if ":" in item:
+            lane, number = item.split(":", 1)
+            lanes[lane.strip()] = int(number)
+    return lanes
+
+def lane_for(input_type: str) -> str:
+    """Pick the queue lane for a submission input type"""
+    return "text" if input_type == "text" else "media"
+
+def queue_key(lane: str) -> str:
+    return f"{QUEUE_PREFIX}{lane}"
+
+def new_job(submission_id: str, lane: str) -> Dict:
+    """Build a job record"""
+    return {
+        "id": uuid.uuid4().hex,
+        "submission_id": submission_id,
+        "lane": lane,
+        "enqueued_at": time.time()
+    }
+
+def encode_job(job: Dict) -> str:
+    return json.dumps(job, separators=(",", ":"))
+
+def decode_job(raw) -> Dict:
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8")
+    return json.loads(raw)
+
+def _decode_pairs(reply) -> List[Dict]:
+    """Turn [id, record, id, record, ...] into job dicts, skipping expired records"""
+    jobs = []
+    for i in range(0, len(reply or []), 2):
+        job_id, raw = reply[i], reply[i + 1]
+        if raw:
+            jobs.append(decode_job(raw))
+        else:
+            print(f"⚠️  Job record expired before dequeue: {job_id}")
+    return jobs
+
+def _decode_id(value) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+class LaneScheduler:
+    """
+    Smooth weighted round-robin over lanes that still have capacity
+
+    With weights text:3, media:1 and both lanes busy, three text jobs are
+    started for every media job; an idle lane's share goes to the others.
+    """
+
+    def __init__(self, weights: Dict[str, int], limits: Dict[str, int]):
+        self.weights = weights
+        self.limits = limits
+        self.current = {lane: 0 for lane in weights}
+
+    @property
+    def lanes(self) -> List[str]:
+        return list(self.weights)
+
+    def free_slots(self, lane: str, in_flight: Dict[str, int]) -> int:
+        return self.limits.get(lane, 1) - in_flight.get(lane, 0)
+
+    def order(self, in_flight: Dict[str, int]) -> List[str]:
+        """Lanes with free capacity, the fair-share winner first"""
+        eligible = [lane for lane in self.weights if self.free_slots(lane, in_flight) > 0]
+        if not eligible:
+            return []
+
+        total = sum(self.weights[lane] for lane in eligible)
+        for lane in eligible:
+            self.current[lane] += self.weights[lane]
+
+        winner = max(eligible, key=lambda lane: self.current[lane])
+        self.current[winner] -= total
+
+        return [winner] + [lane for lane in eligible if lane != winner]
+
+def lane_scheduler_from_settings() -> LaneScheduler:
+    return LaneScheduler(
+        parse_lane_setting(settings.queue_lane_weights),
+        parse_lane_setting(settings.queue_lane_concurrency)
+    )
+
+class JobQueue:
+    """Synchronous queue client (API and thread-mode workers)"""
+
+    def __init__(self, redis_conn):
+        self.redis = redis_conn
+        self._dequeue = redis_conn.register_script(DEQUEUE_SCRIPT)
+
+    def enqueue(self, submission_id: str, lane: str = "text") -> Dict:
+        """Enqueue a single submission"""
+        return self.enqueue_many([submission_id], lane)[0]
+
+    def enqueue_many(self, submission_ids: List[str], lane: str = "text") -> List[Dict]:
+        """Enqueue several submissions into one lane in one round trip"""
+        jobs = [new_job(submission_id, lane) for submission_id in submission_ids]
+        if not jobs:
+            return []
+
+        pipe = self.redis.pipeline(transaction=False)
+        for job in jobs:
+            pipe.set(f"{JOB_PREFIX}{job['id']}", encode_job(job), ex=settings.job_ttl_seconds)
+        pipe.rpush(queue_key(lane), *[job["id"] for job in jobs])
+        pipe.execute()
+
+        return jobs
+
+    def dequeue_many(self, lane: str, count: int) -> List[Dict]:
+        """Pop up to `count` jobs and their records from a lane in one round trip"""
+        return _decode_pairs(self._dequeue(keys=[queue_key(lane)], args=[count, JOB_PREFIX]))
+
+    def wait_for_job(self, lanes: List[str], timeout: int = 1) -> List[Dict]:
+        """Block up to `timeout` seconds for the next job on any of `lanes`"""
+        popped = self.redis.blpop([queue_key(lane) for lane in lanes], timeout=timeout)
+        if not popped:
+            return []
+
+        job_id = _decode_id(popped[1])
+        return _decode_pairs([job_id, self.redis.get(f"{JOB_PREFIX}{job_id}")])
+
+    def finish(self, job: Dict, success: bool = True, error: Optional[str] = None):
+        """Drop a finished job; keep failed ones briefly for inspection"""
+        key = f"{JOB_PREFIX}{job['id']}"
+        if success:
+            self.redis.delete(key)
+        else:
+            job = dict(job, status="failed", error=error)
+            self.redis.set(key, encode_job(job), ex=settings.job_failed_ttl_seconds)
+
+    def depths(self, lanes: List[str]) -> Dict[str, int]:
+        """Queue depth per lane in one round trip"""
+        pipe = self.redis.pipeline(transaction=False)
+        for lane in lanes:
+            pipe.llen(queue_key(lane))
+        return dict(zip(lanes, pipe.execute()))
+
+class AsyncJobQueue:
+    """redis.asyncio counterpart of JobQueue (async-mode workers)"""
+
+    def __init__(self, redis_conn):
+        self.redis = redis_conn
+        self._dequeue = redis_conn.register_script(DEQUEUE_SCRIPT)
+
+    async def dequeue_many(self, lane: str, count: int) -> List[Dict]:
+        """See JobQueue.dequeue_many"""
+        return _decode_pairs(await self._dequeue(keys=[queue_key(lane)], args=[count, JOB_PREFIX]))
+
+    async def wait_for_job(self, lanes: List[str], timeout: int = 1) -> List[Dict]:
+        """See JobQueue.wait_for_job"""
+        popped = await self.redis.blpop([queue_key(lane) for lane in lanes], timeout=timeout)
+        if not popped:
+            return []
+
+        job_id = _decode_id(popped[1])
+        return _decode_pairs([job_id, await self.redis.get(f"{JOB_PREFIX}{job_id}")])
+
+    async def finish(self, job: Dict, success: bool = True, error: Optional[str] = None):
+        """See JobQueue.finish"""
+        key = f"{JOB_PREFIX}{job['id']}"
+        if success:
+            await self.redis.delete(key)
+        else:
+            job = dict(job, status="failed", error=error)
+            await self.redis.set(key, encode_job(job), ex=settings.job_failed_ttl_seconds)
@@ -0,0 +1,106 @@
+"""
+Incremental JSON Parser
+Emits the top-level fields of a streamed JSON object as soon as each value completes
+"""
+
+import json
+from typing import Any, Dict, List, Tuple
+
+class IncrementalJSONParser:
+    """
+    Feed it response chunks; it returns (field, value) pairs as they complete
+
+    Text before the first '{' (e.g. a markdown fence) is skipped. String,
+    object and array values are emitted at their closing character; numbers
+    and literals once the following ',' or '}' arrives. A value that does not
+    parse is skipped; the caller still parses the full response at the end.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+        self._pos = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = "key"  # key -> colon -> value -> comma -> key ...
+        self._key = None
+        self._start = None  # buffer index where the current key/value began
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consume a chunk and return the fields it completed"""
+        self.buffer += chunk
+        emitted = []
+
+        while self._pos < len(self.buffer) and not self.done:
+            ch = self.buffer[self._pos]
+
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                    self._depth = 1
+                self._pos += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect == "key":
+                        self._key = json.loads(self.buffer[self._start:self._pos + 1])
+                        self._expect = "colon"
+                    elif self._depth == 1 and self._expect == "value":
+                        self._emit(self._pos + 1, emitted)
+                self._pos += 1
+                continue
+
+            top_level_value = self._depth == 1 and self._expect == "value"
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect == "key":
+                    self._start = self._pos
+                elif top_level_value and self._start is None:
+                    self._start = self._pos
+            elif ch in "{[":
+                if top_level_value and self._start is None:
+                    self._start = self._pos
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._expect == "value":
+                    self._emit(self._pos + 1, emitted)
+                elif self._depth == 0:
+                    if self._expect == "value" and self._start is not None:
+                        self._emit(self._pos, emitted)
+                    self.done = True
+            elif self._depth == 1 and ch == ":" and self._expect == "colon":
+                self._expect = "value"
+                self._start = None
+            elif self._depth == 1 and ch == ",":
+                if self._expect == "value" and self._start is not None:
+                    self._emit(self._pos, emitted)
+                self._expect = "key"
+            elif top_level_value and self._start is None and not ch.isspace():
+                self._start = self._pos
+
+            self._pos += 1
+
+        return emitted
+
+    def _emit(self, end: int, emitted: List[Tuple[str, Any]]):
+        try:
+            value = json.loads(self.buffer[self._start:end])
+        except ValueError:
+            value = None
+        else:
+            self.fields[self._key] = value
+            emitted.append((self._key, value))
+
+        self._expect = "comma"
+        self._start = None
@@ -0,0 +1,107 @@
+"""
+LLM Response Cache
+Two-tier cache in front of LLMClient: an in-process LRU and a shared Redis tier
+
+Entries are keyed on (provider, model, system prompt, prompt, response_format),
+so a repeated summary or NRI classification prompt is answered without a
+paid model call. Like metrics, the cache must never break a call: Redis
+failures are logged and treated as misses.
+"""
+
+import json
+import time
+import hashlib
+import threading
+import redis
+from collections import OrderedDict
+from typing import Optional
+from app.config import settings
+from app.metrics import metrics
+
+KEY_PREFIX = "satya:llm:"
+
+def cache_key(provider: str, model: str, system_prompt: Optional[str], prompt: str,
+              response_format: Optional[str]) -> str:
+    """Stable hash of everything that determines an LLM response"""
+    payload = json.dumps(
+        [provider, model, system_prompt or "", prompt, response_format or ""],
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class LLMResponseCache:
+    """In-process LRU backed by a shared Redis tier, both with TTLs"""
+
+    def __init__(self, redis_url: str, max_entries: int, local_ttl: int, shared_ttl: int):
+        self.redis_url = redis_url
+        self.max_entries = max_entries
+        self.local_ttl = local_ttl
+        self.shared_ttl = shared_ttl
+        self._local = OrderedDict()  # key -> (expires_at, response)
+        self._lock = threading.Lock()
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = redis.from_url(self.redis_url, socket_connect_timeout=2)
+        return self._client
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response or None; counts hits per tier and misses"""
+        response = self._get_local(key)
+        if response is not None:
+            metrics.incr("satya_llm_cache_requests_total", result="hit_local")
+            return response
+
+        try:
+            raw = self.client.get(f"{KEY_PREFIX}{key}")
+        except Exception as e:
+            print(f"⚠️  LLM cache read failed: {e}")
+            raw = None
+
+        if raw is not None:
+            response = raw.decode("utf-8")
+            self._set_local(key, response)
+            metrics.incr("satya_llm_cache_requests_total", result="hit_shared")
+            return response
+
+        metrics.incr("satya_llm_cache_requests_total", result="miss")
+        return None
+
+    def set(self, key: str, response: str):
+        """Store a response in both tiers"""
+        if not response:
+            return
+
+        self._set_local(key, response)
+        try:
+            self.client.set(f"{KEY_PREFIX}{key}", response, ex=self.shared_ttl)
+        except Exception as e:
+            print(f"⚠️  LLM cache write failed: {e}")
+
+    def _get_local(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return entry[1]
+
+    def _set_local(self, key: str, response: str):
+        with self._lock:
+            self._local[key] = (time.monotonic() + self.local_ttl, response)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+
+# Create singleton
+llm_cache = LLMResponseCache(
+    settings.redis_url,
+    max_entries=settings.llm_cache_max_entries,
+    local_ttl=settings.llm_cache_local_ttl_seconds,
+    shared_ttl=settings.llm_cache_ttl_seconds
+)
@@ -1,27 +1,235 @@
-import requests
+import os
+import re
 import json
+import time
+import asyncio
+import threading
+import weakref
+import httpx
+from typing import Callable, Optional
 from app.config import settings
+from app.metrics import metrics, record_external_call, record_external_bytes
+from app.llm_cache import llm_cache, cache_key
+from app.llm_router import LatencyRouter
+from app.rate_limiter import rate_limiter, RateLimited, RateLimitExceeded, retry_after_seconds
+from app.prompt_builder import count_tokens
+
+OPENAI_MODEL = "gpt-4"
+GEMINI_MODEL = "gemini-pro"
+
+NO_PROVIDER_ERROR = "No LLM API key configured. Please add OPENROUTER_API_KEY, OPENAI_API_KEY, or GEMINI_API_KEY to .env"
+
+def json_validator(*required: str) -> Callable[[str], bool]:
+    """Response validator: the text contains a JSON object with every required field"""
+    def validate(response: str) -> bool:
+        match = re.search(r'\{.*\}', response, re.DOTALL)
+        if not match:
+            return False
+        data = json.loads(match.group())
+        return isinstance(data, dict) and all(field in data for field in required)
+    return validate
+
+def cacheable(response: str, response_format: Optional[str], validate: Optional[Callable]) -> bool:
+    """
+    True if a response may be cached
+
+    validate(response) must return truthy (raising counts as invalid); without
+    one, "json" responses must at least contain a JSON object. A bad reply is
+    never cached, so the next identical prompt asks the provider again.
+    """
+    if not response:
+        return False
+    if validate is None and response_format == "json":
+        validate = json_validator()
+    if validate is None:
+        return True
+    try:
+        ok = bool(validate(response))
+    except Exception:
+        ok = False
+    if not ok:
+        print("⚠️  Not caching an LLM response that failed validation")
+    return ok
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package (httpx[http2])"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+class ClientRegistry:
+    """
+    Long-lived provider clients, created on first use and reused by every call
+
+    Clients hold keep-alive connection pools, so they are never shared across
+    a fork: a child process that inherits the registry starts a fresh one.
+    """
+    
+    def __init__(self):
+        self._clients = {}
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+    
+    def get(self, name: str, factory):
+        """Return the client registered as `name`, building it with factory() once"""
+        if self._pid != os.getpid():
+            self._clients = {}
+            self._pid = os.getpid()
+        
+        client = self._clients.get(name)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(name)
+                if client is None:
+                    client = factory()
+                    self._clients[name] = client
+        return client
+    
+    def close(self):
+        """Close every pooled HTTP client (the registry can be reused afterwards)"""
+        with self._lock:
+            for client in self._clients.values():
+                if isinstance(client, httpx.Client):
+                    client.close()
+            self._clients = {}
+
+class AsyncClientRegistry:
+    """
+    Async provider clients and concurrency semaphores, one set per event loop
+
+    Async clients and semaphores are bound to the loop that created them, so
+    a thread-mode worker (asyncio.run per job) gets fresh ones per loop.
+    """
+    
+    def __init__(self):
+        self._loops = weakref.WeakKeyDictionary()  # loop -> {name: client}
+        self._semaphores = weakref.WeakKeyDictionary()  # loop -> {provider: Semaphore}
+    
+    def get(self, name: str, factory):
+        """Return the running loop's client registered as `name`"""
+        clients = self._loops.setdefault(asyncio.get_running_loop(), {})
+        if name not in clients:
+            clients[name] = factory()
+        return clients[name]
+    
+    def semaphore(self, provider: str) -> asyncio.Semaphore:
+        """Limit in-flight calls to one provider on the running loop"""
+        semaphores = self._semaphores.setdefault(asyncio.get_running_loop(), {})
+        if provider not in semaphores:
+            semaphores[provider] = asyncio.Semaphore(settings.llm_max_concurrency)
+        return semaphores[provider]
+    
+    async def aclose(self):
+        """Close the running loop's pooled HTTP clients"""
+        clients = self._loops.pop(asyncio.get_running_loop(), {})
+        for client in clients.values():
+            if isinstance(client, httpx.AsyncClient):
+                await client.aclose()
+
+def _pool_options(pool_size: int) -> dict:
+    return {
+        "http2": settings.llm_http2 and _http2_available(),
+        "limits": httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=settings.llm_keepalive_seconds
+        ),
+        "timeout": httpx.Timeout(120, connect=10)
+    }
+
+def pooled_http_client(pool_size: int, **kwargs) -> httpx.Client:
+    """Keep-alive httpx client, HTTP/2 when enabled and available"""
+    return httpx.Client(**_pool_options(pool_size), **kwargs)
+
+def pooled_async_http_client(pool_size: int, **kwargs) -> httpx.AsyncClient:
+    """Async counterpart of pooled_http_client"""
+    return httpx.AsyncClient(**_pool_options(pool_size), **kwargs)
+
+def _chat_messages(prompt: str, system_prompt: str = None) -> list:
+    messages = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+def _is_rate_limit(e: Exception) -> bool:
+    """429 from an SDK (OpenAI RateLimitError, Gemini ResourceExhausted)"""
+    return getattr(e, "status_code", None) == 429 or getattr(e, "code", None) == 429 \
+        or type(e).__name__ in ("RateLimitError", "ResourceExhausted")
+
+def _error_retry_after(e: Exception):
+    response = getattr(e, "response", None)
+    return retry_after_seconds(response.headers) if response is not None else None
+
+def _openrouter_url() -> str:
+    """Chat completions endpoint (openrouter_base_url can point at app/stub_llm.py)"""
+    return f"{settings.openrouter_base_url.rstrip('/')}/chat/completions"
+
+def _openrouter_headers() -> dict:
+    return {
+        "Authorization": f"Bearer {settings.openrouter_api_key}",
+        "HTTP-Referer": settings.openrouter_site_url,
+        "X-Title": settings.openrouter_site_name,
+        "Content-Type": "application/json"
+    }
 
 class LLMClient:
     """
     Universal LLM client supporting OpenRouter, OpenAI, and Gemini
+    
+    Every provider with an API key is used: each request goes to the fastest
+    healthy one (see LatencyRouter) and fails over to the next on errors.
     """
     
     def __init__(self):
-        self.provider = self._detect_provider()
+        self.providers = self._detect_providers()
+        self.provider = self.providers[0] if self.providers else None
+        self.router = LatencyRouter(self.providers)
+        self.clients = ClientRegistry()
+        self.async_clients = AsyncClientRegistry()
+    
+    def _detect_providers(self):
+        """Providers with an API key, in order of preference"""
+        keys = [
+            ("openrouter", settings.openrouter_api_key),
+            ("openai", settings.openai_api_key),
+            ("gemini", settings.gemini_api_key)
+        ]
+        return [provider for provider, key in keys if key]
     
     def _detect_provider(self):
         """Detect which LLM provider to use based on available API keys"""
-        if settings.openrouter_api_key:
-            return "openrouter"
-        elif settings.openai_api_key:
-            return "openai"
-        elif settings.gemini_api_key:
-            return "gemini"
-        else:
+        providers = self._detect_providers()
+        return providers[0] if providers else None
+    
+    def model_for(self, provider: str):
+        """Model name used by a provider"""
+        return {
+            "openrouter": settings.openrouter_model,
+            "openai": OPENAI_MODEL,
+            "gemini": GEMINI_MODEL
+        }.get(provider)
+    
+    @property
+    def model(self):
+        """Model name used by the preferred provider"""
+        return self.model_for(self.provider)
+    
+    def _cache_key(self, prompt: str, system_prompt: str, response_format: str, use_cache: bool):
+        """
+        Response cache key, or None when the cache is bypassed
+        
+        Keyed on the preferred provider and model: the router may serve a
+        request from another provider, but it is the same request.
+        """
+        if not (use_cache and settings.llm_cache_enabled and self.provider):
             return None
+        return cache_key(self.provider, self.model, system_prompt, prompt, response_format)
     
-    def generate(self, prompt: str, system_prompt: str = None, response_format: str = None):
+    def generate(self, prompt: str, system_prompt: str = None, response_format: str = None,
+                 use_cache: bool = True, validate: Callable[[str], bool] = None):
         """
         Generate text using available LLM provider
         
@@ -29,39 +237,224 @@ class LLMClient:
             prompt: User prompt
             system_prompt: System prompt (optional)
             response_format: "json" for JSON output (optional)
+            use_cache: False to bypass the response cache (optional)
+            validate: Only cache responses for which this returns truthy (optional)
         
         Returns:
             Generated text
         """
         
-        if self.provider == "openrouter":
-            return self._call_openrouter(prompt, system_prompt, response_format)
-        elif self.provider == "openai":
-            return self._call_openai(prompt, system_prompt, response_format)
-        elif self.provider == "gemini":
-            return self._call_gemini(prompt, system_prompt, response_format)
-        else:
-            raise Exception("No LLM API key configured. Please add OPENROUTER_API_KEY, OPENAI_API_KEY, or GEMINI_API_KEY to .env")
+        key = self._cache_key(prompt, system_prompt, response_format, use_cache)
+        if key:
+            cached = llm_cache.get(key)
+            if cached is not None:
+                return cached
+        
+        response = self._generate_uncached(prompt, system_prompt, response_format)
+        
+        if key and cacheable(response, response_format, validate):
+            llm_cache.set(key, response)
+        return response
     
-    def _call_openrouter(self, prompt: str, system_prompt: str = None, response_format: str = None):
-        """Call OpenRouter API with support for free models"""
+    def _generate_uncached(self, prompt: str, system_prompt: str = None, response_format: str = None):
+        """Try providers in router order until one answers"""
+        order = self.router.order()
+        if not order:
+            raise Exception(NO_PROVIDER_ERROR)
+        
+        errors = []
+        for provider in order:
+            try:
+                return self._call_timed(provider, prompt, system_prompt, response_format)
+            except Exception as e:
+                print(f"⚠️  {provider} failed, trying next provider: {e}")
+                errors.append(str(e))
+        
+        raise Exception(f"All LLM providers failed: {'; '.join(errors)}")
+    
+    def _estimate_tokens(self, prompt: str, system_prompt: str = None) -> int:
+        """Tokens a call is charged against the provider's per-minute budget"""
+        return count_tokens(prompt) + count_tokens(system_prompt or "") + settings.llm_completion_token_estimate
+    
+    def _call_timed(self, provider: str, prompt: str, system_prompt: str = None,
+                    response_format: str = None):
+        """
+        One provider call within its shared rate limit, timed for the router
+        
+        Waits (queued) for rate-limit capacity; a 429 puts the provider in a
+        shared cooldown and the call is retried after it, up to
+        llm_rate_limit_retries times.
+        """
+        call = getattr(self, f"_call_{provider}")
+        tokens = self._estimate_tokens(prompt, system_prompt)
+        
+        for attempt in range(settings.llm_rate_limit_retries + 1):
+            # RateLimitExceeded propagates: the wait is too long, not a provider error
+            rate_limiter.acquire(provider, tokens)
+            
+            start = time.perf_counter()
+            try:
+                response = call(prompt, system_prompt, response_format)
+            except RateLimited as e:
+                rate_limiter.cooldown(provider, e.retry_after)
+                if attempt < settings.llm_rate_limit_retries:
+                    continue
+                self._record_call(provider, time.perf_counter() - start, ok=False)
+                raise
+            except Exception:
+                self._record_call(provider, time.perf_counter() - start, ok=False)
+                raise
+            
+            self._record_call(provider, time.perf_counter() - start, ok=True)
+            return response
+    
+    def _record_call(self, provider: str, latency: float, ok: bool):
+        """Feed a finished provider call into the router and metrics"""
+        self.router.record(provider, latency, ok)
+        metrics.observe(
+            "satya_llm_request_seconds", latency,
+            provider=provider, outcome="ok" if ok else "error"
+        )
+    
+    def _record_stream(self, provider: str, first_chunk: float, latency: float, ok: bool):
+        """
+        Feed a finished stream into the router's stream stats (time to first
+        chunk) and metrics (whole stream), keeping it out of call latency
+        """
+        self.router.record(provider, first_chunk, ok, stream=True)
+        metrics.observe(
+            "satya_llm_stream_seconds", latency,
+            provider=provider, outcome="ok" if ok else "error"
+        )
+    
+    async def agenerate(self, prompt: str, system_prompt: str = None, response_format: str = None,
+                        timeout: float = None, use_cache: bool = True,
+                        validate: Callable[[str], bool] = None):
+        """
+        Async version of generate() for use inside the async pipeline
         
-        messages = []
+        Calls to each provider are capped at settings.llm_max_concurrency per
+        event loop. Cancelling the awaiting task aborts the HTTP request.
         
-        if system_prompt:
-            messages.append({
-                "role": "system",
-                "content": system_prompt
-            })
+        Args:
+            prompt: User prompt
+            system_prompt: System prompt (optional)
+            response_format: "json" for JSON output (optional)
+            timeout: Seconds before the call is cancelled (optional)
+            use_cache: False to bypass the response cache (optional)
+            validate: Only cache responses for which this returns truthy (optional)
         
-        messages.append({
-            "role": "user",
-            "content": prompt
-        })
+        Returns:
+            Generated text
+        """
+        
+        key = self._cache_key(prompt, system_prompt, response_format, use_cache)
+        if key:
+            cached = await asyncio.to_thread(llm_cache.get, key)
+            if cached is not None:
+                return cached
+        
+        response = await asyncio.wait_for(
+            self._agenerate_routed(prompt, system_prompt, response_format),
+            timeout=timeout
+        )
+        
+        if key and cacheable(response, response_format, validate):
+            await asyncio.to_thread(llm_cache.set, key, response)
+        return response
+    
+    async def _agenerate_routed(self, prompt: str, system_prompt: str = None, response_format: str = None):
+        """
+        Send the request to the fastest healthy provider
+        
+        If it has not answered within its rolling p95, a hedged duplicate goes
+        to the next provider and whichever answers first wins; the other call
+        is cancelled. A provider that errors fails over to the next one.
+        """
+        remaining = self.router.order()
+        if not remaining:
+            raise Exception(NO_PROVIDER_ERROR)
+        
+        def launch():
+            provider = remaining.pop(0)
+            task = asyncio.create_task(self._acall_timed(provider, prompt, system_prompt, response_format))
+            pending[task] = provider
+            return provider
+        
+        pending = {}
+        errors = []
+        primary = launch()
+        hedge_after = self.router.hedge_delay(primary) if settings.llm_hedging_enabled else None
+        
+        try:
+            while pending:
+                can_hedge = hedge_after is not None and remaining
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=hedge_after if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                
+                if not done:
+                    # Primary is slower than its p95: race a second provider
+                    hedged = launch()
+                    hedge_after = None
+                    metrics.incr_nowait("satya_llm_hedges_total", provider=hedged)
+                    print(f"⏱️  {primary} exceeded its p95, hedging with {hedged}")
+                    continue
+                
+                for task in done:
+                    provider = pending.pop(task)
+                    try:
+                        return task.result()
+                    except Exception as e:
+                        print(f"⚠️  {provider} failed: {e}")
+                        errors.append(str(e))
+                
+                if not pending and remaining:
+                    launch()
+                    hedge_after = None
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        raise Exception(f"All LLM providers failed: {'; '.join(errors)}")
+    
+    async def _acall_timed(self, provider: str, prompt: str, system_prompt: str = None,
+                           response_format: str = None):
+        """Async version of _call_timed, also under the provider's concurrency limit"""
+        call = getattr(self, f"_acall_{provider}")
+        tokens = self._estimate_tokens(prompt, system_prompt)
+        
+        for attempt in range(settings.llm_rate_limit_retries + 1):
+            await rate_limiter.aacquire(provider, tokens)
+            
+            async with self.async_clients.semaphore(provider):
+                start = time.perf_counter()
+                try:
+                    response = await call(prompt, system_prompt, response_format)
+                except asyncio.CancelledError:
+                    # Lost a hedge race or the caller gave up; not a provider error
+                    raise
+                except RateLimited as e:
+                    await asyncio.to_thread(rate_limiter.cooldown, provider, e.retry_after)
+                    if attempt < settings.llm_rate_limit_retries:
+                        continue
+                    await asyncio.to_thread(self._record_call, provider, time.perf_counter() - start, False)
+                    raise
+                except Exception:
+                    await asyncio.to_thread(self._record_call, provider, time.perf_counter() - start, False)
+                    raise
+            
+            await asyncio.to_thread(self._record_call, provider, time.perf_counter() - start, True)
+            return response
+    
+    def _openrouter_payload(self, prompt: str, system_prompt: str = None, response_format: str = None):
+        """Chat completion payload for OpenRouter"""
         
         payload = {
             "model": settings.openrouter_model,
-            "messages": messages
+            "messages": _chat_messages(prompt, system_prompt)
         }
         
         # Add JSON mode if requested (not supported by all free models)
@@ -74,80 +467,338 @@ class LLMClient:
                 "reasoning": {"enabled": True}
             }
         
+        return payload
+    
+    def _call_openrouter(self, prompt: str, system_prompt: str = None, response_format: str = None):
+        """Call OpenRouter API with support for free models"""
+        
+        payload = self._openrouter_payload(prompt, system_prompt, response_format)
+        
         try:
-            response = requests.post(
-                url="https://openrouter.ai/api/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {settings.openrouter_api_key}",
-                    "HTTP-Referer": settings.openrouter_site_url,
-                    "X-Title": settings.openrouter_site_name,
-                    "Content-Type": "application/json"
-                },
-                data=json.dumps(payload),
-                timeout=120
-            )
+            response = self._openrouter_client().post(_openrouter_url(), json=payload)
             
+            record_external_call(len(response.content))
+            if response.status_code == 429:
+                raise RateLimited("openrouter", retry_after_seconds(response.headers))
             response.raise_for_status()
             data = response.json()
             
             return data['choices'][0]['message']['content']
         
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             raise Exception(f"OpenRouter API error: {e}")
     
+    async def _acall_openrouter(self, prompt: str, system_prompt: str = None, response_format: str = None):
+        """Async OpenRouter call"""
+        
+        payload = self._openrouter_payload(prompt, system_prompt, response_format)
+        client = self._async_openrouter_client()
+        
+        try:
+            response = await client.post(_openrouter_url(), json=payload)
+            
+            record_external_call(len(response.content))
+            if response.status_code == 429:
+                raise RateLimited("openrouter", retry_after_seconds(response.headers))
+            response.raise_for_status()
+            data = response.json()
+            
+            return data['choices'][0]['message']['content']
+        
+        except httpx.HTTPError as e:
+            raise Exception(f"OpenRouter API error: {e}")
+    
+    def _async_openrouter_client(self) -> httpx.AsyncClient:
+        return self.async_clients.get("openrouter", lambda: pooled_async_http_client(
+            settings.openrouter_pool_size,
+            headers=_openrouter_headers()
+        ))
+    
+    def _async_openai_client(self):
+        def factory():
+            from openai import AsyncOpenAI
+            return AsyncOpenAI(
+                api_key=settings.openai_api_key,
+                base_url=settings.openai_base_url or None,
+                http_client=pooled_async_http_client(settings.openai_pool_size)
+            )
+        
+        return self.async_clients.get("openai", factory)
+    
+    def _openrouter_client(self) -> httpx.Client:
+        return self.clients.get("openrouter", lambda: pooled_http_client(
+            settings.openrouter_pool_size,
+            headers=_openrouter_headers()
+        ))
+    
+    def _openai_client(self):
+        def factory():
+            from openai import OpenAI
+            return OpenAI(
+                api_key=settings.openai_api_key,
+                base_url=settings.openai_base_url or None,
+                http_client=pooled_http_client(settings.openai_pool_size)
+            )
+        
+        return self.clients.get("openai", factory)
+    
+    def _gemini_model(self):
+        def factory():
+            import google.generativeai as genai
+            genai.configure(api_key=settings.gemini_api_key)
+            return genai.GenerativeModel(GEMINI_MODEL)
+        
+        return self.clients.get("gemini", factory)
+    
+    def _openai_kwargs(self, prompt: str, system_prompt: str = None, response_format: str = None):
+        kwargs = {
+            "model": OPENAI_MODEL,
+            "messages": _chat_messages(prompt, system_prompt)
+        }
+        
+        if response_format == "json":
+            kwargs["response_format"] = {"type": "json_object"}
+        
+        return kwargs
+    
     def _call_openai(self, prompt: str, system_prompt: str = None, response_format: str = None):
         """Call OpenAI API directly"""
         
         try:
-            from openai import OpenAI
+            client = self._openai_client()
+            response = client.chat.completions.create(
+                **self._openai_kwargs(prompt, system_prompt, response_format)
+            )
+            content = response.choices[0].message.content
+            record_external_call(len((content or '').encode()))
             
-            client = OpenAI(api_key=settings.openai_api_key)
+            return content
+        
+        except Exception as e:
+            if _is_rate_limit(e):
+                raise RateLimited("openai", _error_retry_after(e)) from e
+            raise Exception(f"OpenAI API error: {e}")
+    
+    def _call_gemini(self, prompt: str, system_prompt: str = None, response_format: str = None):
+        """Call Google Gemini API"""
+        
+        try:
+            model = self._gemini_model()
             
-            messages = []
+            full_prompt = prompt
             if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            messages.append({"role": "user", "content": prompt})
-            
-            kwargs = {
-                "model": "gpt-4",
-                "messages": messages
-            }
+                full_prompt = f"{system_prompt}\n\n{prompt}"
             
-            if response_format == "json":
-                kwargs["response_format"] = {"type": "json_object"}
+            response = model.generate_content(full_prompt)
+            record_external_call(len(response.text.encode()))
             
-            response = client.chat.completions.create(**kwargs)
+            return response.text
+        
+        except Exception as e:
+            if _is_rate_limit(e):
+                raise RateLimited("gemini", _error_retry_after(e)) from e
+            raise Exception(f"Gemini API error: {e}")
+    
+    async def _acall_openai(self, prompt: str, system_prompt: str = None, response_format: str = None):
+        """Async OpenAI call"""
+        
+        try:
+            client = self._async_openai_client()
+            response = await client.chat.completions.create(
+                **self._openai_kwargs(prompt, system_prompt, response_format)
+            )
+            content = response.choices[0].message.content
+            record_external_call(len((content or '').encode()))
             
-            return response.choices[0].message.content
+            return content
         
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
+            if _is_rate_limit(e):
+                raise RateLimited("openai", _error_retry_after(e)) from e
             raise Exception(f"OpenAI API error: {e}")
     
-    def _call_gemini(self, prompt: str, system_prompt: str = None, response_format: str = None):
-        """Call Google Gemini API"""
+    async def _acall_gemini(self, prompt: str, system_prompt: str = None, response_format: str = None):
+        """Async Gemini call (the configured model itself is shared)"""
         
         try:
-            import google.generativeai as genai
-            
-            genai.configure(api_key=settings.gemini_api_key)
-            model = genai.GenerativeModel("gemini-pro")
+            model = self._gemini_model()
             
             full_prompt = prompt
             if system_prompt:
                 full_prompt = f"{system_prompt}\n\n{prompt}"
             
-            response = model.generate_content(full_prompt)
+            response = await model.generate_content_async(full_prompt)
+            record_external_call(len(response.text.encode()))
             
             return response.text
         
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if _is_rate_limit(e):
+                raise RateLimited("gemini", _error_retry_after(e)) from e
+            raise Exception(f"Gemini API error: {e}")
+    
+    async def astream(self, prompt: str, system_prompt: str = None, response_format: str = None,
+                      use_cache: bool = True, validate: Callable[[str], bool] = None):
+        """
+        Stream the response as text chunks as the provider generates them
+        
+        Uses the router's first choice and fails over only if a provider
+        errors before sending anything; once chunks have been yielded an
+        error is raised to the caller. A cache hit is yielded as one chunk.
+        
+        Args:
+            prompt: User prompt
+            system_prompt: System prompt (optional)
+            response_format: "json" for JSON output (optional)
+            use_cache: False to bypass the response cache (optional)
+            validate: Only cache responses for which this returns truthy (optional)
+        
+        Yields:
+            Text chunks
+        """
+        
+        key = self._cache_key(prompt, system_prompt, response_format, use_cache)
+        if key:
+            cached = await asyncio.to_thread(llm_cache.get, key)
+            if cached is not None:
+                yield cached
+                return
+        
+        order = self.router.order()
+        if not order:
+            raise Exception(NO_PROVIDER_ERROR)
+        
+        errors = []
+        tokens = self._estimate_tokens(prompt, system_prompt)
+        for provider in order:
+            stream = getattr(self, f"_astream_{provider}")
+            chunks = []
+            
+            try:
+                await rate_limiter.aacquire(provider, tokens)
+            except RateLimitExceeded as e:
+                errors.append(str(e))
+                continue
+            
+            async with self.async_clients.semaphore(provider):
+                start = time.perf_counter()
+                first_chunk = None
+                try:
+                    async for chunk in stream(prompt, system_prompt, response_format):
+                        if first_chunk is None:
+                            first_chunk = time.perf_counter() - start
+                        chunks.append(chunk)
+                        yield chunk
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    if isinstance(e, RateLimited):
+                        await asyncio.to_thread(rate_limiter.cooldown, provider, e.retry_after)
+                    elapsed = time.perf_counter() - start
+                    await asyncio.to_thread(
+                        self._record_stream, provider, first_chunk or elapsed, elapsed, False
+                    )
+                    if chunks:
+                        raise
+                    print(f"⚠️  {provider} stream failed, trying next provider: {e}")
+                    errors.append(str(e))
+                    continue
+            
+            elapsed = time.perf_counter() - start
+            await asyncio.to_thread(self._record_stream, provider, first_chunk or elapsed, elapsed, True)
+            response = "".join(chunks)
+            if key and cacheable(response, response_format, validate):
+                await asyncio.to_thread(llm_cache.set, key, response)
+            return
+        
+        raise Exception(f"All LLM providers failed: {'; '.join(errors)}")
+    
+    async def _astream_openrouter(self, prompt: str, system_prompt: str = None, response_format: str = None):
+        """Stream an OpenRouter completion (server-sent events)"""
+        
+        payload = self._openrouter_payload(prompt, system_prompt, response_format)
+        payload["stream"] = True
+        
+        try:
+            async with self._async_openrouter_client().stream("POST", _openrouter_url(), json=payload) as response:
+                record_external_call()
+                if response.status_code == 429:
+                    raise RateLimited("openrouter", retry_after_seconds(response.headers))
+                response.raise_for_status()
+                
+                async for line in response.aiter_lines():
+                    record_external_bytes(len(line))
+                    # Skip keep-alive comments such as ": OPENROUTER PROCESSING"
+                    if not line.startswith("data:"):
+                        continue
+                    
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    
+                    delta = json.loads(data)['choices'][0].get('delta', {}).get('content')
+                    if delta:
+                        yield delta
+        
+        except httpx.HTTPError as e:
+            raise Exception(f"OpenRouter API error: {e}")
+    
+    async def _astream_openai(self, prompt: str, system_prompt: str = None, response_format: str = None):
+        """Stream an OpenAI completion"""
+        
+        try:
+            stream = await self._async_openai_client().chat.completions.create(
+                **self._openai_kwargs(prompt, system_prompt, response_format),
+                stream=True
+            )
+            record_external_call()
+            
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    record_external_bytes(len(delta.encode()))
+                    yield delta
+        
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
+            if _is_rate_limit(e):
+                raise RateLimited("openai", _error_retry_after(e)) from e
+            raise Exception(f"OpenAI API error: {e}")
+    
+    async def _astream_gemini(self, prompt: str, system_prompt: str = None, response_format: str = None):
+        """Stream a Gemini completion"""
+        
+        try:
+            full_prompt = prompt
+            if system_prompt:
+                full_prompt = f"{system_prompt}\n\n{prompt}"
+            
+            response = await self._gemini_model().generate_content_async(full_prompt, stream=True)
+            record_external_call()
+            
+            async for chunk in response:
+                if chunk.text:
+                    record_external_bytes(len(chunk.text.encode()))
+                    yield chunk.text
+        
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if _is_rate_limit(e):
+                raise RateLimited("gemini", _error_retry_after(e)) from e
             raise Exception(f"Gemini API error: {e}")
 
 # Create singleton instance
 llm_client = LLMClient()
 
 
-def get_llm_response(prompt: str, system_prompt: str = None, temperature: float = 0.7, response_format: str = None):
+def get_llm_response(prompt: str, system_prompt: str = None, temperature: float = 0.7, response_format: str = None,
+                     validate: Callable[[str], bool] = None):
     """
     Wrapper function for backward compatibility
     
@@ -156,11 +807,18 @@ def get_llm_response(prompt: str, system_prompt: str = None, temperature: float
         system_prompt: System prompt (optional)
         temperature: Temperature (not used in current implementation)
         response_format: "json" for JSON output
+        validate: Only cache responses for which this returns truthy (optional)
     
     Returns:
         Generated text
     """
-    return llm_client.generate(prompt, system_prompt, response_format)
+    return llm_client.generate(prompt, system_prompt, response_format, validate=validate)
+
+
+async def aget_llm_response(prompt: str, system_prompt: str = None, temperature: float = 0.7, response_format: str = None,
+                            validate: Callable[[str], bool] = None):
+    """Async version of get_llm_response"""
+    return await llm_client.agenerate(prompt, system_prompt, response_format, validate=validate)
 
 
 def test_llm():
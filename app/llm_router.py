@@ -0,0 +1,127 @@
+"""
+LLM Provider Router
+Rolling latency and error statistics per provider, used to pick the
+fastest healthy provider and to decide when to hedge a slow request
+"""
+
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+from app.config import settings
+
+class ProviderStats:
+    """Sliding window of (latency, ok) samples for one provider"""
+
+    def __init__(self, window: int):
+        self.samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool):
+        with self._lock:
+            self.samples.append((latency, ok))
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency percentile of successful calls, None without data"""
+        with self._lock:
+            latencies = sorted(latency for latency, ok in self.samples if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            if not self.samples:
+                return 0.0
+            return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+    def __len__(self):
+        return len(self.samples)
+
+class LatencyRouter:
+    """
+    Orders providers for each request
+
+    Healthy providers (error rate below llm_max_error_rate) come first,
+    fastest rolling p50 first; a provider without samples sorts as fastest
+    so it gets measured. Unhealthy providers (judged only after
+    llm_health_min_samples calls) are kept as a last resort, but every
+    llm_probe_interval-th request tries the longest-demoted one first, so a
+    provider that has recovered refills its window and is promoted again.
+
+    Streamed calls last as long as the whole generation, so they are kept in
+    separate stream_stats (time to first chunk) and never move the p50/p95
+    that ordering and hedging use; their errors still count towards health.
+    """
+
+    def __init__(self, providers: List[str]):
+        self.providers = providers
+        self.stats: Dict[str, ProviderStats] = {
+            provider: ProviderStats(settings.llm_routing_window) for provider in providers
+        }
+        self.stream_stats: Dict[str, ProviderStats] = {
+            provider: ProviderStats(settings.llm_routing_window) for provider in providers
+        }
+        self._demoted: Dict[str, int] = {}  # provider -> requests routed since it was last tried first
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, latency: float, ok: bool, stream: bool = False):
+        """latency is the full call, or the time to first chunk when stream=True"""
+        (self.stream_stats if stream else self.stats)[provider].record(latency, ok)
+
+    def is_unhealthy(self, provider: str) -> bool:
+        return any(
+            len(stats) >= settings.llm_health_min_samples and
+            stats.error_rate >= settings.llm_max_error_rate
+            for stats in (self.stats[provider], self.stream_stats[provider])
+        )
+
+    def order(self) -> List[str]:
+        def key(provider):
+            stats = self.stats[provider]
+            unhealthy = self.is_unhealthy(provider)
+            p50 = stats.percentile(0.5) or 0.0
+            return (unhealthy, stats.error_rate if unhealthy else 0.0, p50, self.providers.index(provider))
+
+        order = sorted(self.providers, key=key)
+        probe = self._probe(order)
+        if probe:
+            order.remove(probe)
+            order.insert(0, probe)
+        return order
+
+    def _probe(self, order: List[str]) -> Optional[str]:
+        """The unhealthy provider due a probe request, if any"""
+        with self._lock:
+            unhealthy = [p for p in order if self.is_unhealthy(p)]
+            self._demoted = {p: self._demoted.get(p, 0) + 1 for p in unhealthy}
+            if len(unhealthy) == len(order):
+                return None  # Nothing healthy to prefer; the order already tries them all
+
+            due = [p for p in unhealthy if self._demoted[p] >= settings.llm_probe_interval]
+            if not due:
+                return None
+            probe = max(due, key=lambda p: self._demoted[p])
+            self._demoted[probe] = 0
+            return probe
+
+    def hedge_delay(self, provider: str) -> Optional[float]:
+        """Seconds to wait before hedging: the provider's p95, once it has enough samples"""
+        stats = self.stats[provider]
+        if len(stats) < settings.llm_hedge_min_samples:
+            return None
+        return stats.percentile(0.95)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Current p50/p95/error rate per provider (for logging)"""
+        return {
+            provider: {
+                "p50": stats.percentile(0.5),
+                "p95": stats.percentile(0.95),
+                "error_rate": stats.error_rate,
+                "samples": len(stats),
+                "stream_first_chunk_p50": self.stream_stats[provider].percentile(0.5),
+                "unhealthy": self.is_unhealthy(provider)
+            }
+            for provider, stats in self.stats.items()
+        }
@@ -1,12 +1,12 @@
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 from bson import ObjectId
 import uuid
 import redis
-from rq import Queue
+import asyncio
 
 from app.config import settings
 from app.database import (
@@ -14,18 +14,35 @@ from app.database import (
     async_reports, init_db, test_connection
 )
 from app.storage import storage
+from app.metrics import metrics
+from app.dedupe import content_hash, find_recent_result
+from app.ocr_cache import perceptual_hash
+from app.job_queue import JobQueue, lane_for, parse_lane_setting
 from app.models import SubmissionResponse, ResultResponse
 
 # Initialize Redis and task queue
 try:
     redis_conn = redis.from_url(settings.redis_url)
-    task_queue = Queue('default', connection=redis_conn)
+    task_queue = JobQueue(redis_conn)
     print("✅ Redis connection established")
 except Exception as e:
     print(f"⚠️  Redis connection failed: {e}")
     print("⚠️  Background processing will not work")
     task_queue = None
 
+def queue_depth_gauges():
+    """Live queue depth per lane for /metrics"""
+    depths = task_queue.depths(list(parse_lane_setting(settings.queue_lane_weights)))
+    lines = [
+        "# HELP satya_queue_depth Jobs waiting in each queue lane",
+        "# TYPE satya_queue_depth gauge"
+    ]
+    lines += [f'satya_queue_depth{{lane="{lane}"}} {depth}' for lane, depth in depths.items()]
+    return lines
+
+if task_queue:
+    metrics.register_collector(queue_depth_gauges)
+
 # Create FastAPI app
 app = FastAPI(
     title="AI Fact-Checker API",
@@ -81,6 +98,14 @@ async def health_check():
         "timestamp": datetime.utcnow().isoformat()
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Prometheus scrape endpoint: per-stage latency histograms and counters"""
+    return PlainTextResponse(
+        metrics.render(),
+        media_type="text/plain; version=0.0.4"
+    )
+
 @app.post("/check", response_model=SubmissionResponse)
 async def check_claim(
     text: Optional[str] = Form(None),
@@ -106,23 +131,34 @@ async def check_claim(
         
         # Read file
         file_bytes = await file.read()
+        hash_value = content_hash(input_type, file_bytes)
+        image_phash = await asyncio.to_thread(perceptual_hash, file_bytes)
+        original = await find_recent_result(async_submissions, hash_value)
         
-        # Generate unique filename
-        file_ext = file.filename.split('.')[-1] if '.' in file.filename else 'jpg'
-        file_path = f"uploads/{uuid.uuid4()}.{file_ext}"
-        
-        # Upload to storage
-        input_ref = storage.upload_file(file_bytes, file_path)
+        if original:
+            # Same image already stored; no need to upload it again
+            input_ref = original['input_ref']
+        else:
+            # Generate unique filename
+            file_ext = file.filename.split('.')[-1] if '.' in file.filename else 'jpg'
+            file_path = f"uploads/{uuid.uuid4()}.{file_ext}"
+            
+            # Upload to storage
+            input_ref = storage.upload_file(file_bytes, file_path)
         
     elif url:
         if not url.startswith('http'):
             raise HTTPException(400, "Invalid URL format")
         input_type = "url"
         input_ref = url
+        hash_value = content_hash(input_type, url)
+        original = await find_recent_result(async_submissions, hash_value)
         
     elif text:
         input_type = "text"
         input_ref = text
+        hash_value = content_hash(input_type, text)
+        original = await find_recent_result(async_submissions, hash_value)
         
     else:
         raise HTTPException(400, "No input provided. Please provide text, url, or file.")
@@ -132,26 +168,93 @@ async def check_claim(
         "user_id": None,  # Add authentication later
         "input_type": input_type,
         "input_ref": input_ref,
+        "content_hash": hash_value,
         "created_at": datetime.utcnow(),
         "status": "queued"
     }
     
+    if input_type == "image":
+        # Perceptual hash lets OCR reuse text from near-identical images
+        submission["image_phash"] = image_phash
+    
+    if original:
+        # Exact repeat of a recent claim: link to its result, skip the pipeline
+        submission.update({
+            "status": "completed",
+            "duplicate_of": original['_id'],
+            "completed_at": datetime.utcnow()
+        })
+        result = await async_submissions.insert_one(submission)
+        submission_id = str(result.inserted_id)
+        
+        metrics.incr_nowait("satya_duplicate_submissions_total", input_type=input_type)
+        print(f"♻️  Duplicate submission {submission_id} linked to {original['_id']}")
+        
+        return SubmissionResponse(
+            submission_id=submission_id,
+            status="completed",
+            estimated_time=0
+        )
+    
     result = await async_submissions.insert_one(submission)
     submission_id = str(result.inserted_id)
     
-    # Enqueue processing job (Phase 2)
+    print(f"📝 New submission created: {submission_id} (type: {input_type})")
+    enqueue_submission(submission_id, input_type)
+    
+    return SubmissionResponse(
+        submission_id=submission_id,
+        status="queued",
+        estimated_time=60
+    )
+
+def enqueue_submission(submission_id: str, input_type: str):
+    """Enqueue a processing job on the lane for its input type (Phase 2)"""
     if task_queue:
-        from app.orchestrator import process_submission
-        job = task_queue.enqueue(
-            process_submission,
-            submission_id,
-            job_timeout=-1  # No timeout for Windows compatibility
-        )
-        print(f"📝 New submission created: {submission_id} (type: {input_type})")
-        print(f"✓ Job enqueued: {job.id}")
+        job = task_queue.enqueue(submission_id, lane=lane_for(input_type))
+        print(f"✓ Job enqueued: {job['id']} (lane: {job['lane']})")
     else:
-        print(f"📝 New submission created: {submission_id} (type: {input_type})")
         print(f"⚠️  Redis not available - job not enqueued")
+
+@app.post("/retry/{submission_id}", response_model=SubmissionResponse)
+async def retry_submission(submission_id: str):
+    """
+    Re-run a failed (or stuck) submission
+    
+    The worker resumes from the first stage without a checkpoint, so
+    completed OCR, fact-check and search work is not repeated.
+    """
+    
+    if not ObjectId.is_valid(submission_id):
+        raise HTTPException(400, "Invalid submission ID")
+    
+    submission = await async_submissions.find_one(
+        {"_id": ObjectId(submission_id)}
+    )
+    
+    if not submission:
+        raise HTTPException(404, "Submission not found")
+    
+    # A "processing" submission is only retryable once its worker is presumed dead
+    stale_before = datetime.utcnow() - timedelta(seconds=settings.retry_stale_after_seconds)
+    started_at = submission.get('processing_started_at') or submission['created_at']
+    
+    if submission['status'] == 'completed':
+        raise HTTPException(409, "Submission already completed")
+    if submission['status'] in ['queued', 'processing'] and started_at > stale_before:
+        raise HTTPException(409, f"Submission is still {submission['status']}")
+    
+    await async_submissions.update_one(
+        {"_id": ObjectId(submission_id)},
+        {
+            "$set": {"status": "queued"},
+            # A provisional verdict from the failed attempt must not show while it reruns
+            "$unset": {"error_message": "", "failed_at": "", "provisional_summary": ""}
+        }
+    )
+    
+    print(f"🔁 Retrying submission: {submission_id}")
+    enqueue_submission(submission_id, submission['input_type'])
     
     return SubmissionResponse(
         submission_id=submission_id,
@@ -175,8 +278,16 @@ async def get_result(submission_id: str):
     if not submission:
         raise HTTPException(404, "Submission not found")
     
-    # If still processing
+    # If still processing (with a provisional verdict once the summary starts streaming)
     if submission['status'] in ['queued', 'processing']:
+        provisional = submission.get('provisional_summary')
+        if provisional:
+            return ResultResponse(
+                status=submission['status'],
+                explanation=provisional.get('short_explanation'),
+                confidence=provisional.get('confidence'),
+                provisional=True
+            )
         return ResultResponse(status=submission['status'])
     
     # If error
@@ -186,9 +297,9 @@ async def get_result(submission_id: str):
             explanation=submission.get('error_message', 'Unknown error')
         )
     
-    # Get claim
+    # Get claim (duplicates share the original submission's claim)
     claim = await async_claims.find_one(
-        {"submission_id": ObjectId(submission_id)}
+        {"submission_id": submission.get('duplicate_of', submission['_id'])}
     )
     
     if not claim:
@@ -228,9 +339,16 @@ async def download_report(submission_id: str):
     if not ObjectId.is_valid(submission_id):
         raise HTTPException(400, "Invalid submission ID")
     
-    # Get claim
+    submission = await async_submissions.find_one(
+        {"_id": ObjectId(submission_id)}
+    )
+    
+    if not submission:
+        raise HTTPException(404, "Submission not found")
+    
+    # Get claim (duplicates share the original submission's claim)
     claim = await async_claims.find_one(
-        {"submission_id": ObjectId(submission_id)}
+        {"submission_id": submission.get('duplicate_of', submission['_id'])}
     )
     
     if not claim:
@@ -0,0 +1,249 @@
+"""
+Pipeline Metrics
+Per-stage timing spans and Prometheus-style metrics shared through Redis
+
+Workers record spans and observations; the API renders them at /metrics.
+Metrics must never break the pipeline, so Redis failures are only logged.
+Writes are synchronous Redis calls: coroutines use the *_nowait variants,
+which hand the write to the loop's executor instead of blocking the loop.
+"""
+
+import time
+import asyncio
+import functools
+import redis
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from app.config import settings
+
+# Histogram buckets (seconds) sized for 0.1 s DB stages up to 2 min LLM calls
+LATENCY_BUCKETS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120]
+
+# name -> (type, help)
+METRICS = {
+    "satya_stage_duration_seconds": ("histogram", "Wall time of each pipeline stage"),
+    "satya_stage_cpu_seconds_total": ("counter", "CPU time spent in each pipeline stage"),
+    "satya_stage_external_calls_total": ("counter", "External HTTP calls made by each pipeline stage"),
+    "satya_stage_bytes_total": ("counter", "Bytes received from external calls by each pipeline stage"),
+    "satya_stage_failures_total": ("counter", "Pipeline stage failures"),
+    "satya_queue_wait_seconds": ("histogram", "Time jobs spend queued, per lane"),
+    "satya_llm_request_seconds": ("histogram", "LLM provider call latency by provider and outcome"),
+    "satya_llm_stream_seconds": ("histogram", "Streamed LLM call duration (whole stream) by provider and outcome"),
+    "satya_llm_rate_limit_wait_seconds": ("histogram", "Time LLM calls spent queued for rate-limit capacity"),
+    "satya_llm_hedges_total": ("counter", "Hedged LLM requests, by the provider raced against the slow one"),
+    "satya_llm_cache_requests_total": ("counter", "LLM response cache lookups by result (hit_local, hit_shared, miss)"),
+    "satya_semantic_cache_requests_total": ("counter", "Semantic summary cache lookups by result (hit, miss)"),
+    "satya_extraction_method_seconds": ("histogram", "URL extraction time by method and outcome (won, success, too_short, timeout, failed, cancelled)"),
+    "satya_browser_contexts_total": ("counter", "Pooled Playwright contexts by event (created, recycled, discarded)"),
+    "satya_page_cache_requests_total": ("counter", "Page cache lookups by result (hit, revalidated, miss)"),
+    "satya_ocr_preprocess_seconds": ("histogram", "Time spent shrinking images before OCR"),
+    "satya_ocr_preprocess_bytes_saved_total": ("counter", "Upload bytes saved by OCR image preprocessing"),
+    "satya_ocr_request_seconds": ("histogram", "OCR call latency by backend, outcome and whether the image was preprocessed"),
+    "satya_ocr_cache_requests_total": ("counter", "OCR cache lookups by result (hit_exact, hit_similar, miss)"),
+    "satya_duplicate_submissions_total": ("counter", "Submissions answered from a recent identical submission"),
+    "satya_model_preload_seconds": ("gauge", "Time the worker pool parent spent preloading each model"),
+    "satya_worker_startup_seconds": ("gauge", "Time from worker process start until it pulls jobs"),
+    "satya_worker_first_job_seconds": ("gauge", "Duration of the first job handled by each worker process"),
+    "satya_worker_memory_bytes": ("gauge", "Worker memory by kind (rss, pss, uss)"),
+}
+
+_current_span: ContextVar[Optional["StageSpan"]] = ContextVar("current_span", default=None)
+
+class StageSpan:
+    """Timing span for one agent invocation"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at = datetime.utcnow()
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.external_calls = 0
+        self.bytes_transferred = 0
+        self.error = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "stage": self.name,
+            "started_at": self.started_at,
+            "wall_time": round(self.wall_time, 4),
+            "cpu_time": round(self.cpu_time, 4),
+            "external_calls": self.external_calls,
+            "bytes_transferred": self.bytes_transferred,
+            "error": self.error
+        }
+
+@contextmanager
+def stage_span(name: str):
+    """
+    Time a block of work as a stage span
+
+    CPU time is measured for the current thread. Blocking stages run alone
+    on a worker thread, so theirs is exact; async stages share the loop
+    thread, so theirs also includes whatever else ran on the loop meanwhile.
+    """
+    span = StageSpan(name)
+    token = _current_span.set(span)
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+
+    try:
+        yield span
+    except BaseException as e:
+        span.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        span.wall_time = time.perf_counter() - wall_start
+        span.cpu_time = time.thread_time() - cpu_start
+        _current_span.reset(token)
+
+def record_external_call(nbytes: int = 0, count: int = 1):
+    """Attribute an external HTTP call (and its response size) to the current span"""
+    span = _current_span.get()
+    if span is not None:
+        span.external_calls += count
+        span.bytes_transferred += nbytes or 0
+
+def record_external_bytes(nbytes: int):
+    """Attribute response bytes to the current span without counting a call"""
+    record_external_call(nbytes, count=0)
+
+def _labels(**labels) -> str:
+    return ",".join(f'{key}="{value}"' for key, value in sorted(labels.items()))
+
+class MetricsRegistry:
+    """Counters and histograms stored in Redis hashes (one hash per metric)"""
+
+    def __init__(self, redis_url: str):
+        self.redis_url = redis_url
+        self._client = None
+        self.collectors: List[Callable[[], List[str]]] = []
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = redis.from_url(self.redis_url, socket_connect_timeout=2)
+        return self._client
+
+    def incr(self, metric: str, amount: float = 1, **labels):
+        """Increment a counter"""
+        try:
+            self.client.hincrbyfloat(f"metrics:{metric}", _labels(**labels), amount)
+        except Exception as e:
+            print(f"⚠️  Metrics write failed: {e}")
+
+    def set_gauge(self, metric: str, value: float, **labels):
+        """Set a gauge to its current value"""
+        try:
+            self.client.hset(f"metrics:{metric}", _labels(**labels), value)
+        except Exception as e:
+            print(f"⚠️  Metrics write failed: {e}")
+
+    def observe(self, metric: str, value: float, **labels):
+        """Add an observation to a histogram"""
+        key = f"metrics:{metric}"
+        label_str = _labels(**labels)
+
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for bound in LATENCY_BUCKETS:
+                # Touch every bucket so empty ones still render as 0
+                pipe.hincrby(key, f"{label_str}|{bound}", 1 if value <= bound else 0)
+            pipe.hincrby(key, f"{label_str}|+Inf", 1)
+            pipe.hincrbyfloat(key, f"{label_str}|sum", value)
+            pipe.hincrby(key, f"{label_str}|count", 1)
+            pipe.execute()
+        except Exception as e:
+            print(f"⚠️  Metrics write failed: {e}")
+
+    def incr_nowait(self, metric: str, amount: float = 1, **labels):
+        """incr() from a coroutine: runs on the loop's executor, not awaited"""
+        self._nowait(self.incr, metric, amount, **labels)
+
+    def observe_nowait(self, metric: str, value: float, **labels):
+        """observe() from a coroutine: runs on the loop's executor, not awaited"""
+        self._nowait(self.observe, metric, value, **labels)
+
+    def _nowait(self, write: Callable, *args, **labels):
+        # Fire and forget, so it is also safe in finally blocks of cancelled tasks
+        loop = asyncio.get_running_loop()
+        loop.run_in_executor(None, functools.partial(write, *args, **labels))
+
+    def record_span(self, span: StageSpan):
+        """Feed a finished span into the stage metrics"""
+        self.observe("satya_stage_duration_seconds", span.wall_time, stage=span.name)
+        self.incr("satya_stage_cpu_seconds_total", span.cpu_time, stage=span.name)
+        self.incr("satya_stage_external_calls_total", span.external_calls, stage=span.name)
+        self.incr("satya_stage_bytes_total", span.bytes_transferred, stage=span.name)
+        if span.error:
+            self.incr("satya_stage_failures_total", stage=span.name)
+
+    def counter_values(self, metric: str) -> Dict[str, float]:
+        """Current values of a counter, by label string"""
+        try:
+            values = self.client.hgetall(f"metrics:{metric}")
+        except Exception as e:
+            print(f"⚠️  Metrics read failed: {e}")
+            return {}
+        return {
+            (k.decode() if isinstance(k, bytes) else k): float(v)
+            for k, v in values.items()
+        }
+
+    def register_collector(self, collector: Callable[[], List[str]]):
+        """Add a callable returning extra exposition lines (e.g. live gauges)"""
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        lines = []
+
+        for metric, (metric_type, help_text) in METRICS.items():
+            try:
+                values = self.client.hgetall(f"metrics:{metric}")
+            except Exception as e:
+                print(f"⚠️  Metrics read failed: {e}")
+                values = {}
+
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {metric_type}")
+
+            fields = [
+                (k.decode() if isinstance(k, bytes) else k, float(v))
+                for k, v in values.items()
+            ]
+
+            for field, value in sorted(fields, key=lambda item: _sort_key(item[0])):
+                if metric_type == "histogram":
+                    label_str, _, suffix = field.rpartition("|")
+                    prefix = f"{label_str}," if label_str else ""
+                    if suffix in ("sum", "count"):
+                        lines.append(f"{metric}_{suffix}{{{label_str}}} {_fmt(value)}")
+                    else:
+                        lines.append(f'{metric}_bucket{{{prefix}le="{suffix}"}} {_fmt(value)}')
+                else:
+                    lines.append(f"{metric}{{{field}}} {_fmt(value)}")
+
+        for collector in self.collectors:
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                print(f"⚠️  Metrics collector failed: {e}")
+
+        return "\n".join(lines) + "\n"
+
+def _sort_key(field: str):
+    """Order histogram fields by labels, then ascending bucket, then sum/count"""
+    label_str, separator, suffix = field.rpartition("|")
+    if not separator:
+        return (field, 0.0, "")
+    if suffix in ("+Inf", "sum", "count"):
+        return (label_str, float("inf"), suffix)
+    return (label_str, float(suffix), suffix)
+
+def _fmt(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else f"{value:.6f}"
+
+# Create singleton
+metrics = MetricsRegistry(settings.redis_url)
@@ -33,3 +33,4 @@ class ResultResponse(BaseModel):
     explanation: Optional[str] = None
     sources: Optional[List[dict]] = None
     report_url: Optional[str] = None
+    provisional: Optional[bool] = None
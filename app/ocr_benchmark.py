@@ -0,0 +1,151 @@
+"""
+OCR Benchmark
+Compares throughput and accuracy of the OCR backends on a fixture set
+
+A fixture set is a directory of images, each with a same-named .txt file
+holding the expected text (e.g. meme.png + meme.txt). --synthetic N renders
+N text images with known content into the directory first.
+
+    python -m app.ocr_benchmark fixtures/ocr --synthetic 20
+    python -m app.ocr_benchmark fixtures/ocr --backends tesseract --concurrency 4
+"""
+
+import os
+import re
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+from app.image_preprocess import preprocess_for_ocr
+from app.ocr_client import ocr_client
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+
+SAMPLE_CLAIMS = [
+    "Drinking hot water every hour cures the flu in two days",
+    "The government will ban all cash payments from next month",
+    "Scientists confirmed that 5G towers spread the virus",
+    "Local council approves new bridge costing 40 million",
+    "Eating garlic daily prevents all forms of cancer",
+    "Banks will close every branch in the country by 2025",
+    "A new study shows children sleep 3 hours less than in 1990",
+    "The moon landing footage was filmed in a studio in Nevada"
+]
+
+def normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+def edit_distance(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+def accuracy(expected: str, actual: str) -> float:
+    """1 - character error rate, on normalized text (floored at 0)"""
+    expected, actual = normalize(expected), normalize(actual)
+    if not expected:
+        return 1.0 if not actual else 0.0
+    return max(0.0, 1 - edit_distance(expected, actual) / len(expected))
+
+def load_fixtures(directory: str) -> List[Tuple[str, bytes, str]]:
+    """(filename, image bytes, expected text) for every image with a .txt"""
+    fixtures = []
+    for name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(name)
+        truth = os.path.join(directory, stem + ".txt")
+        if ext.lower() in IMAGE_EXTENSIONS and os.path.exists(truth):
+            with open(os.path.join(directory, name), "rb") as f, open(truth) as t:
+                fixtures.append((name, f.read(), t.read()))
+    return fixtures
+
+def write_synthetic(directory: str, count: int):
+    """Render claims as images of varying size and contrast"""
+    from PIL import Image, ImageDraw, ImageFont
+
+    os.makedirs(directory, exist_ok=True)
+    for i in range(count):
+        text = SAMPLE_CLAIMS[i % len(SAMPLE_CLAIMS)]
+        size = 24 + (i % 4) * 8
+        font = ImageFont.load_default(size=size)
+        words, lines = text.split(), []
+        while words:
+            lines.append(" ".join(words[:5]))
+            words = words[5:]
+
+        background = (255 - (i % 3) * 30,) * 3
+        image = Image.new("RGB", (size * 18, size * (len(lines) * 2 + 2)), background)
+        draw = ImageDraw.Draw(image)
+        for row, line in enumerate(lines):
+            draw.text((size, size * (row * 2 + 1)), line, fill=(0, 0, 0), font=font)
+
+        image.save(os.path.join(directory, f"synthetic_{i:03d}.png"))
+        with open(os.path.join(directory, f"synthetic_{i:03d}.txt"), "w") as f:
+            f.write(text)
+
+def run_backend(name: str, fixtures, concurrency: int, preprocess: bool) -> Dict:
+    backend = ocr_client.backends[name]
+
+    def one(fixture):
+        filename, data, expected = fixture
+        if preprocess:
+            data, _ = preprocess_for_ocr(data)
+        started = time.perf_counter()
+        try:
+            text = backend.recognize(data, filename)['text']
+            ok = True
+        except Exception as e:
+            print(f"⚠️  {name} failed on {filename}: {e}")
+            text, ok = "", False
+        return time.perf_counter() - started, ok, accuracy(expected, text)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, fixtures))
+    wall = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, _, _ in results)
+    return {
+        "images": len(results),
+        "failures": sum(1 for _, ok, _ in results if not ok),
+        "images_per_second": len(results) / wall if wall else 0.0,
+        "p50_seconds": latencies[len(latencies) // 2],
+        "p95_seconds": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+        "accuracy": sum(acc for _, _, acc in results) / len(results)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare OCR backends on a fixture set")
+    parser.add_argument("fixtures", help="Directory of images with same-named .txt ground truth")
+    parser.add_argument("--backends", default=",".join(ocr_client.backends), help="Comma-separated backends")
+    parser.add_argument("--concurrency", type=int, default=2, help="Images in flight per backend")
+    parser.add_argument("--synthetic", type=int, default=0, help="Render N synthetic fixtures first")
+    parser.add_argument("--no-preprocess", action="store_true", help="Send the original image bytes")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        write_synthetic(args.fixtures, args.synthetic)
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        raise SystemExit(f"No fixtures (image + .txt) in {args.fixtures}")
+
+    print(f"📊 {len(fixtures)} fixtures, concurrency {args.concurrency}\n")
+    print(f"{'backend':<12} {'images/s':>9} {'p50 s':>7} {'p95 s':>7} {'accuracy':>9} {'failed':>7}")
+
+    for name in args.backends.split(","):
+        backend = ocr_client.backends.get(name)
+        if backend is None or not backend.available():
+            print(f"{name:<12} unavailable")
+            continue
+        stats = run_backend(name, fixtures, args.concurrency, not args.no_preprocess)
+        print(
+            f"{name:<12} {stats['images_per_second']:>9.2f} {stats['p50_seconds']:>7.2f} "
+            f"{stats['p95_seconds']:>7.2f} {stats['accuracy']:>9.1%} {stats['failures']:>7}"
+        )
+
+if __name__ == "__main__":
+    main()
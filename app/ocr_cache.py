@@ -0,0 +1,180 @@
+"""
+OCR Cache
+OCR text stored against image hashes, reused for identical and near-identical images
+
+Memes are re-uploaded constantly, often resized or recompressed. Results are
+keyed by the upload's content hash (exact repeats) and indexed by a 64-bit
+perceptual difference hash, split into four 16-bit bands: any image within
+Hamming distance 3 of a cached one shares at least one band, so candidates
+come from a few small Redis sets instead of a scan. Like metrics, the cache
+must never break OCR: Redis failures are logged and treated as misses.
+
+The 64-bit hash is blind to captions: one meme template with "IS SAFE" and
+"IS NOT SAFE" on it differs by a bit or two. A perceptual candidate is
+therefore only reused if a 32x32 detail hash also matches tile by tile, which
+catches changed words (recompression spreads a few flipped bits evenly, a new
+word concentrates them in the caption's tiles). Single-character edits can
+still slip through; set ocr_cache_max_distance to -1 to reuse exact bytes only.
+"""
+
+import io
+import json
+import redis
+from typing import Dict, Optional
+from PIL import Image
+from app.config import settings
+from app.metrics import metrics
+
+KEY_PREFIX = "satya:ocr:"
+BANDS = 4  # 64-bit hash -> 4 bands of 16 bits; finds every match within distance BANDS - 1
+
+DETAIL_SIZE = 32  # Detail hash is 32x32 bits; one hex digit = 4 bits of a row
+DETAIL_TILE_ROWS = 4  # Tiles are 4 rows x 4 bits
+
+def _dhash(data: bytes, size: int) -> Optional[str]:
+    """size x size difference hash as hex, row by row (None if unreadable)"""
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            small = image.convert("L").resize((size + 1, size), Image.LANCZOS)
+    except Exception as e:
+        print(f"⚠️  Perceptual hash failed: {e}")
+        return None
+
+    pixels = list(small.getdata())
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            left, right = pixels[row * (size + 1) + col], pixels[row * (size + 1) + col + 1]
+            bits = (bits << 1) | (left > right)
+    return f"{bits:0{size * size // 4}x}"
+
+def perceptual_hash(data: bytes) -> Optional[str]:
+    """
+    Difference hash (dHash) of an image
+
+    Returns:
+        16 hex characters, or None if the bytes are not a readable image
+    """
+    return _dhash(data, 8)
+
+def detail_hash(data: bytes) -> Optional[str]:
+    """32x32 dHash (256 hex characters) used to confirm perceptual matches"""
+    return _dhash(data, DETAIL_SIZE)
+
+def hamming_distance(a: str, b: str) -> int:
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+def max_tile_distance(a: str, b: str) -> int:
+    """Largest Hamming distance between matching 4x4-bit tiles of two detail hashes"""
+    digits = DETAIL_SIZE // 4
+    worst = 0
+    for top in range(0, DETAIL_SIZE, DETAIL_TILE_ROWS):
+        for col in range(digits):
+            positions = [row * digits + col for row in range(top, top + DETAIL_TILE_ROWS)]
+            worst = max(worst, sum(hamming_distance(a[i], b[i]) for i in positions))
+    return worst
+
+def _bands(phash: str):
+    width = len(phash) // BANDS
+    return [f"{KEY_PREFIX}band:{i}:{phash[i * width:(i + 1) * width]}" for i in range(BANDS)]
+
+class OCRCache:
+    """OCR results by content hash, with perceptual near-duplicate lookup"""
+
+    def __init__(self, redis_url: str):
+        self.redis_url = redis_url
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = redis.from_url(self.redis_url, socket_connect_timeout=2)
+        return self._client
+
+    def get(self, content_hash: str, phash: Optional[str], detail: Optional[str] = None) -> Optional[Dict]:
+        """
+        Cached OCR result for an image
+
+        Args:
+            content_hash: dedupe.content_hash("image", bytes)
+            phash: perceptual_hash(bytes), or None to match exact repeats only
+            detail: detail_hash(bytes); perceptual matches need it to be confirmed
+
+        Returns:
+            {"text", "phash", "detail", "processing_time", "match": "exact"|"similar", "distance"} or None
+        """
+        if not settings.ocr_cache_enabled:
+            return None
+
+        try:
+            entry = self._load(content_hash)
+            match, distance = "exact", 0
+            if entry is None and phash and detail and settings.ocr_cache_max_distance >= 0:
+                entry, distance = self._nearest(phash, detail)
+                match = "similar"
+        except Exception as e:
+            print(f"⚠️  OCR cache read failed: {e}")
+            entry = None
+
+        if entry is None:
+            metrics.incr("satya_ocr_cache_requests_total", result="miss")
+            return None
+
+        metrics.incr("satya_ocr_cache_requests_total", result=f"hit_{match}")
+        return {**entry, "match": match, "distance": distance}
+
+    def set(self, content_hash: str, phash: Optional[str], text: str, processing_time: int = 0,
+            detail: Optional[str] = None):
+        """
+        Store a successful OCR result
+
+        Blank text is never stored: it usually means a transient engine
+        failure or a bad preprocess, and would be served to every re-upload.
+        """
+        if not settings.ocr_cache_enabled or not text.strip():
+            return
+
+        ttl = settings.ocr_cache_ttl_days * 86400
+        entry = json.dumps({"text": text, "phash": phash, "detail": detail, "processing_time": processing_time})
+
+        try:
+            with self.client.pipeline() as pipe:
+                pipe.set(f"{KEY_PREFIX}{content_hash}", entry, ex=ttl)
+                if phash:
+                    pipe.set(f"{KEY_PREFIX}phash:{phash}", content_hash, ex=ttl)
+                    for band in _bands(phash):
+                        pipe.sadd(band, phash)
+                        pipe.expire(band, ttl)
+                pipe.execute()
+        except Exception as e:
+            print(f"⚠️  OCR cache write failed: {e}")
+
+    def _load(self, content_hash: str) -> Optional[Dict]:
+        raw = self.client.get(f"{KEY_PREFIX}{content_hash}")
+        return json.loads(raw) if raw else None
+
+    def _nearest(self, phash: str, detail: str):
+        """
+        Closest cached image within ocr_cache_max_distance whose detail hash
+        agrees in every tile (within ocr_cache_detail_max_bits), as (entry, distance)
+        """
+        candidates = [c.decode("utf-8") for c in self.client.sunion(_bands(phash))]
+        scored = sorted(
+            (hamming_distance(phash, candidate), candidate) for candidate in candidates
+        )
+        max_distance = min(settings.ocr_cache_max_distance, BANDS - 1)
+
+        for distance, candidate in scored:
+            if distance > max_distance:
+                break
+            content_hash = self.client.get(f"{KEY_PREFIX}phash:{candidate}")
+            entry = self._load(content_hash.decode("utf-8")) if content_hash else None
+            if entry is None or not entry.get("detail"):
+                continue
+            if max_tile_distance(detail, entry["detail"]) <= settings.ocr_cache_detail_max_bits:
+                return entry, distance
+
+        return None, 0
+
+# Create singleton
+ocr_cache = OCRCache(settings.redis_url)
@@ -0,0 +1,247 @@
+"""
+OCR Client
+Pluggable OCR backends (OCR.space API, local Tesseract) behind one routing client
+
+OCR.space is accurate but remote: uploads are slow, large images hit its
+size limit, and its latency varies with load. Tesseract runs locally in a
+process pool with no network at all. In "auto" mode each image goes to
+OCR.space unless it is too large for it or its recent latency or error rate
+is too high; the other backend is the fallback.
+"""
+
+import io
+import os
+import time
+import threading
+import multiprocessing
+import requests
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, List
+from app.config import settings
+from app.llm_router import ProviderStats
+from app.metrics import metrics, record_external_call
+
+# Try to import pytesseract, but make it optional (it also needs the tesseract binary)
+try:
+    import pytesseract
+    TESSERACT_AVAILABLE = True
+except ImportError:
+    TESSERACT_AVAILABLE = False
+
+# Extra wait for a pool slot / process start on top of the OCR timeout itself
+TESSERACT_QUEUE_GRACE_SECONDS = 5
+
+class OCRError(Exception):
+    """Every OCR backend failed (or none is configured)"""
+
+class OCRBackend:
+    """Interface for OCR engines"""
+
+    name = ""
+    remote = False
+
+    def available(self) -> bool:
+        raise NotImplementedError
+
+    def recognize(self, image_bytes: bytes, filename: str) -> Dict:
+        """
+        OCR an image
+
+        Returns:
+            {"text", "processing_time" (ms, as reported by the engine)}
+
+        Raises:
+            Exception: on any failure
+        """
+        raise NotImplementedError
+
+class OCRSpaceBackend(OCRBackend):
+    """OCR.space HTTP API (engine 2)"""
+
+    name = "ocr_space"
+    remote = True
+
+    def available(self) -> bool:
+        return bool(settings.ocr_space_key)
+
+    def recognize(self, image_bytes: bytes, filename: str) -> Dict:
+        response = requests.post(
+            "https://api.ocr.space/parse/image",
+            files={"file": (filename, image_bytes)},
+            data={
+                "apikey": settings.ocr_space_key,
+                "language": "eng",
+                "isOverlayRequired": False,
+                "detectOrientation": True,
+                "scale": True,
+                "OCREngine": 2
+            },
+            timeout=settings.ocr_timeout_seconds
+        )
+        record_external_call(len(response.content))
+
+        if response.status_code != 200:
+            raise Exception(f"OCR API error: {response.status_code}")
+
+        data = response.json()
+
+        if data.get('IsErroredOnProcessing'):
+            error_msg = data.get('ErrorMessage', ['Unknown error'])[0]
+            raise Exception(f"OCR processing error: {error_msg}")
+
+        return {
+            "text": data['ParsedResults'][0]['ParsedText'],
+            "processing_time": data.get('ProcessingTimeInMilliseconds', 0)
+        }
+
+def _tesseract_ocr(image_bytes: bytes, lang: str, config: str, timeout: float) -> str:
+    """
+    Run Tesseract on one image (executes in a pool process)
+
+    pytesseract kills the tesseract subprocess after `timeout` seconds
+    (raising RuntimeError), so a slow image frees its pool slot.
+    """
+    from PIL import Image
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        return pytesseract.image_to_string(image, lang=lang, config=config, timeout=timeout)
+
+class TesseractBackend(OCRBackend):
+    """Local Tesseract in a process pool (CPU-bound, so not threads)"""
+
+    name = "tesseract"
+
+    def __init__(self):
+        self._pool = None
+        self._pid = None
+        self._available = None
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        if not TESSERACT_AVAILABLE:
+            return False
+        if self._available is None:
+            try:
+                pytesseract.get_tesseract_version()
+                self._available = True
+            except Exception:
+                self._available = False
+        return self._available
+
+    def recognize(self, image_bytes: bytes, filename: str) -> Dict:
+        started = time.perf_counter()
+        future = self._executor().submit(
+            _tesseract_ocr,
+            image_bytes,
+            settings.ocr_tesseract_lang,
+            settings.ocr_tesseract_config,
+            settings.ocr_timeout_seconds
+        )
+        try:
+            text = future.result(timeout=settings.ocr_timeout_seconds + TESSERACT_QUEUE_GRACE_SECONDS)
+        except FutureTimeout:
+            future.cancel()  # Still queued behind other images: don't run it later
+            raise
+        return {
+            "text": text,
+            "processing_time": int((time.perf_counter() - started) * 1000)
+        }
+
+    def _executor(self) -> ProcessPoolExecutor:
+        """The process pool, created on first use (and again after a fork)"""
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    # spawn: forking a worker that already runs threads is unsafe
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=settings.ocr_local_workers,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+                    self._pid = os.getpid()
+        return self._pool
+
+class OCRClient:
+    """Chooses a backend per image and falls back to the others"""
+
+    def __init__(self, backends: List[OCRBackend]):
+        self.backends = {backend.name: backend for backend in backends}
+        self.stats = {name: ProviderStats(settings.ocr_routing_window) for name in self.backends}
+        self._remote_skipped = 0
+
+    def available(self) -> List[str]:
+        return [name for name, backend in self.backends.items() if backend.available()]
+
+    def order(self, image_bytes: bytes) -> List[str]:
+        """
+        Backends to try for an image, preferred first
+
+        ocr_backend picks one explicitly; "auto" prefers the remote engine
+        unless the image exceeds ocr_remote_max_bytes or the remote's recent
+        p50 / error rate is over ocr_remote_slow_seconds / ocr_remote_max_error_rate.
+        While the remote is skipped for being slow, every
+        ocr_remote_probe_interval-th image still goes to it so its stats recover.
+        """
+        names = self.available()
+        if settings.ocr_backend in names:
+            return [settings.ocr_backend] + [n for n in names if n != settings.ocr_backend]
+        if len(names) < 2:
+            return names
+
+        remote = [n for n in names if self.backends[n].remote]
+        local = [n for n in names if not self.backends[n].remote]
+
+        if len(image_bytes) > settings.ocr_remote_max_bytes:
+            return local + remote
+
+        stats = self.stats[remote[0]]
+        p50 = stats.percentile(0.5)
+        slow = (p50 is not None and p50 > settings.ocr_remote_slow_seconds) or \
+            stats.error_rate >= settings.ocr_remote_max_error_rate
+        if slow:
+            self._remote_skipped += 1
+            if self._remote_skipped < settings.ocr_remote_probe_interval:
+                return local + remote
+        self._remote_skipped = 0
+        return remote + local
+
+    def recognize(self, image_bytes: bytes, filename: str, preprocessed: bool = False) -> Dict:
+        """
+        OCR an image with the best backend, falling back on failure
+
+        Returns:
+            {"text", "processing_time", "backend", "seconds"}
+
+        Raises:
+            OCRError: if no backend is available or all of them failed
+        """
+        order = self.order(image_bytes)
+        if not order:
+            raise OCRError("No OCR backend configured")
+
+        errors = []
+        for name in order:
+            started = time.perf_counter()
+            try:
+                result = self.backends[name].recognize(image_bytes, filename)
+                ok = True
+            except Exception as e:
+                ok = False
+                errors.append(f"{name}: {e}")
+                print(f"⚠️  OCR backend {name} failed: {e}")
+
+            seconds = time.perf_counter() - started
+            self.stats[name].record(seconds, ok)
+            metrics.observe(
+                "satya_ocr_request_seconds",
+                seconds,
+                backend=name,
+                outcome="ok" if ok else "error",
+                preprocessed=str(preprocessed).lower()
+            )
+
+            if ok:
+                return {**result, "backend": name, "seconds": round(seconds, 3)}
+
+        raise OCRError("; ".join(errors))
+
+# Create singleton
+ocr_client = OCRClient([OCRSpaceBackend(), TesseractBackend()])
@@ -1,5 +1,22 @@
 """
 Orchestrator: Coordinates all agents in the pipeline
+
+The pipeline is declared as a dependency graph of stages (see app/pipeline.py):
+
+    classify -> extract -> format -> save_claim -+-> factcheck -> identify -+
+                                                 |                          |
+                                                 +-> search ----------------+-> summarize -+-> finalize
+                                                                                            +-> report
+
+Fact-check APIs and web search only need the normalized claim and entities, so
+they run concurrently. Identify always asks for a web search, so search is
+started speculatively instead of waiting for it. The submission is marked
+completed as soon as the summary exists; the report renders alongside.
+
+Every stage's outputs are checkpointed (app/checkpoints.py). A retried
+submission skips completed stages, so OCR, fact-check APIs, SerpAPI and
+article fetches are paid for at most once per submission. Stage writes are
+idempotent for the same reason.
 """
 
 import asyncio
@@ -10,6 +27,13 @@ from app.database import (
     fact_checks_collection, evidence_collection,
     summaries_collection, reports_collection
 )
+from pymongo import ReturnDocument
+from app.checkpoints import StageCheckpointStore
+from app.browser_pool import browser_pool
+from app.http_session import close_http_session
+from app.llm_client import llm_client
+from app.metrics import metrics
+from app.pipeline import Stage, PipelineScheduler
 from app.agents.classify import classify_agent
 from app.agents.extract import extraction_agent
 from app.agents.format import format_agent
@@ -22,237 +46,342 @@ from app.agents.report import report_agent
 def process_submission(submission_id: str):
     """
     Process a submission through the agent pipeline
-    
+
     Phase 2: Agents 1-3 (Classify, Extract, Format) ✅
     Phase 3: Agents 4-6 (Fact-check, Identify, Search) ✅
     Phase 4: Agents 7-8 (Summarize, Report) ✅
-    
+
     Args:
         submission_id: MongoDB ObjectId as string
-        
+
     Returns:
         Processing result
     """
-    
-    # Run async agents in sync context
-    return asyncio.run(process_submission_async(submission_id))
+
+    # Run async agents in sync context (one short-lived loop per job)
+    return asyncio.run(_process_and_close(submission_id))
+
+async def _process_and_close(submission_id: str):
+    """Run the pipeline, then release the per-loop HTTP clients"""
+    try:
+        return await process_submission_async(submission_id)
+    finally:
+        await close_http_session()
+        await llm_client.async_clients.aclose()
+        await browser_pool.close()
+
+# ============================================================
+# STAGES
+# ============================================================
+
+def _classify_stage(submission):
+    """Agent 1: Classify"""
+    classify_result = classify_agent.run(submission)
+
+    print("🔍 Agent 1: Classify")
+    print(f"✓ Input type: {classify_result['input_type']}")
+    print(f"✓ Metadata: {classify_result['metadata']}")
+
+    return {"classification": classify_result}
+
+async def _extract_stage(classification):
+    """Agent 2: Extract Claim"""
+    extraction_result = await extraction_agent.arun(
+        classification['input_type'],
+        classification['input_ref'],
+        classification['metadata']
+    )
+
+    print("🔍 Agent 2: Extract Claim")
+    if not extraction_result['success']:
+        print(f"⚠️  Extraction failed: {extraction_result.get('error', 'Unknown error')}")
+        print(f"✓ Using fallback: {extraction_result['claim_text']}")
+    else:
+        print(f"✓ Claim extracted: {extraction_result['claim_text'][:100]}...")
+    if extraction_result.get('metadata', {}).get('timings'):
+        print(f"✓ Method: {extraction_result['metadata'].get('method', 'none')} {extraction_result['metadata']['timings']}")
+
+    return {"extraction": extraction_result}
+
+def _format_stage(submission, extraction):
+    """Agent 3: Format & Normalize"""
+    format_result = format_agent.run(
+        extraction['claim_text'],
+        reference_date=submission['created_at']
+    )
+
+    print("🔍 Agent 3: Format & Normalize")
+    print(f"✓ Normalized: {format_result['normalized_claim'][:100]}...")
+    print(f"✓ Entities found: {len(format_result['entities'])}")
+    if format_result['entities']:
+        print(f"  - {', '.join(format_result['entities'][:5])}")
+
+    return {"formatted": format_result}
+
+def _save_claim_stage(submission_id, extraction, formatted):
+    """Persist the normalized claim so later agents can reference it"""
+    claim = {
+        "submission_id": ObjectId(submission_id),
+        "claim_text": extraction['claim_text'],
+        "normalized_claim": formatted['normalized_claim'],
+        "entities": formatted['entities'],
+        "entity_types": formatted['entity_types'],
+        "raw_ocr": extraction.get('raw_content'),
+        "extracted_from": extraction['extracted_from'],
+        "extraction_success": extraction['success'],
+        "extraction_metadata": extraction.get('metadata', {}),
+        "created_at": datetime.utcnow()
+    }
+
+    # Upsert by submission so a retried stage never creates a second claim
+    saved = claims_collection.find_one_and_update(
+        {"submission_id": claim['submission_id']},
+        {"$set": claim},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    claim_id = saved['_id']
+
+    print(f"💾 Claim saved with ID: {claim_id}")
+
+    return {"claim_id": claim_id}
+
+async def _factcheck_stage(formatted, claim_id):
+    """Agent 4: Fact-Check APIs"""
+    fact_checks = await factcheck_agent.check_all_sources(
+        formatted['normalized_claim']
+    )
+
+    print("🔍 Agent 4: Fact-Check APIs")
+
+    # Replace rows left behind by an interrupted earlier attempt
+    await asyncio.to_thread(fact_checks_collection.delete_many, {"claim_id": claim_id})
+
+    if fact_checks:
+        for fc in fact_checks:
+            fc['claim_id'] = claim_id
+        await asyncio.to_thread(fact_checks_collection.insert_many, fact_checks)
+        print(f"✓ Found {len(fact_checks)} authoritative fact-checks")
+    else:
+        print(f"✓ No authoritative fact-checks found")
+
+    return {"fact_checks": fact_checks}
+
+def _identify_stage(claim_id, fact_checks):
+    """Agent 5: Identify Verification Status"""
+    identify_result = identify_agent.identify(claim_id)
+
+    print("🔍 Agent 5: Identify Verification Status")
+    if identify_result['found']:
+        print(f"✓ Status: Authoritative fact-check found")
+        print(f"✓ Confidence: {identify_result['confidence']}")
+        print(f"✓ Source: {identify_result['primary_factcheck'].get('publisher', 'Unknown')}")
+    else:
+        print(f"✓ Status: No authoritative fact-check")
+        print(f"✓ Reason: {identify_result['reason']}")
+
+    return {"identification": identify_result}
+
+async def _search_stage(formatted, claim_id):
+    """
+    Agent 6: Web Search & Evidence Collection
+
+    Runs alongside fact-checking: IdentifyAgent always sets
+    should_search_web=True, so waiting for it only adds latency.
+    """
+    evidence_list = await search_agent.search_and_collect(
+        formatted['normalized_claim'],
+        formatted['entities']
+    )
+
+    print("🔍 Agent 6: Web Search & Evidence Collection")
+
+    # Replace rows left behind by an interrupted earlier attempt
+    await asyncio.to_thread(evidence_collection.delete_many, {"claim_id": claim_id})
+
+    if evidence_list:
+        for ev in evidence_list:
+            ev['claim_id'] = claim_id
+        await asyncio.to_thread(evidence_collection.insert_many, evidence_list)
+        print(f"✓ Collected {len(evidence_list)} evidence sources")
+
+        # Show reliability breakdown
+        high_reliability = sum(1 for e in evidence_list if e['reliability_score'] >= 0.8)
+        print(f"✓ High reliability sources: {high_reliability}/{len(evidence_list)}")
+    else:
+        print(f"✓ No evidence collected")
+
+    return {"evidence": evidence_list}
+
+async def _summarize_stage(submission_id, claim_id, fact_checks, evidence, identification):
+    """
+    Agent 7: Summarize with LLM (reads fact-checks and evidence from the DB)
+
+    While the response streams, a provisional explanation and confidence are
+    stored on the submission so /result can show them before completion.
+    """
+    async def publish_provisional(partial):
+        await asyncio.to_thread(
+            submissions_collection.update_one,
+            {"_id": ObjectId(submission_id)},
+            {"$set": {"provisional_summary": partial}}
+        )
+        print(f"✓ Provisional verdict published (confidence {partial['confidence']:.2%})")
+
+    summary_result = await summarize_agent.asummarize(claim_id, on_partial=publish_provisional)
+
+    # Save summary
+    summary_result['claim_id'] = claim_id
+    summary_result['created_at'] = datetime.utcnow()
+    await asyncio.to_thread(
+        summaries_collection.replace_one, {"claim_id": claim_id}, summary_result, upsert=True
+    )
+
+    print("🔍 Agent 7: Summarize with LLM")
+    print(f"✓ Summary generated")
+    print(f"✓ Confidence: {summary_result['confidence']:.2%}")
+    print(f"✓ LLM Confidence: {summary_result['llm_confidence']:.2%}")
+    print(f"✓ Calculated Confidence: {summary_result['calculated_confidence']:.2%}")
+
+    if summary_result['hallucination_detected']:
+        print(f"⚠️  Hallucination detected and filtered")
+
+    print(f"✓ Top sources: {len(summary_result['top_sources'])}")
+
+    return {"summary": summary_result}
+
+def _finalize_stage(submission_id, claim_id, fact_checks, evidence, summary):
+    """Mark the submission completed as soon as the verdict is available"""
+    submissions_collection.update_one(
+        {"_id": ObjectId(submission_id)},
+        {
+            "$set": {
+                "status": "completed",
+                "result_id": claim_id,
+                "completed_at": datetime.utcnow(),
+                "fact_checks_count": len(fact_checks),
+                "evidence_count": len(evidence),
+                "confidence": summary['confidence']
+            },
+            "$unset": {"provisional_summary": ""}
+        }
+    )
+
+    print(f"✅ Submission {submission_id} completed")
+
+    return {}
+
+def _report_stage(submission_id, claim_id, summary):
+    """
+    Agent 8: Generate PDF Report (off the critical path)
+
+    Runs after finalize has already served the verdict, so a failure here is
+    recorded as report_error instead of failing the submission.
+    """
+    print("🔍 Agent 8: Generate PDF Report")
+
+    try:
+        report_result = report_agent.generate_report(claim_id)
+
+        # Save report metadata
+        report_result['claim_id'] = claim_id
+        reports_collection.replace_one({"claim_id": claim_id}, report_result, upsert=True)
+    except Exception as e:
+        print(f"⚠️  Report generation failed: {e}")
+        submissions_collection.update_one(
+            {"_id": ObjectId(submission_id)},
+            {"$set": {"report_error": str(e)}}
+        )
+        return {"report": {"claim_id": claim_id, "pdf_path": None, "error": str(e)}}
+
+    submissions_collection.update_one(
+        {"_id": ObjectId(submission_id)},
+        {
+            "$set": {"report_path": report_result['pdf_path']},
+            "$unset": {"report_error": ""}
+        }
+    )
+
+    print(f"✓ Report generated: {report_result['pdf_path']}")
+
+    return {"report": report_result}
+
+PIPELINE_STAGES = [
+    Stage("classify", _classify_stage,
+          inputs=["submission"], outputs=["classification"]),
+    Stage("extract", _extract_stage,
+          inputs=["classification"], outputs=["extraction"]),
+    Stage("format", _format_stage, blocking=True,
+          inputs=["submission", "extraction"], outputs=["formatted"]),
+    Stage("save_claim", _save_claim_stage, blocking=True,
+          inputs=["submission_id", "extraction", "formatted"], outputs=["claim_id"]),
+    Stage("factcheck", _factcheck_stage,
+          inputs=["formatted", "claim_id"], outputs=["fact_checks"]),
+    Stage("identify", _identify_stage, blocking=True,
+          inputs=["claim_id", "fact_checks"], outputs=["identification"]),
+    Stage("search", _search_stage,
+          inputs=["formatted", "claim_id"], outputs=["evidence"]),
+    Stage("summarize", _summarize_stage,
+          inputs=["submission_id", "claim_id", "fact_checks", "evidence", "identification"], outputs=["summary"]),
+    Stage("finalize", _finalize_stage, blocking=True,
+          inputs=["submission_id", "claim_id", "fact_checks", "evidence", "summary"]),
+    Stage("report", _report_stage, blocking=True,
+          inputs=["submission_id", "claim_id", "summary"], outputs=["report"]),
+]
+
+pipeline = PipelineScheduler(PIPELINE_STAGES)
 
 async def process_submission_async(submission_id: str):
     """Async version of process_submission"""
-    
+
     print(f"\n{'='*60}")
     print(f"📝 Processing submission: {submission_id}")
     print(f"{'='*60}\n")
-    
+
+    spans = []
+    attempt = 1
+
     try:
-        # Get submission from database
-        submission = submissions_collection.find_one(
+        # Get submission from database (off the loop: the async worker shares it)
+        submission = await asyncio.to_thread(
+            submissions_collection.find_one,
             {"_id": ObjectId(submission_id)}
         )
-        
+
         if not submission:
             raise Exception("Submission not found")
-        
+
+        attempt = submission.get('attempts', 0) + 1
+
         # Update status to processing
-        submissions_collection.update_one(
-            {"_id": ObjectId(submission_id)},
-            {"$set": {"status": "processing"}}
-        )
-        
-        # ============================================================
-        # AGENT 1: CLASSIFY
-        # ============================================================
-        print("🔍 Agent 1: Classify")
-        print("-" * 60)
-        
-        classify_result = classify_agent.run(submission)
-        
-        input_type = classify_result['input_type']
-        input_ref = classify_result['input_ref']
-        
-        print(f"✓ Input type: {input_type}")
-        print(f"✓ Metadata: {classify_result['metadata']}")
-        print()
-        
-        # ============================================================
-        # AGENT 2: EXTRACT
-        # ============================================================
-        print("🔍 Agent 2: Extract Claim")
-        print("-" * 60)
-        
-        extraction_result = extraction_agent.run(input_type, input_ref)
-        
-        if not extraction_result['success']:
-            print(f"⚠️  Extraction failed: {extraction_result.get('error', 'Unknown error')}")
-            print(f"✓ Using fallback: {extraction_result['claim_text']}")
-        else:
-            print(f"✓ Claim extracted: {extraction_result['claim_text'][:100]}...")
-        
-        print()
-        
-        # ============================================================
-        # AGENT 3: FORMAT
-        # ============================================================
-        print("🔍 Agent 3: Format & Normalize")
-        print("-" * 60)
-        
-        format_result = format_agent.run(
-            extraction_result['claim_text'],
-            reference_date=submission['created_at']
-        )
-        
-        print(f"✓ Normalized: {format_result['normalized_claim'][:100]}...")
-        print(f"✓ Entities found: {len(format_result['entities'])}")
-        if format_result['entities']:
-            print(f"  - {', '.join(format_result['entities'][:5])}")
-        print()
-        
-        # ============================================================
-        # SAVE CLAIM TO DATABASE
-        # ============================================================
-        print("💾 Saving to database...")
-        print("-" * 60)
-        
-        claim = {
-            "submission_id": ObjectId(submission_id),
-            "claim_text": extraction_result['claim_text'],
-            "normalized_claim": format_result['normalized_claim'],
-            "entities": format_result['entities'],
-            "entity_types": format_result['entity_types'],
-            "raw_ocr": extraction_result.get('raw_content'),
-            "extracted_from": extraction_result['extracted_from'],
-            "extraction_success": extraction_result['success'],
-            "created_at": datetime.utcnow()
-        }
-        
-        result = claims_collection.insert_one(claim)
-        claim_id = result.inserted_id
-        
-        print(f"✓ Claim saved with ID: {claim_id}")
-        print()
-        
-        # ============================================================
-        # AGENT 4: FACT-CHECK APIs
-        # ============================================================
-        print("🔍 Agent 4: Fact-Check APIs")
-        print("-" * 60)
-        
-        fact_checks = await factcheck_agent.check_all_sources(
-            format_result['normalized_claim']
-        )
-        
-        # Save fact-checks
-        if fact_checks:
-            for fc in fact_checks:
-                fc['claim_id'] = claim_id
-                fact_checks_collection.insert_one(fc)
-            print(f"✓ Found {len(fact_checks)} authoritative fact-checks")
-        else:
-            print(f"✓ No authoritative fact-checks found")
-        print()
-        
-        # ============================================================
-        # AGENT 5: IDENTIFY
-        # ============================================================
-        print("🔍 Agent 5: Identify Verification Status")
-        print("-" * 60)
-        
-        identify_result = identify_agent.identify(claim_id)
-        
-        if identify_result['found']:
-            print(f"✓ Status: Authoritative fact-check found")
-            print(f"✓ Confidence: {identify_result['confidence']}")
-            print(f"✓ Source: {identify_result['primary_factcheck'].get('publisher', 'Unknown')}")
-        else:
-            print(f"✓ Status: No authoritative fact-check")
-            print(f"✓ Reason: {identify_result['reason']}")
-        print()
-        
-        # ============================================================
-        # AGENT 6: WEB SEARCH
-        # ============================================================
-        evidence_list = []
-        
-        if identify_result['should_search_web']:
-            print("🔍 Agent 6: Web Search & Evidence Collection")
-            print("-" * 60)
-            
-            evidence_list = await search_agent.search_and_collect(
-                format_result['normalized_claim'],
-                format_result['entities']
-            )
-            
-            # Save evidence
-            if evidence_list:
-                for ev in evidence_list:
-                    ev['claim_id'] = claim_id
-                    evidence_collection.insert_one(ev)
-                print(f"✓ Collected {len(evidence_list)} evidence sources")
-                
-                # Show reliability breakdown
-                high_reliability = sum(1 for e in evidence_list if e['reliability_score'] >= 0.8)
-                print(f"✓ High reliability sources: {high_reliability}/{len(evidence_list)}")
-            else:
-                print(f"✓ No evidence collected")
-            print()
-        
-        # ============================================================
-        # AGENT 7: SUMMARIZE
-        # ============================================================
-        print("🔍 Agent 7: Summarize with LLM")
-        print("-" * 60)
-        
-        summary_result = summarize_agent.summarize(claim_id)
-        
-        # Save summary
-        summary_result['claim_id'] = claim_id
-        summary_result['created_at'] = datetime.utcnow()
-        summaries_collection.insert_one(summary_result)
-        
-        print(f"✓ Summary generated")
-        print(f"✓ Confidence: {summary_result['confidence']:.2%}")
-        print(f"✓ LLM Confidence: {summary_result['llm_confidence']:.2%}")
-        print(f"✓ Calculated Confidence: {summary_result['calculated_confidence']:.2%}")
-        
-        if summary_result['hallucination_detected']:
-            print(f"⚠️  Hallucination detected and filtered")
-        
-        print(f"✓ Top sources: {len(summary_result['top_sources'])}")
-        print()
-        
-        # ============================================================
-        # AGENT 8: REPORT
-        # ============================================================
-        print("🔍 Agent 8: Generate PDF Report")
-        print("-" * 60)
-        
-        report_result = report_agent.generate_report(claim_id)
-        
-        # Save report metadata
-        report_result['claim_id'] = claim_id
-        reports_collection.insert_one(report_result)
-        
-        print(f"✓ Report generated: {report_result['pdf_path']}")
-        print()
-        
-        # ============================================================
-        # UPDATE SUBMISSION STATUS
-        # ============================================================
-        submissions_collection.update_one(
+        await asyncio.to_thread(
+            submissions_collection.update_one,
             {"_id": ObjectId(submission_id)},
             {
-                "$set": {
-                    "status": "completed",
-                    "result_id": claim_id,
-                    "completed_at": datetime.utcnow(),
-                    "fact_checks_count": len(fact_checks),
-                    "evidence_count": len(evidence_list),
-                    "confidence": summary_result['confidence'],
-                    "report_path": report_result['pdf_path']
-                }
+                "$set": {"status": "processing", "processing_started_at": datetime.utcnow()},
+                "$inc": {"attempts": 1}
             }
         )
-        
+
+        # Resume from the first incomplete stage if an earlier attempt failed
+        checkpoint = StageCheckpointStore(submission_id)
+
+        results = await pipeline.run(
+            {
+                "submission_id": submission_id,
+                "submission": submission
+            },
+            checkpoint=checkpoint,
+            spans=spans
+        )
+
+        await asyncio.to_thread(checkpoint.clear)
+
+        extraction_result = results['extraction']
+        format_result = results['formatted']
+        summary_result = results['summary']
+        report_result = results['report']
+
         print(f"{'='*60}")
         print(f"✅ All 8 Agents Complete!")
         print(f"{'='*60}\n")
@@ -260,29 +389,31 @@ async def process_submission_async(submission_id: str):
         print(f"   Claim: {extraction_result['claim_text'][:60]}...")
         print(f"   Confidence: {summary_result['confidence']:.2%}")
         print(f"   Explanation: {summary_result['short_explanation'][:80]}...")
-        print(f"   Report: {report_result['pdf_path']}")
+        print(f"   Report: {report_result.get('pdf_path') or 'failed'}")
+        print(f"   Timings: {' | '.join(f'{span.name} {span.wall_time:.2f}s' for span in spans)}")
         print()
-        
+
         return {
             "success": True,
-            "claim_id": str(claim_id),
+            "claim_id": str(results['claim_id']),
             "claim_text": extraction_result['claim_text'],
             "normalized_claim": format_result['normalized_claim'],
-            "fact_checks_found": len(fact_checks),
-            "evidence_collected": len(evidence_list),
+            "fact_checks_found": len(results['fact_checks']),
+            "evidence_collected": len(results['evidence']),
             "confidence": summary_result['confidence'],
             "explanation": summary_result['short_explanation'],
-            "report_path": report_result['pdf_path']
+            "report_path": report_result.get('pdf_path')
         }
-    
+
     except Exception as e:
         print(f"\n{'='*60}")
         print(f"❌ Error processing submission: {e}")
         print(f"{'='*60}\n")
-        
-        # Update submission with error
-        submissions_collection.update_one(
-            {"_id": ObjectId(submission_id)},
+
+        # Update submission with error (a verdict already served stays completed)
+        await asyncio.to_thread(
+            submissions_collection.update_one,
+            {"_id": ObjectId(submission_id), "status": {"$ne": "completed"}},
             {
                 "$set": {
                     "status": "error",
@@ -291,8 +422,27 @@ async def process_submission_async(submission_id: str):
                 }
             }
         )
-        
+
         return {
             "success": False,
             "error": str(e)
         }
+
+    finally:
+        if spans:
+            await asyncio.to_thread(_record_spans, submission_id, attempt, spans)
+
+def _record_spans(submission_id: str, attempt: int, spans):
+    """Store stage spans on the submission and feed the /metrics histograms"""
+    try:
+        submissions_collection.update_one(
+            {"_id": ObjectId(submission_id)},
+            {"$push": {"spans": {"$each": [
+                dict(span.to_dict(), attempt=attempt) for span in spans
+            ]}}}
+        )
+    except Exception as e:
+        print(f"⚠️  Failed to store stage spans: {e}")
+
+    for span in spans:
+        metrics.record_span(span)
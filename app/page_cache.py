@@ -0,0 +1,306 @@
+"""
+Page Cache
+Shared Redis cache of fetched article pages, keyed by canonical URL
+
+Extraction and evidence search keep downloading the same popular pages. Each
+entry holds the raw HTML plus whatever parsers have already made of it
+(newspaper3k fields, BeautifulSoup text), so a hot page is fetched and parsed
+once per TTL. Stale entries are revalidated with ETag / Last-Modified instead
+of being downloaded again. The cache is bounded by an LRU index of keys.
+Like metrics, it must never break a fetch: Redis failures are logged and the
+page is fetched directly.
+"""
+
+import json
+import time
+import zlib
+import asyncio
+import hashlib
+import weakref
+import aiohttp
+import redis
+import requests
+from typing import Callable, Dict, Optional
+from newspaper import Article
+from app.config import settings
+from app.dedupe import canonical_url
+from app.http_session import get_http_session
+from app.metrics import metrics, record_external_call
+
+KEY_PREFIX = "satya:page:"
+INDEX_KEY = "satya:page:index"  # sorted set of keys by last use (LRU)
+
+# Store a parse only if the page is still cached with the same HTML (ARGV[1]
+# = its digest); HSET keeps the page's own TTL
+STORE_PARSE_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'digest') ~= ARGV[1] then return 0 end
+redis.call('HSET', KEYS[1], ARGV[2], ARGV[3])
+return 1
+"""
+
+def newspaper_fields(page: Dict) -> Dict:
+    """newspaper3k parse of a cached page (use with PageCache.parse)"""
+    article = Article(page['url'])
+    article.download(input_html=page['html'])
+    article.parse()
+    return {
+        "title": article.title,
+        "text": article.text,
+        "authors": article.authors,
+        "publish_date": article.publish_date.isoformat() if article.publish_date else None
+    }
+
+def decode_html(response: requests.Response) -> str:
+    """
+    Text of a requests response, decoded the way the parsers would
+
+    Without a charset in Content-Type, requests assumes ISO-8859-1 and
+    garbles non-Latin text; sniff the encoding from the bytes instead.
+    """
+    content_type = response.headers.get("Content-Type", "")
+    encoding = response.encoding if "charset" in content_type.lower() else None
+    encoding = encoding or response.apparent_encoding or "utf-8"
+    try:
+        return response.content.decode(encoding, errors="replace")
+    except LookupError:
+        return response.content.decode("utf-8", errors="replace")
+
+class PageCache:
+    """HTML and parsed text of fetched pages, shared by every worker"""
+
+    def __init__(self, redis_url: str):
+        self.redis_url = redis_url
+        self._client = None
+        self._store_parse = None
+        self._inflight = weakref.WeakKeyDictionary()  # loop -> {fetch key: task}
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = redis.from_url(self.redis_url, socket_connect_timeout=2)
+        return self._client
+
+    def fetch_sync(self, url: str, headers: Dict = None) -> Dict:
+        """
+        Cached page, fetching or revalidating it with requests if needed
+
+        Returns:
+            {"url", "html", "etag", "last_modified", "fetched_at", "parsed"}
+
+        Raises:
+            requests.RequestException: if the page has to be fetched and can't be
+        """
+        key = self._key(url)
+        cached = self._load(key)
+        if self._is_fresh(cached):
+            return self._hit(key, cached)
+
+        response = requests.get(
+            url,
+            headers={**(headers or {}), **self._validators(cached)},
+            timeout=settings.extraction_timeout_seconds,
+            allow_redirects=True
+        )
+        record_external_call(len(response.content))
+
+        if response.status_code == 304 and cached:
+            return self._revalidated(key, cached)
+
+        response.raise_for_status()
+        return self._fetched(key, url, decode_html(response), response.headers)
+
+    async def fetch(self, url: str, headers: Dict = None) -> Dict:
+        """
+        Async version of fetch_sync, on the shared aiohttp session
+
+        Concurrent fetches of the same URL (with the same headers) in one
+        event loop share a single request.
+
+        Raises:
+            aiohttp.ClientError: if the page has to be fetched and can't be
+        """
+        loop = asyncio.get_running_loop()
+        inflight = self._inflight.setdefault(loop, {})
+        fetch_key = (self._key(url), json.dumps(headers or {}, sort_keys=True))
+
+        task = inflight.get(fetch_key)
+        if task is None:
+            task = asyncio.ensure_future(self._afetch(url, headers))
+            inflight[fetch_key] = task
+            task.add_done_callback(lambda done: self._fetch_done(inflight, fetch_key, done))
+
+        # shield: one caller giving up (e.g. a lost extraction race) must not cancel the others
+        return await asyncio.shield(task)
+
+    def parse(self, page: Dict, name: str, parser: Callable[[Dict], Dict]) -> Dict:
+        """
+        Parsed form of a page, computed once and stored with it
+
+        Args:
+            page: Page returned by fetch/fetch_sync
+            name: Parser name (e.g. "newspaper3k")
+            parser: page -> JSON-serializable dict
+
+        Returns:
+            The parser's output
+        """
+        if name in page['parsed']:
+            return page['parsed'][name]
+
+        parsed = parser(page)
+        page['parsed'][name] = parsed
+
+        # Pages too large to cache, evicted or re-fetched meanwhile have no
+        # matching entry: writing the parse would leave an orphan hash
+        if settings.page_cache_enabled and page.get('digest'):
+            try:
+                if self._store_parse is None:
+                    self._store_parse = self.client.register_script(STORE_PARSE_SCRIPT)
+                self._store_parse(
+                    keys=[self._key(page['url'])],
+                    args=[page['digest'], f"parsed:{name}", json.dumps(parsed)]
+                )
+            except Exception as e:
+                print(f"⚠️  Page cache write failed: {e}")
+
+        return parsed
+
+    def _fetch_done(self, inflight: Dict, fetch_key, task: asyncio.Future):
+        inflight.pop(fetch_key, None)
+        if not task.cancelled():
+            task.exception()  # retrieved here so an unawaited failure isn't logged as lost
+
+    async def _afetch(self, url: str, headers: Optional[Dict]) -> Dict:
+        key = self._key(url)
+        cached = await asyncio.to_thread(self._load, key)
+        if self._is_fresh(cached):
+            return await asyncio.to_thread(self._hit, key, cached)
+
+        session = get_http_session()
+        async with session.get(
+            url,
+            headers={**(headers or {}), **self._validators(cached)},
+            timeout=aiohttp.ClientTimeout(total=settings.extraction_timeout_seconds)
+        ) as resp:
+            if resp.status == 304 and cached:
+                return await asyncio.to_thread(self._revalidated, key, cached)
+
+            resp.raise_for_status()
+            html = await resp.text(errors='replace')
+
+        return await asyncio.to_thread(self._fetched, key, url, html, resp.headers)
+
+    def _key(self, url: str) -> str:
+        return KEY_PREFIX + hashlib.sha256(canonical_url(url).encode("utf-8")).hexdigest()
+
+    def _is_fresh(self, page: Optional[Dict]) -> bool:
+        return page is not None and time.time() - page['fetched_at'] < settings.page_cache_ttl_seconds
+
+    def _validators(self, page: Optional[Dict]) -> Dict:
+        """Conditional request headers for a stale entry"""
+        headers = {}
+        if page and page.get('etag'):
+            headers['If-None-Match'] = page['etag']
+        if page and page.get('last_modified'):
+            headers['If-Modified-Since'] = page['last_modified']
+        return headers
+
+    def _hit(self, key: str, page: Dict) -> Dict:
+        metrics.incr("satya_page_cache_requests_total", result="hit")
+        self._touch(key)
+        return page
+
+    def _revalidated(self, key: str, page: Dict) -> Dict:
+        """304 Not Modified: the cached copy (and its parses) is good for another TTL"""
+        metrics.incr("satya_page_cache_requests_total", result="revalidated")
+        page['fetched_at'] = time.time()
+        try:
+            self.client.hset(key, "fetched_at", page['fetched_at'])
+            self.client.expire(key, settings.page_cache_max_age_seconds)
+        except Exception as e:
+            print(f"⚠️  Page cache write failed: {e}")
+        self._touch(key)
+        return page
+
+    def _fetched(self, key: str, url: str, html: str, headers) -> Dict:
+        """Store a freshly downloaded page (replacing any stale parses)"""
+        metrics.incr("satya_page_cache_requests_total", result="miss")
+        page = {
+            "url": url,
+            "html": html,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+            "digest": None,
+            "parsed": {}
+        }
+
+        if not settings.page_cache_enabled or len(html) > settings.page_cache_max_page_bytes:
+            return page
+
+        digest = hashlib.sha256(html.encode("utf-8")).hexdigest()
+        try:
+            with self.client.pipeline() as pipe:
+                pipe.delete(key)
+                pipe.hset(key, mapping={
+                    "url": url,
+                    "html": zlib.compress(html.encode("utf-8")),
+                    "etag": page['etag'] or "",
+                    "last_modified": page['last_modified'] or "",
+                    "fetched_at": page['fetched_at'],
+                    "digest": digest
+                })
+                pipe.expire(key, settings.page_cache_max_age_seconds)
+                pipe.execute()
+            page['digest'] = digest
+            self._touch(key)
+            self._evict()
+        except Exception as e:
+            print(f"⚠️  Page cache write failed: {e}")
+
+        return page
+
+    def _load(self, key: str) -> Optional[Dict]:
+        if not settings.page_cache_enabled:
+            return None
+
+        try:
+            raw = self.client.hgetall(key)
+        except Exception as e:
+            print(f"⚠️  Page cache read failed: {e}")
+            return None
+
+        if not raw or b"html" not in raw:
+            return None
+
+        fields = {k.decode("utf-8"): v for k, v in raw.items()}
+        return {
+            "url": fields['url'].decode("utf-8"),
+            "html": zlib.decompress(fields['html']).decode("utf-8"),
+            "etag": fields.get('etag', b"").decode("utf-8") or None,
+            "last_modified": fields.get('last_modified', b"").decode("utf-8") or None,
+            "fetched_at": float(fields['fetched_at']),
+            "digest": fields.get('digest', b"").decode("utf-8") or None,
+            "parsed": {
+                name[len("parsed:"):]: json.loads(value)
+                for name, value in fields.items() if name.startswith("parsed:")
+            }
+        }
+
+    def _touch(self, key: str):
+        if not settings.page_cache_enabled:
+            return
+        try:
+            self.client.zadd(INDEX_KEY, {key: time.time()})
+        except Exception as e:
+            print(f"⚠️  Page cache write failed: {e}")
+
+    def _evict(self):
+        """Drop the least recently used pages beyond page_cache_max_entries"""
+        excess = self.client.zcard(INDEX_KEY) - settings.page_cache_max_entries
+        if excess > 0:
+            keys = [key for key, _ in self.client.zpopmin(INDEX_KEY, excess)]
+            self.client.delete(*keys)
+
+# Create singleton
+page_cache = PageCache(settings.redis_url)
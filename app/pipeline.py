@@ -0,0 +1,223 @@
+"""
+Pipeline Scheduler
+Runs agent stages as a dependency graph so independent stages overlap
+"""
+
+import asyncio
+import inspect
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from app.metrics import StageSpan, stage_span
+
+
+class Stage:
+    """
+    A single step of the agent pipeline
+
+    Args:
+        name: Unique stage name
+        func: Callable receiving the declared inputs as keyword arguments.
+              Returns a dict containing every declared output.
+        inputs: Names of the values this stage consumes
+        outputs: Names of the values this stage produces
+        blocking: True for synchronous code (DB, spaCy, LLM, PDF) that must run
+                  in a worker thread instead of on the event loop
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        inputs: Iterable[str] = (),
+        outputs: Iterable[str] = (),
+        blocking: bool = False
+    ):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.blocking = blocking
+
+    def __repr__(self):
+        return f"Stage({self.name}: {list(self.inputs)} -> {list(self.outputs)})"
+
+
+class PipelineScheduler:
+    """
+    Executes stages as soon as all of their inputs are available
+
+    Stages whose inputs are satisfied at the same time run concurrently.
+    The first stage failure cancels everything still running and is re-raised.
+    """
+
+    def __init__(self, stages: List[Stage]):
+        self.stages: Dict[str, Stage] = {}
+        self.producers: Dict[str, str] = {}
+
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage name: {stage.name}")
+            self.stages[stage.name] = stage
+
+            for output in stage.outputs:
+                if output in self.producers:
+                    raise ValueError(
+                        f"Output '{output}' produced by both "
+                        f"'{self.producers[output]}' and '{stage.name}'"
+                    )
+                self.producers[output] = stage.name
+
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        """Return stage names in dependency order, rejecting cycles"""
+
+        order = []
+        state = {}  # name -> "visiting" | "done"
+
+        def visit(name: str, path: List[str]):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                cycle = " -> ".join(path + [name])
+                raise ValueError(f"Pipeline has a dependency cycle: {cycle}")
+
+            state[name] = "visiting"
+            for value in self.stages[name].inputs:
+                producer = self.producers.get(value)
+                if producer:
+                    visit(producer, path + [name])
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, [])
+
+        return order
+
+    def external_inputs(self) -> List[str]:
+        """Inputs that no stage produces and must be supplied by the caller"""
+        return sorted({
+            value
+            for stage in self.stages.values()
+            for value in stage.inputs
+            if value not in self.producers
+        })
+
+    async def run(
+        self,
+        context: Dict[str, Any],
+        checkpoint=None,
+        spans: Optional[List[StageSpan]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run every stage
+
+        Args:
+            context: Initial values (must cover external_inputs())
+            checkpoint: Optional store with load() -> {stage: outputs} and
+                        save(stage, outputs). Stages found in load() are not
+                        re-run; every newly completed stage is saved.
+            spans: Optional list that receives a StageSpan per executed stage
+                   (including failed and cancelled ones)
+
+        Returns:
+            Context with every stage output added
+        """
+
+        missing = [name for name in self.external_inputs() if name not in context]
+        if missing:
+            raise ValueError(f"Missing pipeline inputs: {', '.join(missing)}")
+
+        values = dict(context)
+        spans = spans if spans is not None else []
+        pending = [name for name in self.order]
+        running: Dict[asyncio.Task, Stage] = {}
+
+        if checkpoint is not None:
+            restored = await asyncio.to_thread(checkpoint.load)
+            for name in self.order:
+                if name in restored:
+                    pending.remove(name)
+                    values.update(restored[name])
+            if restored:
+                print(f"⏩ Resuming pipeline, skipping: {', '.join(n for n in self.order if n in restored)}")
+
+        try:
+            while pending or running:
+                for name in list(pending):
+                    stage = self.stages[name]
+                    if all(value in values for value in stage.inputs):
+                        pending.remove(name)
+                        task = asyncio.create_task(self._run_stage(stage, values, spans))
+                        running[task] = stage
+
+                if not running:
+                    raise RuntimeError(f"Pipeline stalled with unresolved stages: {pending}")
+
+                done, _ = await asyncio.wait(
+                    running.keys(),
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                failed = []
+                for task in done:
+                    stage = running.pop(task)
+                    if task.cancelled() or task.exception() is not None:
+                        failed.append(task)
+                        continue
+
+                    outputs = task.result()
+                    values.update(outputs)
+
+                    if checkpoint is not None:
+                        await asyncio.to_thread(checkpoint.save, stage.name, outputs)
+
+                # Stages that succeeded in the same batch are checkpointed above,
+                # so a retry does not pay for them (OCR, fact-check APIs) again
+                if failed:
+                    failed[0].result()
+
+        except BaseException:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running.keys(), return_exceptions=True)
+            raise
+
+        return values
+
+    async def _run_stage(
+        self,
+        stage: Stage,
+        values: Dict[str, Any],
+        spans: List[StageSpan]
+    ) -> Dict[str, Any]:
+        """Invoke a stage inside a timing span and collect its declared outputs"""
+
+        kwargs = {name: values[name] for name in stage.inputs}
+
+        if stage.blocking:
+            # Open the span on the worker thread so CPU time is the stage's own
+            def call():
+                with stage_span(stage.name) as span:
+                    spans.append(span)
+                    return stage.func(**kwargs)
+
+            result = await asyncio.to_thread(call)
+        else:
+            with stage_span(stage.name) as span:
+                spans.append(span)
+                result = stage.func(**kwargs)
+                if inspect.isawaitable(result):
+                    result = await result
+
+        if not stage.outputs:
+            return {}
+
+        if not isinstance(result, dict):
+            raise TypeError(f"Stage '{stage.name}' must return a dict, got {type(result).__name__}")
+
+        missing = [name for name in stage.outputs if name not in result]
+        if missing:
+            raise KeyError(f"Stage '{stage.name}' did not produce: {', '.join(missing)}")
+
+        return {name: result[name] for name in stage.outputs}
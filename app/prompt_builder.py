@@ -0,0 +1,83 @@
+"""
+Prompt Builder
+Token counting, per-model prompt budgets and greedy packing of ranked content
+"""
+
+import re
+from typing import Dict, List, Tuple
+from app.config import settings
+
+# Try to import tiktoken for exact counts, but make it optional
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    _ENCODING = None
+    TIKTOKEN_AVAILABLE = False
+
+_WORD = re.compile(r"\w+")
+
+def count_tokens(text: str) -> int:
+    """Token count (cl100k_base with tiktoken, else ~4 characters per token)"""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return (len(text) + 3) // 4
+
+def parse_budgets(value: str) -> Dict[str, int]:
+    """Parse "gpt-4:6000,gemini-pro:8000"; model names may contain ':'"""
+    budgets = {}
+    for item in value.split(","):
+        if ":" in item:
+            model, tokens = item.rsplit(":", 1)
+            budgets[model.strip()] = int(tokens)
+    return budgets
+
+def token_budget(model: str) -> int:
+    """Prompt token budget for a model (prompt_token_budgets, else the default)"""
+    return parse_budgets(settings.prompt_token_budgets).get(model, settings.prompt_token_budget)
+
+def truncate(text: str, max_chars: int) -> str:
+    """Cut text at a word boundary"""
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rsplit(" ", 1)[0] + "..."
+
+def words(text: str) -> set:
+    return set(_WORD.findall(text.lower()))
+
+def relevance(claim: str, text: str) -> float:
+    """Share of the claim's words that appear in text"""
+    claim_words = words(claim)
+    if not claim_words:
+        return 0.0
+    return len(claim_words & words(text)) / len(claim_words)
+
+def near_duplicate(a: str, b: str, threshold: float = 0.8) -> bool:
+    """True if two snippets share most of their words"""
+    a_words, b_words = words(a), words(b)
+    if not a_words or not b_words:
+        return False
+    return len(a_words & b_words) / len(a_words | b_words) >= threshold
+
+def pack(blocks: List[str], budget: int, numbered: bool = False) -> Tuple[List[str], int]:
+    """
+    Greedily keep blocks, in order, while they fit in the budget
+
+    Args:
+        blocks: Candidate blocks, most valuable first
+        budget: Tokens available
+        numbered: Prefix kept blocks with "1. ", "2. ", ...
+
+    Returns:
+        (kept blocks, tokens used)
+    """
+    kept, used = [], 0
+    for block in blocks:
+        if numbered:
+            block = f"{len(kept) + 1}. {block}"
+        tokens = count_tokens(block)
+        if used + tokens <= budget:
+            kept.append(block)
+            used += tokens
+    return kept, used
@@ -0,0 +1,174 @@
+"""
+Provider Rate Limiter
+Token buckets in Redis, shared by every worker, with requests-per-minute and
+tokens-per-minute budgets per LLM provider
+
+Callers reserve capacity before each call and are told how long to wait for
+it, so excess calls queue in order instead of failing. A 429 from a provider
+puts it in a shared cooldown that every worker's next reservation respects.
+Like metrics, the limiter must never break a call: if Redis is unreachable
+calls go through unthrottled.
+"""
+
+import time
+import asyncio
+import redis
+from typing import Dict
+from app.config import settings
+from app.metrics import metrics
+
+BUCKET_PREFIX = "satya:ratelimit:"
+
+# Refill both buckets, then reserve one request and ARGV[3] tokens. Buckets may
+# go negative: the deficit is the queue ahead of this caller, and the wait
+# returned is how long until it is paid back (or the cooldown ends).
+# Returns {reserved (0/1), wait_ms}; nothing is reserved if wait_ms > ARGV[4].
+RESERVE_SCRIPT = """
+local rpm = tonumber(ARGV[1])
+local tpm = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local max_wait = tonumber(ARGV[4])
+
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+local state = redis.call('HMGET', KEYS[1], 'req', 'tok', 'ts')
+local req = tonumber(state[1]) or rpm
+local tok = tonumber(state[2]) or tpm
+local ts = tonumber(state[3]) or now
+local elapsed = math.max(0, now - ts)
+
+req = math.min(rpm, req + elapsed * rpm / 60000) - 1
+tok = math.min(tpm, tok + elapsed * tpm / 60000) - cost
+
+local wait = 0
+if req < 0 then wait = math.max(wait, -req * 60000 / rpm) end
+if tok < 0 then wait = math.max(wait, -tok * 60000 / tpm) end
+wait = math.max(wait, redis.call('PTTL', KEYS[2]))
+
+if wait > max_wait then
+    return {0, math.ceil(wait)}
+end
+
+redis.call('HSET', KEYS[1], 'req', req, 'tok', tok, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], 120000 + math.ceil(wait))
+return {1, math.ceil(wait)}
+"""
+
+class RateLimitExceeded(Exception):
+    """The estimated wait for capacity is longer than the caller will wait"""
+
+    def __init__(self, provider: str, wait: float):
+        self.provider = provider
+        self.wait = wait
+        super().__init__(f"{provider} rate limit: estimated wait {wait:.1f}s")
+
+class RateLimited(Exception):
+    """A provider answered 429"""
+
+    def __init__(self, provider: str, retry_after: float = None):
+        self.provider = provider
+        self.retry_after = retry_after
+        super().__init__(f"{provider} returned 429 (retry after {retry_after or '?'}s)")
+
+def parse_limits(value: str) -> Dict[str, int]:
+    """Parse "openrouter:20,openai:500" into {"openrouter": 20, "openai": 500}"""
+    limits = {}
+    for item in value.split(","):
+        if ":" in item:
+            provider, limit = item.rsplit(":", 1)
+            limits[provider.strip()] = int(limit)
+    return limits
+
+def retry_after_seconds(headers) -> float:
+    """Retry-After header in seconds, or None"""
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+class ProviderRateLimiter:
+    """Shared per-provider request and token budgets"""
+
+    def __init__(self, redis_url: str):
+        self.redis_url = redis_url
+        self.requests_per_minute = parse_limits(settings.llm_requests_per_minute)
+        self.tokens_per_minute = parse_limits(settings.llm_tokens_per_minute)
+        self._client = None
+        self._reserve = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = redis.from_url(self.redis_url, socket_connect_timeout=2)
+        return self._client
+
+    @property
+    def reserve_script(self):
+        if self._reserve is None:
+            self._reserve = self.client.register_script(RESERVE_SCRIPT)
+        return self._reserve
+
+    def reserve(self, provider: str, tokens: int) -> float:
+        """
+        Reserve one request and `tokens` tokens
+
+        Returns:
+            Seconds to wait before making the call
+
+        Raises:
+            RateLimitExceeded: if the wait would exceed llm_rate_limit_max_wait_seconds
+        """
+        rpm = self.requests_per_minute.get(provider)
+        if not rpm:
+            return 0.0
+
+        # 0 = no token budget; a single call never needs more than the whole budget
+        tpm = self.tokens_per_minute.get(provider) or 10 ** 9
+        tokens = min(tokens, tpm)
+        max_wait_ms = settings.llm_rate_limit_max_wait_seconds * 1000
+
+        try:
+            reserved, wait_ms = self.reserve_script(
+                keys=[f"{BUCKET_PREFIX}{provider}", f"{BUCKET_PREFIX}{provider}:cooldown"],
+                args=[rpm, tpm, tokens, max_wait_ms]
+            )
+        except Exception as e:
+            print(f"⚠️  Rate limiter unavailable: {e}")
+            return 0.0
+
+        if not reserved:
+            raise RateLimitExceeded(provider, wait_ms / 1000)
+        return wait_ms / 1000
+
+    def acquire(self, provider: str, tokens: int):
+        """Reserve capacity and sleep until it is ours"""
+        self._wait(provider, self.reserve(provider, tokens))
+
+    async def aacquire(self, provider: str, tokens: int):
+        """Async version of acquire"""
+        wait = await asyncio.to_thread(self.reserve, provider, tokens)
+        if wait > 0:
+            await asyncio.to_thread(self._record_wait, provider, wait)
+            await asyncio.sleep(wait)
+
+    def cooldown(self, provider: str, seconds: float = None):
+        """Pause every worker's calls to a provider after a 429"""
+        seconds = seconds or settings.llm_rate_limit_cooldown_seconds
+        try:
+            self.client.set(f"{BUCKET_PREFIX}{provider}:cooldown", 1, px=int(seconds * 1000))
+        except Exception as e:
+            print(f"⚠️  Rate limiter unavailable: {e}")
+        print(f"🧊 {provider} cooling down for {seconds:.0f}s after 429")
+
+    def _wait(self, provider: str, wait: float):
+        if wait > 0:
+            self._record_wait(provider, wait)
+            time.sleep(wait)
+
+    def _record_wait(self, provider: str, wait: float):
+        print(f"⏳ {provider} rate limit: queued, waiting ~{wait:.1f}s")
+        metrics.observe("satya_llm_rate_limit_wait_seconds", wait, provider=provider)
+
+# Create singleton
+rate_limiter = ProviderRateLimiter(settings.redis_url)
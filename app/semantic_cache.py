@@ -0,0 +1,165 @@
+"""
+Semantic Summary Cache
+Reuse a recent summary when a paraphrase of its claim arrives with overlapping evidence
+
+Fresh LLM summaries are saved with the MiniLM embedding of their normalized
+claim and the URLs of the sources they were built from. Each worker keeps
+those embeddings in memory, pulling summaries saved since the last refresh
+(re-reading a short overlap window, since a summary stamped earlier can
+commit later), and matches new claims by cosine distance.
+
+Embeddings barely move when a claim is negated or a number changes ("X
+causes Y" vs "X does not cause Y"), so a match must also have the same
+claim signature: negation parity and the set of numbers in the claim.
+"""
+
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.config import settings
+from app.database import summaries_collection
+from app.metrics import metrics
+
+NEGATIONS = {
+    "not", "no", "never", "none", "nobody", "nothing", "neither", "nor",
+    "without", "cannot", "false", "fake", "hoax", "myth", "untrue"
+}
+
+def claim_signature(text: str) -> Tuple[bool, Tuple[str, ...]]:
+    """(odd number of negations, sorted numbers) of a normalized claim"""
+    tokens = re.findall(r"[a-z0-9][a-z0-9'.,]*", text.lower().replace("\u2019", "'"))
+    tokens = [token.rstrip(".,") for token in tokens]
+    negations = sum(1 for token in tokens if token in NEGATIONS or token.endswith("n't"))
+    numbers = sorted({token for token in tokens if any(ch.isdigit() for ch in token)})
+    return negations % 2 == 1, tuple(numbers)
+
+def evidence_overlap(a: List[str], b: List[str]) -> float:
+    """Jaccard overlap of two source URL sets (no evidence overlaps nothing)"""
+    a, b = set(a), set(b)
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+class SemanticSummaryCache:
+    """In-process embedding index over recent summaries"""
+
+    def __init__(self):
+        self._embedder = None
+        self._entries: Dict = {}  # claim_id -> (created_at, unit embedding, source_urls, claim signature)
+        self._last_seen = None
+        self._lock = threading.Lock()
+
+    @property
+    def embedder(self):
+        if self._embedder is None:
+            from app.agents.cmte_embeddings import EmbeddingGenerator
+            self._embedder = EmbeddingGenerator()
+        return self._embedder
+
+    def embed(self, text: str) -> Optional[np.ndarray]:
+        """
+        Unit-length MiniLM embedding of a claim
+
+        None when the model is unavailable: the hash fallback embedding has
+        no semantic meaning, so it must not be used for matching.
+        """
+        if not settings.semantic_cache_enabled or self.embedder.text_model is None:
+            return None
+
+        embedding = np.asarray(self.embedder.generate_text_embedding(text), dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm > 0 else None
+
+    def lookup(self, embedding: Optional[np.ndarray], source_urls: List[str],
+               claim_text: str) -> Optional[Tuple[Dict, float]]:
+        """
+        Find a recent summary for a near-duplicate claim
+
+        Args:
+            embedding: Result of embed() for the new claim
+            source_urls: Fact-check and evidence URLs gathered for the new claim
+            claim_text: The new claim's normalized text (for the signature check)
+
+        Returns:
+            (summary document, cosine similarity) or None
+        """
+        if embedding is None:
+            return None
+
+        try:
+            with self._lock:
+                self._refresh()
+                candidates = list(self._entries.items())
+        except Exception as e:
+            print(f"⚠️  Semantic cache refresh failed: {e}")
+            return None
+
+        match = None
+        if candidates:
+            matrix = np.stack([entry[1] for _, entry in candidates])
+            similarities = matrix @ embedding
+            min_similarity = 1 - settings.semantic_cache_max_distance
+            signature = claim_signature(claim_text)
+
+            for i in np.argsort(-similarities):
+                if similarities[i] < min_similarity:
+                    break
+                claim_id, (_, _, prior_urls, prior_signature) = candidates[i]
+                if prior_signature != signature:
+                    continue
+                if evidence_overlap(source_urls, prior_urls) >= settings.semantic_cache_min_evidence_overlap:
+                    summary = summaries_collection.find_one({"claim_id": claim_id})
+                    if summary:
+                        match = (summary, float(similarities[i]))
+                        break
+
+        metrics.incr("satya_semantic_cache_requests_total", result="hit" if match else "miss")
+        return match
+
+    def _refresh(self):
+        """
+        Pull summaries saved since the last refresh and drop expired ones
+
+        created_at is stamped by the worker before the write commits, so a
+        summary can appear with a timestamp older than one already seen.
+        Each refresh re-reads semantic_cache_refresh_overlap_seconds behind
+        the newest timestamp; entries are keyed by claim, so repeats are harmless.
+        """
+        cutoff = datetime.utcnow() - timedelta(hours=settings.semantic_cache_ttl_hours)
+        since = cutoff
+        if self._last_seen:
+            overlap = timedelta(seconds=settings.semantic_cache_refresh_overlap_seconds)
+            since = max(cutoff, self._last_seen - overlap)
+
+        cursor = summaries_collection.find(
+            {
+                "claim_embedding": {"$exists": True},
+                "normalized_claim": {"$exists": True},
+                "created_at": {"$gt": since}
+            },
+            {"claim_id": 1, "claim_embedding": 1, "source_urls": 1, "normalized_claim": 1, "created_at": 1}
+        ).sort("created_at", 1)
+
+        for doc in cursor:
+            self._entries[doc['claim_id']] = (
+                doc['created_at'],
+                np.asarray(doc['claim_embedding'], dtype=np.float32),
+                doc.get('source_urls', []),
+                claim_signature(doc['normalized_claim'])
+            )
+            self._last_seen = max(self._last_seen or doc['created_at'], doc['created_at'])
+
+        self._entries = {
+            claim_id: entry for claim_id, entry in self._entries.items()
+            if entry[0] > cutoff
+        }
+
+        # Keep the newest entries if the window holds more than the cap
+        if len(self._entries) > settings.semantic_cache_max_entries:
+            newest = sorted(self._entries.items(), key=lambda item: item[1][0])
+            self._entries = dict(newest[-settings.semantic_cache_max_entries:])
+
+# Create singleton
+semantic_cache = SemanticSummaryCache()
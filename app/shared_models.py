@@ -0,0 +1,100 @@
+"""
+Shared ML Models
+Process-wide loaders for the NLP models used by several agents
+
+FactCheckAgent and EmbeddingGenerator share one MiniLM instance and
+FormatAgent uses the shared spaCy pipeline. The worker pool calls
+preload_models() in the parent before forking, so every child starts warm
+and shares the weights copy-on-write instead of holding its own copy.
+"""
+
+import os
+import time
+import threading
+from typing import Dict
+
+SENTENCE_MODEL_NAME = 'all-MiniLM-L6-v2'
+SPACY_MODEL_NAME = 'en_core_web_sm'
+
+# Tokenizer thread pools do not survive fork; keep them off in workers
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+_lock = threading.Lock()
+_models: Dict[str, object] = {}
+
+def _load(name: str, loader):
+    """Load a model once per process; None if it cannot be loaded"""
+    if name in _models:
+        return _models[name]
+
+    with _lock:
+        if name not in _models:
+            try:
+                _models[name] = loader()
+                print(f"✓ Loaded {name}")
+            except Exception as e:
+                print(f"⚠️  Could not load {name}: {e}")
+                _models[name] = None
+
+    return _models[name]
+
+def get_sentence_model():
+    """Shared SentenceTransformer('all-MiniLM-L6-v2'), or None if unavailable"""
+    def loader():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(SENTENCE_MODEL_NAME)
+
+    return _load(SENTENCE_MODEL_NAME, loader)
+
+def get_spacy_nlp():
+    """Shared spaCy pipeline, or None if unavailable"""
+    def loader():
+        import spacy
+        return spacy.load(SPACY_MODEL_NAME)
+
+    return _load(SPACY_MODEL_NAME, loader)
+
+def preload_models() -> Dict[str, float]:
+    """
+    Load every shared model now
+
+    Returns:
+        Seconds spent loading each model
+    """
+    timings = {}
+    for name, getter in [
+        (SENTENCE_MODEL_NAME, get_sentence_model),
+        (SPACY_MODEL_NAME, get_spacy_nlp),
+    ]:
+        start = time.perf_counter()
+        getter()
+        timings[name] = time.perf_counter() - start
+
+    return timings
+
+def memory_usage() -> Dict[str, int]:
+    """
+    Memory of the current process in bytes
+
+    rss counts shared copy-on-write pages in full; pss splits them between
+    the processes sharing them; uss is memory private to this process.
+    """
+    usage = {}
+
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            fields = {}
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1]) * 1024
+
+        usage["rss"] = fields.get("Rss", 0)
+        usage["pss"] = fields.get("Pss", 0)
+        usage["uss"] = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    except OSError:
+        # Not Linux: fall back to peak RSS
+        import resource
+        usage["rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    return usage
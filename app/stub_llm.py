@@ -0,0 +1,137 @@
+"""
+Stub LLM Server
+OpenAI/OpenRouter-compatible chat-completions server for offline load tests
+
+Returns schema-valid JSON for the Summarize and NRI prompts, with latency
+drawn from a seeded log-normal distribution and injected errors and 429s,
+so worker throughput and queueing can be benchmarked deterministically.
+
+    python -m app.stub_llm
+    OPENROUTER_API_KEY=stub OPENROUTER_BASE_URL=http://localhost:8100/v1 \\
+        LLM_REQUESTS_PER_MINUTE= python start.py
+"""
+
+import re
+import json
+import time
+import uuid
+import random
+import asyncio
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.config import settings
+
+app = FastAPI(title="Stub LLM", description="Chat-completions stub for load testing")
+
+rng = random.Random(settings.stub_llm_seed)
+
+def _latency() -> float:
+    """Seconds to wait before answering (log-normal around the median)"""
+    median = settings.stub_llm_latency_median
+    if median <= 0:
+        return 0.0
+    return min(rng.lognormvariate(0, settings.stub_llm_latency_sigma) * median, settings.stub_llm_latency_max)
+
+def _summary_response(prompt: str) -> dict:
+    urls = re.findall(r"(?:URL|Source): (\S+)", prompt)
+    return {
+        "short_explanation": "Stub verdict: the available evidence does not support this claim.",
+        "confidence": round(rng.uniform(0.5, 0.9), 2),
+        "top_sources": [{"url": url, "why": "Stub source"} for url in urls[:3]]
+    }
+
+def _narrative_response() -> dict:
+    return {
+        "narrative_type": rng.choice([
+            "fear_health", "conspiracy_control", "blame_scapegoat",
+            "hope_miracle", "political_partisan"
+        ]),
+        "confidence": round(rng.uniform(0.6, 0.95), 2),
+        "emotional_triggers": ["fear"],
+        "psychological_appeal": "Stub appeal",
+        "target_audience": "general public",
+        "persuasion_tactics": ["emotional_appeal"]
+    }
+
+def _messaging_response() -> dict:
+    return {
+        "short_message": "Stub: this claim is false.",
+        "medium_message": "Stub: fact-checkers found no evidence for this claim.",
+        "detailed_message": "Stub: independent fact-checkers reviewed this claim and found no supporting evidence.",
+        "communication_style": "calm",
+        "recommended_channels": ["social_media"],
+        "key_points": ["No credible evidence"]
+    }
+
+def build_content(prompt: str) -> str:
+    """Pick a response matching the prompt's expected schema"""
+    if '"short_explanation"' in prompt:
+        return json.dumps(_summary_response(prompt))
+    if '"narrative"' in prompt and '"messaging"' in prompt:
+        return json.dumps({"narrative": _narrative_response(), "messaging": _messaging_response()})
+    if '"narrative_type"' in prompt:
+        return json.dumps(_narrative_response())
+    if '"short_message"' in prompt:
+        return json.dumps(_messaging_response())
+    return "Hello, I am a stub model."
+
+def _completion(model: str, content: str) -> dict:
+    return {
+        "id": f"stub-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    }
+
+async def _stream(model: str, content: str, delay: float):
+    """Server-sent events, spreading the latency across ~20 chunks"""
+    size = max(1, len(content) // 20)
+    pieces = [content[i:i + size] for i in range(0, len(content), size)]
+    for piece in pieces:
+        await asyncio.sleep(delay / len(pieces))
+        chunk = {
+            "id": "stub",
+            "object": "chat.completion.chunk",
+            "model": model,
+            "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]
+        }
+        yield f"data: {json.dumps(chunk)}\n\n"
+    yield "data: [DONE]\n\n"
+
+@app.post("/v1/chat/completions")
+@app.post("/api/v1/chat/completions")
+async def chat_completions(request: Request):
+    """Chat completions (OpenAI and OpenRouter paths)"""
+    body = await request.json()
+    model = body.get("model", "stub")
+    prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+    delay = _latency()
+
+    roll = rng.random()
+    if roll < settings.stub_llm_rate_limit_rate:
+        return JSONResponse(
+            {"error": {"message": "Stub rate limit", "type": "rate_limit_error", "code": 429}},
+            status_code=429,
+            headers={"Retry-After": "1"}
+        )
+    if roll < settings.stub_llm_rate_limit_rate + settings.stub_llm_error_rate:
+        await asyncio.sleep(delay)
+        return JSONResponse({"error": {"message": "Stub failure", "type": "server_error"}}, status_code=500)
+
+    content = build_content(prompt)
+
+    if body.get("stream"):
+        return StreamingResponse(_stream(model, content, delay), media_type="text/event-stream")
+
+    await asyncio.sleep(delay)
+    return _completion(model, content)
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=settings.stub_llm_port)
@@ -1,12 +1,34 @@
 """
 Simple Background Worker - Robust Redis Connection
+
+Runs as a supervised pool: the parent process keeps `worker_processes`
+children alive, and each child processes up to `worker_concurrency`
+submissions at once, either as tasks on one long-lived event loop
+(`worker_mode="async"`) or on a thread pool (`worker_mode="thread"`).
+Jobs are taken from the text/media priority lanes by weighted-fair share,
+with a per-lane cap on concurrent jobs (see app/job_queue.py).
+SIGTERM stops job intake and drains in-flight jobs.
 """
 
 import redis
+import redis.asyncio as aioredis
+import asyncio
 import time
 import json
+import os
+import signal
+import multiprocessing
+import gc
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from app.config import settings
-from app.orchestrator import process_submission
+from app.browser_pool import browser_pool
+from app.http_session import close_http_session
+from app.llm_client import llm_client
+from app.job_queue import JobQueue, AsyncJobQueue, lane_scheduler_from_settings
+from app.metrics import metrics
+from app.shared_models import preload_models, memory_usage
+from app.orchestrator import process_submission, process_submission_async
 
 def connect_redis_with_retry(max_retries=5):
     """Connect to Redis with retry logic"""
@@ -29,75 +51,305 @@ def connect_redis_with_retry(max_retries=5):
             else:
                 raise
 
-def main():
-    """Main worker loop"""
-    print("="*60)
-    print("🚀 Starting Simple Worker")
-    print("="*60)
-    
+async def aconnect_redis_with_retry(max_retries=5):
+    """Async version of connect_redis_with_retry (redis.asyncio client)"""
+    for attempt in range(max_retries):
+        conn = aioredis.from_url(
+            settings.redis_url,
+            socket_connect_timeout=5,
+            socket_keepalive=True,
+            health_check_interval=30
+        )
+        try:
+            await conn.ping()
+            print(f"✅ Redis connected successfully!")
+            return conn
+        except Exception as e:
+            await conn.close()
+            print(f"⚠️  Redis connection attempt {attempt + 1}/{max_retries} failed: {e}")
+            if attempt < max_retries - 1:
+                await asyncio.sleep(5)
+            else:
+                raise
+
+def record_queue_wait(jobs):
+    """Observe how long each job sat in its lane before a worker took it"""
+    now = time.time()
+    for job in jobs:
+        metrics.observe("satya_queue_wait_seconds", now - job['enqueued_at'], lane=job['lane'])
+
+def report_result(result, worker_name: str):
+    if result.get('success'):
+        print(f"✅ [{worker_name}] Job completed successfully!")
+    else:
+        print(f"❌ [{worker_name}] Job failed: {result.get('error')}")
+
+def report_memory(worker_name: str):
+    """Publish this process's memory (rss/pss/uss) as gauges"""
+    usage = memory_usage()
+    for kind, value in usage.items():
+        metrics.set_gauge("satya_worker_memory_bytes", value, worker=worker_name, kind=kind)
+    return usage
+
+def format_memory(usage) -> str:
+    return " | ".join(f"{kind} {value / 1024 / 1024:.0f}MB" for kind, value in usage.items())
+
+_first_job_recorded = False
+
+def record_worker_stats(worker_name: str, job_seconds: float):
+    """Report first-job latency (once per process) and current memory"""
+    global _first_job_recorded
+
+    if not _first_job_recorded:
+        _first_job_recorded = True
+        print(f"⏱️  [{worker_name}] First job took {job_seconds:.1f}s")
+        metrics.set_gauge("satya_worker_first_job_seconds", job_seconds, worker=worker_name)
+
+    report_memory(worker_name)
+
+def handle_job(queue: JobQueue, job: dict, worker_name: str = "worker"):
+    """Run a dequeued job's submission through the pipeline"""
+
+    submission_id = job['submission_id']
+    print(f"\n📝 [{worker_name}] Processing job {job['id']} (submission {submission_id})")
+    started = time.perf_counter()
+
+    try:
+        result = process_submission(submission_id)
+        report_result(result, worker_name)
+        queue.finish(job, success=result.get('success', False), error=result.get('error'))
+    except Exception as e:
+        print(f"❌ [{worker_name}] Job execution error: {e}")
+        queue.finish(job, success=False, error=str(e))
+
+    record_worker_stats(worker_name, time.perf_counter() - started)
+
+async def handle_job_async(queue: AsyncJobQueue, job: dict, worker_name: str = "worker"):
+    """Async counterpart of handle_job, run as a task on the worker's loop"""
+
+    submission_id = job['submission_id']
+    print(f"\n📝 [{worker_name}] Processing job {job['id']} (submission {submission_id})")
+    started = time.perf_counter()
+
+    try:
+        result = await process_submission_async(submission_id)
+        report_result(result, worker_name)
+        await queue.finish(job, success=result.get('success', False), error=result.get('error'))
+    except Exception as e:
+        print(f"❌ [{worker_name}] Job execution error: {e}")
+        await queue.finish(job, success=False, error=str(e))
+
+    await asyncio.to_thread(record_worker_stats, worker_name, time.perf_counter() - started)
+
+def report_startup(worker_name: str, started: float):
+    """Log and publish how long this worker took to become ready"""
+    startup_seconds = time.perf_counter() - started
+    metrics.set_gauge("satya_worker_startup_seconds", startup_seconds, worker=worker_name)
+    print(f"⏱️  [{worker_name}] Ready in {startup_seconds:.2f}s ({format_memory(report_memory(worker_name))})")
+
+def run_worker(worker_index: int = 0, concurrency: int = None, started: float = None):
+    """
+    Worker process entry point, dispatching on settings.worker_mode
+
+    `started` is the parent's perf_counter() at spawn (monotonic, so it is
+    comparable across processes) and is used to report startup time.
+    """
+
+    concurrency = concurrency or settings.worker_concurrency
+    started = started or time.perf_counter()
+    report_startup(f"worker-{worker_index}", started)
+
+    if settings.worker_mode == "async":
+        asyncio.run(run_async_worker(worker_index, concurrency))
+    else:
+        run_thread_worker(worker_index, concurrency)
+
+async def run_async_worker(worker_index: int, concurrency: int):
+    """
+    Async-native worker loop
+
+    A single event loop lives for the whole process and runs up to
+    `concurrency` process_submission_async coroutines at once (no new job is
+    pulled while that many tasks are in flight), so the HTTP
+    session, connection pools and the thread pool used by blocking stages
+    are shared across jobs. On SIGTERM/SIGINT it stops pulling and awaits
+    in-flight jobs before exiting.
+    """
+
+    worker_name = f"worker-{worker_index}"
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+
+    def request_stop():
+        if not stop.is_set():
+            print(f"\n⏹️  [{worker_name}] Stop requested, draining in-flight jobs...")
+        stop.set()
+
+    loop.add_signal_handler(signal.SIGTERM, request_stop)
+    loop.add_signal_handler(signal.SIGINT, request_stop)
+
+    # Blocking stages run on the loop's default executor; size it for the load
+    loop.set_default_executor(
+        ThreadPoolExecutor(max_workers=concurrency * 4, thread_name_prefix=worker_name)
+    )
+
+    redis_conn = await aconnect_redis_with_retry()
+
+    print(f"📋 [{worker_name}] PID {os.getpid()} listening for jobs (async, concurrency={concurrency})")
+
+    queue = AsyncJobQueue(redis_conn)
+    stale_conns = []
+    lanes = lane_scheduler_from_settings()
+    in_flight = {}  # task -> lane; its size is what bounds concurrency
+    consecutive_errors = 0
+    max_consecutive_errors = 10
+
+    while not stop.is_set():
+        try:
+            lane_counts = Counter(in_flight.values())
+            free_slots = concurrency - len(in_flight)
+            order = lanes.order(lane_counts) if free_slots > 0 else []
+
+            # Wait for a free slot when saturated (overall or in every lane)
+            if not order:
+                await asyncio.wait(in_flight.keys(), timeout=1, return_when=asyncio.FIRST_COMPLETED)
+                continue
+
+            # Fair-share lane first; take as many jobs as it has free slots
+            jobs = []
+            for lane in order:
+                count = min(free_slots, lanes.free_slots(lane, lane_counts))
+                jobs = await queue.dequeue_many(lane, count)
+                if jobs:
+                    break
+            else:
+                jobs = await queue.wait_for_job(order, timeout=1)
+
+            if jobs:
+                await asyncio.to_thread(record_queue_wait, jobs)
+
+            for job in jobs:
+                task = asyncio.create_task(handle_job_async(queue, job, worker_name))
+                in_flight[task] = job['lane']
+                task.add_done_callback(lambda t: in_flight.pop(t, None))
+
+            consecutive_errors = 0
+
+        except redis.ConnectionError as e:
+            consecutive_errors += 1
+            print(f"⚠️  [{worker_name}] Redis connection error ({consecutive_errors}/{max_consecutive_errors}): {e}")
+
+            if consecutive_errors >= max_consecutive_errors:
+                print(f"❌ Too many consecutive errors. Reconnecting...")
+                try:
+                    new_conn = await aconnect_redis_with_retry()
+                    # In-flight jobs still hold the old queue; it is closed after the drain
+                    stale_conns.append(redis_conn)
+                    redis_conn = new_conn
+                    queue = AsyncJobQueue(redis_conn)
+                    consecutive_errors = 0
+                except Exception as reconnect_error:
+                    print(f"❌ Reconnection failed: {reconnect_error}")
+                    print(f"⏸️  Waiting 30 seconds before retry...")
+                    await asyncio.sleep(30)
+            else:
+                await asyncio.sleep(2)
+
+        except Exception as e:
+            consecutive_errors += 1
+            print(f"⚠️  [{worker_name}] Worker error ({consecutive_errors}/{max_consecutive_errors}): {e}")
+
+            if consecutive_errors >= max_consecutive_errors:
+                print(f"❌ Too many errors. Restarting worker loop...")
+                consecutive_errors = 0
+                await asyncio.sleep(10)
+            else:
+                await asyncio.sleep(2)
+
+    # Drain: no new jobs are pulled, wait for running ones
+    if in_flight:
+        await asyncio.gather(*in_flight, return_exceptions=True)
+
+    await close_http_session()
+    await llm_client.async_clients.aclose()
+    await browser_pool.close()
+    for conn in stale_conns + [redis_conn]:
+        await conn.close()
+    print(f"👋 [{worker_name}] Stopped")
+
+def run_thread_worker(worker_index: int, concurrency: int):
+    """
+    Thread-pool worker loop
+
+    Pulls jobs while fewer than `concurrency` are in flight and runs each
+    one with its own asyncio.run on a thread pool. On SIGTERM/SIGINT it
+    stops pulling and waits for in-flight jobs to finish before exiting.
+    """
+
+    worker_name = f"worker-{worker_index}"
+    stopping = False
+
+    def request_stop(sig, frame):
+        nonlocal stopping
+        if not stopping:
+            print(f"\n⏹️  [{worker_name}] Stop requested, draining in-flight jobs...")
+        stopping = True
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
     # Connect to Redis with retry
     redis_conn = connect_redis_with_retry()
-    
-    print(f"📡 Redis: {settings.redis_url[:50]}...")
-    print(f"📋 Listening for jobs...")
-    print("="*60)
-    
+    queue = JobQueue(redis_conn)
+
+    print(f"📋 [{worker_name}] PID {os.getpid()} listening for jobs (concurrency={concurrency})")
+
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=worker_name)
+    lanes = lane_scheduler_from_settings()
+    in_flight = {}  # future -> lane
     consecutive_errors = 0
     max_consecutive_errors = 10
-    
-    while True:
+
+    while not stopping:
         try:
-            # Check for jobs in default queue
-            job_data = redis_conn.blpop('rq:queue:default', timeout=5)
-            
-            if job_data:
-                queue_name, job_id = job_data
-                job_id = job_id.decode('utf-8') if isinstance(job_id, bytes) else job_id
-                
-                print(f"\n📝 Processing job: {job_id}")
-                
-                # Get job details
-                job_key = f'rq:job:{job_id}'
-                job_info = redis_conn.hgetall(job_key)
-                
-                # Extract submission_id from job data
-                data_field = job_info.get(b'data') or job_info.get('data')
-                if data_field:
-                    import pickle
-                    try:
-                        args, kwargs = pickle.loads(data_field)
-                        if args:
-                            submission_id = args[0]
-                            print(f"✓ Submission ID: {submission_id}")
-                            
-                            # Process the submission
-                            result = process_submission(submission_id)
-                            
-                            if result.get('success'):
-                                print(f"✅ Job completed successfully!")
-                            else:
-                                print(f"❌ Job failed: {result.get('error')}")
-                            
-                            # Mark job as finished
-                            redis_conn.hset(job_key, 'status', 'finished')
-                            
-                            consecutive_errors = 0
-                    except Exception as e:
-                        print(f"❌ Job execution error: {e}")
-                        redis_conn.hset(job_key, 'status', 'failed')
-                        consecutive_errors += 1
+            # Reap finished jobs
+            in_flight = {f: lane for f, lane in in_flight.items() if not f.done()}
+            lane_counts = Counter(in_flight.values())
+            free_slots = concurrency - len(in_flight)
+            order = lanes.order(lane_counts) if free_slots > 0 else []
+
+            # Wait for a free slot when saturated (overall or in every lane)
+            if not order:
+                wait(in_flight.keys(), timeout=1, return_when=FIRST_COMPLETED)
+                continue
+
+            # Fair-share lane first; take as many jobs as it has free slots
+            jobs = []
+            for lane in order:
+                count = min(free_slots, lanes.free_slots(lane, lane_counts))
+                jobs = queue.dequeue_many(lane, count)
+                if jobs:
+                    break
             else:
-                # No job, reset error counter
-                consecutive_errors = 0
-        
+                jobs = queue.wait_for_job(order, timeout=1)
+
+            if jobs:
+                record_queue_wait(jobs)
+
+            for job in jobs:
+                in_flight[executor.submit(handle_job, queue, job, worker_name)] = job['lane']
+
+            consecutive_errors = 0
+
         except redis.ConnectionError as e:
             consecutive_errors += 1
-            print(f"⚠️  Redis connection error ({consecutive_errors}/{max_consecutive_errors}): {e}")
-            
+            print(f"⚠️  [{worker_name}] Redis connection error ({consecutive_errors}/{max_consecutive_errors}): {e}")
+
             if consecutive_errors >= max_consecutive_errors:
                 print(f"❌ Too many consecutive errors. Reconnecting...")
                 try:
                     redis_conn = connect_redis_with_retry()
+                    queue = JobQueue(redis_conn)
                     consecutive_errors = 0
                 except Exception as reconnect_error:
                     print(f"❌ Reconnection failed: {reconnect_error}")
@@ -105,21 +357,126 @@ def main():
                     time.sleep(30)
             else:
                 time.sleep(2)
-        
-        except KeyboardInterrupt:
-            print("\n⏹️  Worker stopped by user")
-            break
-        
+
         except Exception as e:
             consecutive_errors += 1
-            print(f"⚠️  Worker error ({consecutive_errors}/{max_consecutive_errors}): {e}")
-            
+            print(f"⚠️  [{worker_name}] Worker error ({consecutive_errors}/{max_consecutive_errors}): {e}")
+
             if consecutive_errors >= max_consecutive_errors:
-                print(f"❌ Too many errors. Restarting worker...")
+                print(f"❌ Too many errors. Restarting worker loop...")
                 consecutive_errors = 0
                 time.sleep(10)
             else:
                 time.sleep(2)
 
+    # Drain: no new jobs are pulled, wait for running ones
+    executor.shutdown(wait=True)
+    print(f"👋 [{worker_name}] Stopped")
+
+class WorkerPool:
+    """
+    Supervisor that keeps N worker processes alive
+
+    In pre-fork mode (worker_preload_models) the parent loads every shared
+    model once, freezes the GC so collections do not touch those pages, and
+    forks the children: they start warm and share the weights copy-on-write.
+    """
+
+    def __init__(self, processes: int = None, concurrency: int = None, preload: bool = None):
+        self.processes = processes or settings.worker_processes
+        self.concurrency = concurrency or settings.worker_concurrency
+        self.preload = settings.worker_preload_models if preload is None else preload
+        self.children = {}  # index -> (Process, started_at)
+        self.stopping = False
+
+        if self.preload and "fork" not in multiprocessing.get_all_start_methods():
+            print("⚠️  fork is not available on this platform, models will load per worker")
+            self.preload = False
+
+        self.context = multiprocessing.get_context("fork" if self.preload else None)
+
+    def _preload_models(self):
+        """Load shared models in the parent before any child is forked"""
+        print("📦 Preloading models for copy-on-write sharing...")
+        start = time.perf_counter()
+
+        for name, seconds in preload_models().items():
+            metrics.set_gauge("satya_model_preload_seconds", seconds, model=name)
+            print(f"   {name}: {seconds:.2f}s")
+
+        # Objects allocated so far are never collected; keeps shared pages clean
+        gc.collect()
+        gc.freeze()
+
+        print(f"✅ Models preloaded in {time.perf_counter() - start:.2f}s ({format_memory(memory_usage())})")
+
+    def _spawn(self, index: int):
+        process = self.context.Process(
+            target=run_worker,
+            args=(index, self.concurrency, time.perf_counter()),
+            name=f"worker-{index}"
+        )
+        process.start()
+        self.children[index] = (process, time.monotonic())
+        print(f"✅ Worker {index} started (PID: {process.pid})")
+
+    def _request_stop(self, sig, frame):
+        if self.stopping:
+            return
+        self.stopping = True
+        print(f"\n⏹️  Shutting down worker pool (draining up to {settings.worker_shutdown_timeout}s)...")
+        for process, _ in self.children.values():
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+
+        if self.preload:
+            self._preload_models()
+
+        for index in range(self.processes):
+            self._spawn(index)
+
+        while not self.stopping:
+            time.sleep(1)
+
+            for index, (process, started_at) in list(self.children.items()):
+                if process.is_alive() or self.stopping:
+                    continue
+
+                print(f"⚠️  Worker {index} (PID {process.pid}) exited with code {process.exitcode}, restarting...")
+
+                # Back off if the child is crash-looping
+                if time.monotonic() - started_at < 10:
+                    time.sleep(5)
+
+                if not self.stopping:
+                    self._spawn(index)
+
+        # Wait for children to drain, then force-kill stragglers
+        deadline = time.monotonic() + settings.worker_shutdown_timeout
+        for index, (process, _) in self.children.items():
+            process.join(max(0, deadline - time.monotonic()))
+            if process.is_alive():
+                print(f"⚠️  Worker {index} did not drain in time, killing")
+                process.kill()
+                process.join()
+
+        print("👋 Worker pool stopped")
+
+def main():
+    """Start the supervised worker pool"""
+    print("="*60)
+    print("🚀 Starting Simple Worker")
+    print("="*60)
+    print(f"📡 Redis: {settings.redis_url[:50]}...")
+    print(f"⚙️  Processes: {settings.worker_processes} × concurrency {settings.worker_concurrency} ({settings.worker_mode} mode)")
+    print(f"🚦 Lanes: weights {settings.queue_lane_weights} | limits {settings.queue_lane_concurrency}")
+    print("="*60)
+
+    WorkerPool().run()
+
 if __name__ == "__main__":
     main()
@@ -7,16 +7,15 @@ import sys
 import subprocess
 import time
 import signal
+from app.config import settings
 
 def start_worker():
     """Start worker in background"""
     print("🔄 Starting worker...")
     worker_process = subprocess.Popen(
         [sys.executable, "-m", "app.worker_simple"],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        text=True,
-        bufsize=1
+        stdout=sys.stdout,
+        stderr=sys.stderr
     )
     print(f"✅ Worker started (PID: {worker_process.pid})")
     return worker_process
@@ -45,8 +44,12 @@ def main():
     
     def signal_handler(sig, frame):
         print("\n⏹️  Shutting down...")
-        worker.terminate()
         api.terminate()
+        worker.terminate()  # SIGTERM: worker pool drains in-flight jobs
+        try:
+            worker.wait(timeout=settings.worker_shutdown_timeout + 10)
+        except subprocess.TimeoutExpired:
+            worker.kill()
         sys.exit(0)
     
     signal.signal(signal.SIGINT, signal_handler)